@@ -0,0 +1,265 @@
+"""Vectorized statistics over stored interview answers.
+
+Per-answer metrics from the history store are held as NumPy columns and every
+statistic is computed in a single batched pass with ``bincount`` and sorts
+instead of Python loops. Answer timing telemetry (first input, settle time,
+edit bursts, revisits) is kept in a second set of columns because only
+interviews recorded with telemetry have it. The engine appends only rows for
+interviews stored since the last refresh and recomputes the report only when
+new rows arrived.
+"""
+
+from __future__ import annotations
+
+import threading
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+
+from history_store import HistoryStore, get_history_store
+
+ROUNDS = ["Warm Up", "Coding", "Role Related", "Behavioral"]
+DIFFICULTIES = ["Beginner", "Professional"]
+LENGTH_BINS = np.array([0, 1, 100, 250, 500, 1000, 2000, np.inf])
+LENGTH_BIN_LABELS = ["empty", "1-99", "100-249", "250-499", "500-999", "1000-1999", "2000+"]
+SECONDS_PER_WEEK = 7 * 24 * 60 * 60
+
+
+@dataclass(slots=True)
+class GroupStats:
+    round_type: str
+    difficulty: str
+    answers: int
+    mean_chars: float
+    median_chars: float
+    p90_chars: float
+    median_seconds: float
+    p90_seconds: float
+    lock_rate: float
+    empty_rate: float
+    length_histogram: list[int]
+    # From timing telemetry; NaN when no answer in the group has any.
+    timed_answers: int = 0
+    median_first_input: float = float("nan")
+    median_settled: float = float("nan")
+    mean_bursts: float = float("nan")
+    revisit_rate: float = float("nan")
+
+
+@dataclass(slots=True)
+class AnalyticsReport:
+    total_answers: int = 0
+    total_interviews: int = 0
+    groups: list[GroupStats] = field(default_factory=list)
+    # Weekly trend: week start timestamp, answers, mean chars, lock rate.
+    weeks: list[float] = field(default_factory=list)
+    weekly_answers: list[int] = field(default_factory=list)
+    weekly_mean_chars: list[float] = field(default_factory=list)
+    weekly_lock_rate: list[float] = field(default_factory=list)
+
+
+def _codes(values: list[str], labels: list[str]) -> np.ndarray:
+    # Unknown labels map to an extra "other" slot at len(labels).
+    lookup = {label: code for code, label in enumerate(labels)}
+    other = len(labels)
+    return np.fromiter((lookup.get(value, other) for value in values), dtype=np.int16, count=len(values))
+
+
+def _group_quantiles(groups: np.ndarray, values: np.ndarray, n_groups: int, qs: tuple[float, ...]) -> np.ndarray:
+    """Return an ``(n_groups, len(qs))`` array of per-group quantiles, NaN for empty groups."""
+
+    result = np.full((n_groups, len(qs)), np.nan)
+    if not len(values):
+        return result
+    # Sorting one composite key (group * span + value) is several times faster
+    # than a two-key lexsort; values are non-negative so groups never overlap.
+    span = float(values.max()) + 1.0
+    sorted_keys = np.sort(groups * span + values)
+    counts = np.bincount(groups, minlength=n_groups)
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    present = np.flatnonzero(counts)
+    for column, q in enumerate(qs):
+        offsets = np.floor((counts[present] - 1) * q).astype(np.int64)
+        result[present, column] = sorted_keys[starts[present] + offsets] - present * span
+    return result
+
+
+def compute_report(
+    interview_ids: np.ndarray,
+    rounds: np.ndarray,
+    difficulties: np.ndarray,
+    finished_at: np.ndarray,
+    chars: np.ndarray,
+    seconds: np.ndarray,
+    locked: np.ndarray,
+    timings: Optional[tuple[np.ndarray, ...]] = None,
+) -> AnalyticsReport:
+    """Compute every statistic for the given columns in one batched pass.
+
+    Columns must be ordered by ``interview_ids`` (the store returns them that way).
+    ``timings`` holds the telemetry columns: rounds, difficulties, first input
+    and settle seconds (-1 for unknown), bursts and visits.
+    """
+
+    report = AnalyticsReport(
+        total_answers=int(len(chars)),
+        total_interviews=int(np.count_nonzero(np.diff(interview_ids)) + 1) if len(interview_ids) else 0,
+    )
+    if not len(chars):
+        return report
+
+    round_labels = ROUNDS + ["Other"]
+    difficulty_labels = DIFFICULTIES + ["Other"]
+    n_diff = len(difficulty_labels)
+    n_groups = len(round_labels) * n_diff
+    groups = rounds.astype(np.int64) * n_diff + difficulties
+
+    counts = np.bincount(groups, minlength=n_groups)
+    safe_counts = np.maximum(counts, 1)
+    chars_f = chars.astype(np.float64)
+    mean_chars = np.bincount(groups, weights=chars_f, minlength=n_groups) / safe_counts
+    lock_rate = np.bincount(groups, weights=locked, minlength=n_groups) / safe_counts
+    empty_rate = np.bincount(groups, weights=(chars == 0), minlength=n_groups) / safe_counts
+    char_q = _group_quantiles(groups, chars_f, n_groups, (0.5, 0.9))
+
+    timed = seconds >= 0
+    time_q = _group_quantiles(groups[timed], seconds[timed], n_groups, (0.5, 0.9))
+
+    timed_counts = np.zeros(n_groups, dtype=np.int64)
+    first_input_q = settled_q = mean_bursts = revisit_rate = np.full(n_groups, np.nan)
+    if timings is not None and len(timings[0]):
+        t_rounds, t_difficulties, first_input, settled, bursts, visits = timings
+        t_groups = t_rounds.astype(np.int64) * n_diff + t_difficulties
+        timed_counts = np.bincount(t_groups, minlength=n_groups)
+        t_safe = np.maximum(timed_counts, 1)
+        has_input = first_input >= 0
+        first_input_q = _group_quantiles(t_groups[has_input], first_input[has_input], n_groups, (0.5,))[:, 0]
+        has_settled = settled >= 0
+        settled_q = _group_quantiles(t_groups[has_settled], settled[has_settled], n_groups, (0.5,))[:, 0]
+        mean_bursts = np.bincount(t_groups, weights=bursts, minlength=n_groups) / t_safe
+        revisit_rate = np.bincount(t_groups, weights=visits > 1, minlength=n_groups) / t_safe
+        mean_bursts[timed_counts == 0] = np.nan
+        revisit_rate[timed_counts == 0] = np.nan
+
+    n_bins = len(LENGTH_BIN_LABELS)
+    bins = np.digitize(chars_f, LENGTH_BINS[1:-1])
+    histogram = np.bincount(groups * n_bins + bins, minlength=n_groups * n_bins).reshape(n_groups, n_bins)
+
+    for group in np.flatnonzero(counts):
+        report.groups.append(
+            GroupStats(
+                round_type=round_labels[group // n_diff],
+                difficulty=difficulty_labels[group % n_diff],
+                answers=int(counts[group]),
+                mean_chars=float(mean_chars[group]),
+                median_chars=float(char_q[group, 0]),
+                p90_chars=float(char_q[group, 1]),
+                median_seconds=float(time_q[group, 0]),
+                p90_seconds=float(time_q[group, 1]),
+                lock_rate=float(lock_rate[group]),
+                empty_rate=float(empty_rate[group]),
+                length_histogram=histogram[group].tolist(),
+                timed_answers=int(timed_counts[group]),
+                median_first_input=float(first_input_q[group]),
+                median_settled=float(settled_q[group]),
+                mean_bursts=float(mean_bursts[group]),
+                revisit_rate=float(revisit_rate[group]),
+            )
+        )
+
+    origin = float(finished_at.min())
+    week_index = ((finished_at - origin) // SECONDS_PER_WEEK).astype(np.int64)
+    weekly_counts = np.bincount(week_index)
+    active = np.flatnonzero(weekly_counts)
+    weekly_safe = np.maximum(weekly_counts, 1)
+    report.weeks = (origin + active * SECONDS_PER_WEEK).tolist()
+    report.weekly_answers = weekly_counts[active].tolist()
+    report.weekly_mean_chars = (np.bincount(week_index, weights=chars_f) / weekly_safe)[active].tolist()
+    report.weekly_lock_rate = (np.bincount(week_index, weights=locked) / weekly_safe)[active].tolist()
+    return report
+
+
+class AnalyticsEngine:
+    def __init__(self, store: HistoryStore) -> None:
+        self.store = store
+        self._watermark = 0
+        self._interview_ids = np.empty(0, dtype=np.int64)
+        self._rounds = np.empty(0, dtype=np.int16)
+        self._difficulties = np.empty(0, dtype=np.int16)
+        self._finished_at = np.empty(0, dtype=np.float64)
+        self._chars = np.empty(0, dtype=np.int32)
+        self._seconds = np.empty(0, dtype=np.float64)
+        self._locked = np.empty(0, dtype=np.float64)
+        self._timings = (
+            np.empty(0, dtype=np.int16),
+            np.empty(0, dtype=np.int16),
+            np.empty(0, dtype=np.float64),
+            np.empty(0, dtype=np.float64),
+            np.empty(0, dtype=np.float64),
+            np.empty(0, dtype=np.int32),
+        )
+        self._report: Optional[AnalyticsReport] = None
+        self._lock = threading.Lock()
+
+    def _load_new_rows(self) -> bool:
+        rows = self.store.answer_metrics_after(self._watermark)
+        if not rows:
+            return False
+        ids, rounds, difficulties, finished_at, chars, seconds, locked = zip(*rows)
+        self._interview_ids = np.concatenate((self._interview_ids, np.asarray(ids, dtype=np.int64)))
+        self._rounds = np.concatenate((self._rounds, _codes(rounds, ROUNDS)))
+        self._difficulties = np.concatenate((self._difficulties, _codes(difficulties, DIFFICULTIES)))
+        self._finished_at = np.concatenate((self._finished_at, np.asarray(finished_at, dtype=np.float64)))
+        self._chars = np.concatenate((self._chars, np.asarray(chars, dtype=np.int32)))
+        self._seconds = np.concatenate((self._seconds, np.asarray(seconds, dtype=np.float64)))
+        self._locked = np.concatenate((self._locked, np.asarray(locked, dtype=np.float64)))
+        self._load_new_timings(self._watermark, int(self._interview_ids[-1]))
+        self._watermark = int(self._interview_ids[-1])
+        return True
+
+    def _load_new_timings(self, after_id: int, upto_id: int) -> None:
+        rows = self.store.answer_timings_between(after_id, upto_id)
+        if not rows:
+            return
+        rounds, difficulties, first_input, settled, bursts, visits = zip(*rows)
+        new = (
+            _codes(rounds, ROUNDS),
+            _codes(difficulties, DIFFICULTIES),
+            np.asarray(first_input, dtype=np.float64),
+            np.asarray(settled, dtype=np.float64),
+            np.asarray(bursts, dtype=np.float64),
+            np.asarray(visits, dtype=np.int32),
+        )
+        self._timings = tuple(np.concatenate(pair) for pair in zip(self._timings, new))
+
+    def report(self) -> AnalyticsReport:
+        """Return the cached report, refreshing it if new interviews were stored."""
+
+        with self._lock:
+            stale = self._report is None or self.store.latest_interview_id() > self._watermark
+            if stale and (self._load_new_rows() or self._report is None):
+                self._report = compute_report(
+                    self._interview_ids,
+                    self._rounds,
+                    self._difficulties,
+                    self._finished_at,
+                    self._chars,
+                    self._seconds,
+                    self._locked,
+                    self._timings,
+                )
+            return self._report
+
+
+_engine: Optional[AnalyticsEngine] = None
+_engine_lock = threading.Lock()
+
+
+def get_analytics_engine() -> AnalyticsEngine:
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = AnalyticsEngine(get_history_store())
+    return _engine
@@ -0,0 +1,86 @@
+import math
+from datetime import datetime
+
+import streamlit as st
+
+from analytics import LENGTH_BIN_LABELS, get_analytics_engine
+
+
+def _fmt_seconds(value: float) -> str:
+    if math.isnan(value):
+        return "–"
+    minutes, seconds = divmod(int(value), 60)
+    return f"{minutes}:{seconds:02d}"
+
+
+def render_analytics_page() -> None:
+    """Show aggregate statistics over every stored interview."""
+
+    st.title("Interview Analytics")
+    if st.button("⬅️ Back to Setup"):
+        st.query_params.clear()
+        st.rerun()
+
+    report = get_analytics_engine().report()
+    if not report.total_answers:
+        st.info("Finish a few interviews to see analytics here.")
+        return
+
+    col1, col2 = st.columns(2)
+    col1.metric("Interviews", f"{report.total_interviews:,}")
+    col2.metric("Answers", f"{report.total_answers:,}")
+
+    st.write("### By round and difficulty")
+    st.dataframe(
+        {
+            "Round": [group.round_type for group in report.groups],
+            "Difficulty": [group.difficulty for group in report.groups],
+            "Answers": [group.answers for group in report.groups],
+            "Mean chars": [round(group.mean_chars) for group in report.groups],
+            "Median chars": [group.median_chars for group in report.groups],
+            "P90 chars": [group.p90_chars for group in report.groups],
+            "Median time": [_fmt_seconds(group.median_seconds) for group in report.groups],
+            "P90 time": [_fmt_seconds(group.p90_seconds) for group in report.groups],
+            "Timeout rate": [f"{group.lock_rate:.0%}" for group in report.groups],
+            "Empty rate": [f"{group.empty_rate:.0%}" for group in report.groups],
+        },
+        hide_index=True,
+        use_container_width=True,
+    )
+
+    timed = [group for group in report.groups if group.timed_answers]
+    if timed:
+        st.write("### Answer timing")
+        st.caption(
+            "From per-question telemetry: time from seeing a question to the first committed answer, "
+            "until the last edit, separate editing bursts, and how often candidates came back to a question."
+        )
+        st.dataframe(
+            {
+                "Round": [group.round_type for group in timed],
+                "Difficulty": [group.difficulty for group in timed],
+                "Timed answers": [group.timed_answers for group in timed],
+                "Median first input": [_fmt_seconds(group.median_first_input) for group in timed],
+                "Median settled": [_fmt_seconds(group.median_settled) for group in timed],
+                "Edit bursts": [f"{group.mean_bursts:.1f}" for group in timed],
+                "Revisit rate": [f"{group.revisit_rate:.0%}" for group in timed],
+            },
+            hide_index=True,
+            use_container_width=True,
+        )
+
+    st.write("### Answer length distribution")
+    st.bar_chart(
+        {
+            f"{group.round_type} • {group.difficulty}": group.length_histogram
+            for group in report.groups
+        }
+        | {"Length (chars)": LENGTH_BIN_LABELS},
+        x="Length (chars)",
+    )
+
+    st.write("### Weekly trend")
+    weeks = [datetime.fromtimestamp(week).strftime("%Y-%m-%d") for week in report.weeks]
+    st.line_chart({"Week": weeks, "Mean chars": report.weekly_mean_chars}, x="Week")
+    st.line_chart({"Week": weeks, "Timeout rate": report.weekly_lock_rate}, x="Week")
+    st.bar_chart({"Week": weeks, "Answers": report.weekly_answers}, x="Week")
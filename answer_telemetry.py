@@ -0,0 +1,191 @@
+"""Per-question timing telemetry for practice sessions.
+
+Every session carries an ``AnswerEventLog``: four parallel typed arrays
+(event kind, question index, milliseconds since the log started, value), so
+recording an event is four ``array.append`` calls and costs 11 bytes. Times
+come from ``time.monotonic`` against an anchor taken when the log is created
+or restored, so wall-clock adjustments cannot reorder events.
+
+The practice flow records when a question is shown and left, every committed
+answer change (typed or transcribed from audio), timer locks and the finish.
+Streamlit only reports a text area when it is committed (blur or Ctrl+Enter),
+so "first input" and edit bursts are measured at that granularity.
+``question_timings`` folds the log into one ``QuestionTiming`` per question
+for the history store and analytics.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+from array import array
+from dataclasses import dataclass
+from typing import Any, Optional
+
+EVENT_VIEW = 1  # question shown
+EVENT_EDIT = 2  # typed answer committed, value = answer length
+EVENT_AUDIO = 3  # transcribed answer committed, value = answer length
+EVENT_LEAVE = 4  # navigated away from the question
+EVENT_LOCK = 5  # the question's timer ran out
+EVENT_FINISH = 6  # interview finished
+EVENT_REPLACE = 7  # question swapped for a new one, its timings start over
+
+# Edits further apart than this start a new burst.
+BURST_GAP_SECONDS = 20.0
+
+
+@dataclass(slots=True)
+class QuestionTiming:
+    # Seconds from the first view; -1.0 means "never happened".
+    first_input: float
+    settled: float
+    edits: int
+    audio_edits: int
+    bursts: int
+    visits: int
+    active_seconds: float
+
+
+class AnswerEventLog:
+    __slots__ = ("kinds", "questions", "offsets", "values", "started_at", "viewing", "_clock_base", "_flushed")
+
+    def __init__(self, started_at: Optional[float] = None) -> None:
+        self.kinds = array("B")
+        self.questions = array("H")
+        self.offsets = array("I")
+        self.values = array("i")
+        self.started_at = time.time() if started_at is None else started_at
+        # Question currently on screen according to the log, -1 for none.
+        self.viewing = -1
+        self._clock_base = time.monotonic() - max(0.0, time.time() - self.started_at)
+        self._flushed = 0
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def record(self, kind: int, question: int, value: int = 0) -> None:
+        self.kinds.append(kind)
+        self.questions.append(question)
+        self.offsets.append(int((time.monotonic() - self._clock_base) * 1000))
+        self.values.append(value)
+        if kind == EVENT_VIEW:
+            self.viewing = question
+        elif kind in (EVENT_LEAVE, EVENT_FINISH):
+            self.viewing = -1
+
+    # ------------------------------------------------------------------ persistence
+    def _columns(self, start: int = 0) -> dict[str, list[int]]:
+        return {
+            "k": self.kinds[start:].tolist(),
+            "i": self.questions[start:].tolist(),
+            "ms": self.offsets[start:].tolist(),
+            "v": self.values[start:].tolist(),
+        }
+
+    def to_dict(self) -> dict[str, Any]:
+        return {"start": self.started_at, **self._columns()}
+
+    def take_pending(self) -> Optional[dict[str, list[int]]]:
+        """Return the events recorded since the last call, or ``None`` if there are none."""
+
+        if self._flushed == len(self.kinds):
+            return None
+        pending = self._columns(self._flushed)
+        self._flushed = len(self.kinds)
+        return pending
+
+    def mark_flushed(self) -> None:
+        self._flushed = len(self.kinds)
+
+    def extend(self, data: dict[str, Any]) -> None:
+        """Append events in the ``to_dict``/``take_pending`` column format."""
+
+        kinds = data.get("k", [])
+        self.kinds.extend(kinds)
+        self.questions.extend(data.get("i", []))
+        self.offsets.extend(data.get("ms", []))
+        self.values.extend(data.get("v", []))
+        for kind, question in zip(reversed(kinds), reversed(data.get("i", []))):
+            if kind == EVENT_VIEW:
+                self.viewing = question
+                break
+            if kind in (EVENT_LEAVE, EVENT_FINISH):
+                self.viewing = -1
+                break
+        self._flushed = len(self.kinds)
+        if self.offsets:
+            # Never record before the last restored event, even if the anchor is off.
+            self._clock_base = min(self._clock_base, time.monotonic() - self.offsets[-1] / 1000)
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "AnswerEventLog":
+        log = cls(float(data.get("start") or time.time()))
+        log.extend(data)
+        return log
+
+    def approx_size(self) -> int:
+        return sys.getsizeof(self) + sum(
+            sys.getsizeof(column) for column in (self.kinds, self.questions, self.offsets, self.values)
+        )
+
+    # ------------------------------------------------------------------ analysis
+    def question_timings(self, count: int) -> list[QuestionTiming]:
+        """Fold the log into one ``QuestionTiming`` per question in a single pass."""
+
+        first_view = [-1] * count
+        opened = [-1] * count
+        last_edit = [-1] * count
+        first_input = [-1.0] * count
+        settled = [-1.0] * count
+        edits = [0] * count
+        audio_edits = [0] * count
+        bursts = [0] * count
+        visits = [0] * count
+        active = [0] * count
+        burst_gap = int(BURST_GAP_SECONDS * 1000)
+        for kind, question, at in zip(self.kinds, self.questions, self.offsets):
+            if kind == EVENT_FINISH:
+                for index in range(count):
+                    if opened[index] >= 0:
+                        active[index] += at - opened[index]
+                        opened[index] = -1
+                continue
+            if question >= count:
+                continue
+            if kind == EVENT_REPLACE:
+                first_view[question] = opened[question] = at if opened[question] >= 0 else -1
+                last_edit[question] = -1
+                first_input[question] = settled[question] = -1.0
+                edits[question] = audio_edits[question] = bursts[question] = active[question] = 0
+                visits[question] = 1 if opened[question] >= 0 else 0
+            elif kind == EVENT_VIEW:
+                if first_view[question] < 0:
+                    first_view[question] = at
+                if opened[question] < 0:
+                    visits[question] += 1
+                    opened[question] = at
+            elif kind in (EVENT_EDIT, EVENT_AUDIO):
+                base = first_view[question] if first_view[question] >= 0 else at
+                if edits[question] == 0:
+                    first_input[question] = (at - base) / 1000
+                if last_edit[question] < 0 or at - last_edit[question] > burst_gap:
+                    bursts[question] += 1
+                edits[question] += 1
+                audio_edits[question] += kind == EVENT_AUDIO
+                last_edit[question] = at
+                settled[question] = (at - base) / 1000
+            elif kind == EVENT_LEAVE and opened[question] >= 0:
+                active[question] += at - opened[question]
+                opened[question] = -1
+        return [
+            QuestionTiming(
+                first_input=first_input[index],
+                settled=settled[index],
+                edits=edits[index],
+                audio_edits=audio_edits[index],
+                bursts=bursts[index],
+                visits=visits[index],
+                active_seconds=active[index] / 1000,
+            )
+            for index in range(count)
+        ]
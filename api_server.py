@@ -0,0 +1,649 @@
+"""Headless JSON API for the interview engine.
+
+A plain ASGI application (no web framework) exposing the same engine the
+Streamlit app uses (llm_utils, the session registry and journal, the local
+feedback engine and AI grading), so lightweight clients such as the React
+front end in ``src/`` can run interviews without a Streamlit session per user.
+
+Endpoints (JSON unless noted):
+
+    POST /api/question-sets                   generate a full question set
+    POST /api/sessions                        create a session, returns its token
+    GET  /api/sessions/{token}                resume: full session state
+    GET  /api/sessions/{token}/questions      stream questions as they are ready (SSE)
+    POST /api/sessions/{token}/answers        submit or update one answer
+    POST /api/sessions/{token}/grade          finish and grade (local, optionally AI)
+    GET  /api/history/export?format=jsonl     stream stored interviews (txt, md, json, jsonl)
+    GET  /healthz                             liveness
+    GET  /readyz                              readiness with cache, pool and connection warmth
+    GET  /metrics                             Prometheus text
+
+Generation and AI grading use the caller's Gemini key from the
+``X-Goog-Api-Key`` header. The server's own GOOGLE_API_KEY and the history
+export are only available to callers that send ``Authorization: Bearer
+<API_AUTH_TOKEN>``; with API_AUTH_TOKEN unset the export is disabled. CORS
+headers are sent only for origins listed in API_CORS_ORIGINS (comma-separated,
+none by default).
+Blocking engine calls run on a bounded thread pool, and at most
+API_MAX_CONCURRENCY of them are admitted at once. The journal on disk is the
+source of truth for sessions: every request replays it (a compacted journal
+is a single line), so several worker processes (API_WORKERS) can serve the
+same session without sticky routing. Two writes to one session that race
+across workers are applied in journal order.
+
+    python api_server.py            # uvicorn on API_HOST:API_PORT
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hmac
+import json
+import logging
+import os
+import re
+import time
+import uuid
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import partial
+from typing import Any, Awaitable, Callable, Optional
+from urllib.parse import parse_qs
+
+from answer_telemetry import EVENT_EDIT, EVENT_FINISH
+from circuit_breaker import STATE_OPEN, get_provider_breaker
+from feedback_engine import score_answers
+from history_store import get_history_store
+from interview_export import EXPORT_FORMATS, export_chunks, history_entries
+from interview_session import InterviewSession
+from llm_utils import (
+    generate_question,
+    is_provider_incident,
+    model_pool_stats,
+    submit_grading,
+    warm_up,
+    warmup_status,
+)
+from model_router import get_model_router
+from question_bank import get_question_bank
+from question_index import cached_history_index_count, get_history_index
+from session_journal import get_session_journal, is_valid_session_token
+from session_registry import get_session_registry
+from usage_ledger import get_usage_ledger
+
+logger = logging.getLogger(__name__)
+
+API_HOST = os.getenv("API_HOST", "127.0.0.1")
+API_PORT = int(os.getenv("API_PORT", "8000"))
+API_WORKERS = int(os.getenv("API_WORKERS", "1"))
+API_THREADS = int(os.getenv("API_THREADS", "16"))
+API_MAX_CONCURRENCY = int(os.getenv("API_MAX_CONCURRENCY", "32"))
+API_CORS_ORIGINS = frozenset(
+    origin.strip() for origin in os.getenv("API_CORS_ORIGINS", "").split(",") if origin.strip()
+)
+API_AUTH_TOKEN = os.getenv("API_AUTH_TOKEN", "")
+MAX_BODY_BYTES = 256 * 1024
+EXPORT_BLOCK_BYTES = 64 * 1024
+MAX_QUESTIONS_PER_SET = 20
+DEFAULT_QUESTION_COUNT = 5
+GRADING_TIMEOUT_SECONDS = 60
+
+_executor = ThreadPoolExecutor(max_workers=API_THREADS, thread_name_prefix="api")
+_engine_slots = asyncio.Semaphore(API_MAX_CONCURRENCY)
+# One question generator per session at a time, so a reconnecting client's
+# second stream waits for the first instead of generating the same slots.
+_stream_locks: "weakref.WeakValueDictionary[str, asyncio.Lock]" = weakref.WeakValueDictionary()
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass
+class Request:
+    method: str
+    path: str
+    query: dict[str, str]
+    headers: dict[str, str]
+    body: bytes = b""
+    params: dict[str, str] = field(default_factory=dict)
+
+    def json(self) -> dict[str, Any]:
+        if not self.body:
+            return {}
+        try:
+            payload = json.loads(self.body)
+        except ValueError as exc:
+            raise ApiError(400, f"Invalid JSON body: {exc}") from exc
+        if not isinstance(payload, dict):
+            raise ApiError(400, "JSON body must be an object.")
+        return payload
+
+    @property
+    def authorized(self) -> bool:
+        """Whether the request carries the operator's bearer token."""
+
+        scheme, _, credentials = self.headers.get("authorization", "").partition(" ")
+        return bool(API_AUTH_TOKEN) and scheme.lower() == "bearer" and hmac.compare_digest(
+            credentials.strip().encode(), API_AUTH_TOKEN.encode()
+        )
+
+    @property
+    def api_key(self) -> str:
+        """The Gemini key to bill; the server's key only for authorized callers."""
+
+        key = self.headers.get("x-goog-api-key", "").strip()
+        if key:
+            return key
+        if self.authorized and os.getenv("GOOGLE_API_KEY"):
+            return os.environ["GOOGLE_API_KEY"]
+        raise ApiError(401, "Send your Gemini API key in the X-Goog-Api-Key header.")
+
+
+Handler = Callable[..., Awaitable[Any]]
+_routes: list[tuple[str, re.Pattern, Handler]] = []
+
+
+def route(method: str, pattern: str) -> Callable[[Handler], Handler]:
+    regex = re.compile("^" + re.sub(r"\{(\w+)\}", r"(?P<\1>[^/]+)", pattern) + "$")
+
+    def register(handler: Handler) -> Handler:
+        _routes.append((method, regex, handler))
+        return handler
+
+    return register
+
+
+async def run_blocking(func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """Run a blocking engine call on the API thread pool under the concurrency limit."""
+
+    async with _engine_slots:
+        return await asyncio.get_running_loop().run_in_executor(_executor, partial(func, *args, **kwargs))
+
+
+# ---------------------------------------------------------------------- helpers
+def _config_from(payload: dict[str, Any]) -> dict[str, str]:
+    config = {
+        "role": str(payload.get("role") or "").strip(),
+        "company": str(payload.get("company") or "").strip(),
+        "round_type": str(payload.get("round") or "").strip(),
+        "difficulty": str(payload.get("difficulty") or "").strip(),
+    }
+    missing = [name for name in ("role", "round_type", "difficulty") if not config[name]]
+    if missing:
+        raise ApiError(400, f"Missing fields: {', '.join(missing)}")
+    return config
+
+
+def _question_count(value: Any) -> int:
+    try:
+        count = int(value if value is not None else DEFAULT_QUESTION_COUNT)
+    except (TypeError, ValueError) as exc:
+        raise ApiError(400, "count must be an integer.") from exc
+    if not 1 <= count <= MAX_QUESTIONS_PER_SET:
+        raise ApiError(400, f"count must be between 1 and {MAX_QUESTIONS_PER_SET}.")
+    return count
+
+
+def _generate_one(
+    config: dict[str, str], previous: list[str], api_key: Optional[str], session_id: Optional[str] = None
+) -> str:
+    try:
+        return generate_question(
+            role=config["role"],
+            company=config["company"],
+            round_type=config["round_type"],
+            difficulty=config["difficulty"],
+            previous_questions=previous,
+            api_key=api_key,
+            similarity_index=get_history_index(config["role"], config["round_type"]),
+            session_id=session_id,
+        )
+    except RuntimeError as exc:
+        # Same degradation as the practice page: fall back to the local bank.
+        if not is_provider_incident(exc):
+            raise
+        question = get_question_bank().lookup(
+            config["role"], config["round_type"], config["difficulty"], exclude=previous
+        )
+        if question is None:
+            raise
+        logger.warning("Serving a question-bank question after provider failure: %s", exc)
+        return question
+
+
+def _session_config(session: InterviewSession) -> dict[str, str]:
+    return {
+        "role": session.role,
+        "company": session.company,
+        "round_type": session.round_type,
+        "difficulty": session.difficulty,
+    }
+
+
+def _load_session(token: str) -> InterviewSession:
+    if not is_valid_session_token(token):
+        raise ApiError(404, "Unknown session.")
+    # Always replay the journal: another worker may have changed the session
+    # since this process last cached it.
+    session = get_session_journal(token).load()
+    if session is None:
+        raise ApiError(404, "Unknown session.")
+    get_session_registry().put(token, session)
+    return session
+
+
+def _session_payload(token: str, session: InterviewSession) -> dict[str, Any]:
+    return {"session": token, **session.to_dict()}
+
+
+# ---------------------------------------------------------------------- endpoints
+@route("GET", "/healthz")
+async def healthz(request: Request) -> dict[str, Any]:
+    return {"ok": True}
+
+
+@route("GET", "/readyz")
+async def readyz(request: Request) -> tuple[int, dict[str, Any]]:
+    bank = get_question_bank()
+    breaker = get_provider_breaker().gauges()
+    registry = get_session_registry().gauges()
+    registry.pop("session_bytes", None)
+    ready = breaker["state"] != STATE_OPEN or bank.size > 0
+    body = {
+        "ready": ready,
+        "question_bank_size": bank.size,
+        "history_indexes_cached": cached_history_index_count(),
+        "circuit": breaker,
+        "sessions": registry,
+        "concurrency": {
+            "max_concurrent": API_MAX_CONCURRENCY,
+            "threads": API_THREADS,
+            "workers": API_WORKERS,
+        },
+        **model_pool_stats(),
+        "warmup": warmup_status(),
+    }
+    return (200 if ready else 503), body
+
+
+@route("GET", "/metrics")
+async def metrics(request: Request) -> str:
+    return (
+        get_session_registry().format_gauges()
+        + get_model_router().format_metrics()
+        + await run_blocking(get_usage_ledger().format_metrics)
+    )
+
+
+@route("POST", "/api/question-sets")
+async def create_question_set(request: Request) -> dict[str, Any]:
+    payload = request.json()
+    config = _config_from(payload)
+    count = _question_count(payload.get("count"))
+    api_key = request.api_key
+    questions: list[str] = []
+    for _ in range(count):
+        questions.append(await run_blocking(_generate_one, config, list(questions), api_key))
+    return {**config, "questions": questions}
+
+
+@route("POST", "/api/sessions")
+async def create_session(request: Request) -> tuple[int, dict[str, Any]]:
+    config = _config_from(request.json())
+    # Questions are streamed next; open this key's connection while the client reconnects.
+    warm_up(request.api_key)
+    token = uuid.uuid4().hex
+    session = InterviewSession(**config)
+    get_session_registry().put(token, session)
+    # Journal the configuration right away so any worker can stream this session.
+    await run_blocking(get_session_journal(token).record_questions, session)
+    return 201, _session_payload(token, session)
+
+
+@route("GET", "/api/sessions/{token}")
+async def resume_session(request: Request) -> dict[str, Any]:
+    token = request.params["token"]
+    session = await run_blocking(_load_session, token)
+    return _session_payload(token, session)
+
+
+@route("GET", "/api/sessions/{token}/questions")
+async def stream_questions(request: Request) -> "EventStream":
+    token = request.params["token"]
+    session = await run_blocking(_load_session, token)
+    count = _question_count(request.query.get("count"))
+    api_key = request.api_key if session.total < count else None
+
+    async def events(disconnected: asyncio.Event):
+        current, sent = session, 0
+        lock = _stream_locks.setdefault(token, asyncio.Lock())
+        journal = get_session_journal(token)
+        config = _session_config(session)
+        while True:
+            for index in range(sent, min(current.total, count)):
+                yield "question", {"index": index, "question": current.questions[index]}
+            sent = max(sent, min(current.total, count))
+            if current.total >= count or disconnected.is_set():
+                break
+            async with lock:
+                # Another stream or worker may have added questions meanwhile.
+                current = await run_blocking(_load_session, token)
+                if current.total >= count:
+                    continue
+                question = await run_blocking(_generate_one, config, list(current.questions), api_key, token)
+                current.append_question(question)
+                await run_blocking(journal.record_append, current)
+                # Re-read so a slot another worker filled first wins over ours.
+                current = await run_blocking(_load_session, token)
+        yield "done", {"total": current.total}
+
+    return EventStream(events)
+
+
+@route("POST", "/api/sessions/{token}/answers")
+async def submit_answer(request: Request) -> dict[str, Any]:
+    token = request.params["token"]
+    payload = request.json()
+    session = await run_blocking(_load_session, token)
+    try:
+        index = int(payload["index"])
+    except (KeyError, TypeError, ValueError) as exc:
+        raise ApiError(400, "index is required.") from exc
+    if not 0 <= index < session.total:
+        raise ApiError(400, f"index must be between 0 and {session.total - 1}.")
+    if session.finished or session.is_locked(index):
+        raise ApiError(409, "This answer can no longer be changed.")
+    session.set_answer(index, str(payload.get("answer") or ""), at=time.time())
+    session.events.record(EVENT_EDIT, index, len(session.answer(index)))
+    await run_blocking(get_session_journal(token).record_answer, session, index)
+    return {"session": token, "index": index, "saved": True}
+
+
+@route("POST", "/api/sessions/{token}/grade")
+async def grade_session(request: Request) -> dict[str, Any]:
+    token = request.params["token"]
+    payload = request.json()
+    session = await run_blocking(_load_session, token)
+    if not session.has_questions:
+        raise ApiError(409, "The session has no questions yet.")
+    answers = [session.answer(index) for index in range(session.total)]
+    if not session.finished:
+        session.finish()
+        session.events.record(EVENT_FINISH, session.current_index)
+        journal = get_session_journal(token)
+        await run_blocking(journal.record_finish, session)
+        await run_blocking(get_history_store().save_interview, token, session)
+
+    local = await run_blocking(score_answers, session.role, session.round_type, session.difficulty, answers)
+    result: dict[str, Any] = {
+        "session": token,
+        "local": [
+            {"score": grade.score, "feedback": grade.feedback} for grade in local.answers
+        ],
+        "overall": local.overall,
+    }
+    if payload.get("ai"):
+        future = submit_grading(
+            session.role,
+            session.company,
+            session.round_type,
+            session.difficulty,
+            list(session.questions),
+            answers,
+            request.api_key,
+            session_id=token,
+        )
+        try:
+            grades = await asyncio.wait_for(asyncio.wrap_future(future), GRADING_TIMEOUT_SECONDS)
+        except asyncio.TimeoutError:
+            result["ai_error"] = "AI grading timed out; request it again to pick up the result."
+        except Exception as exc:
+            result["ai_error"] = str(exc)
+        else:
+            result["ai"] = [{"score": grade.score, "feedback": grade.feedback} for grade in grades]
+    return result
+
+
+@route("GET", "/api/history/export")
+async def export_history(request: Request) -> "FileStream":
+    if not API_AUTH_TOKEN:
+        raise ApiError(403, "History export is disabled; set API_AUTH_TOKEN to enable it.")
+    if not request.authorized:
+        raise ApiError(401, "History export requires the API bearer token.")
+    fmt = request.query.get("format", "jsonl")
+    if fmt not in EXPORT_FORMATS:
+        raise ApiError(400, f"format must be one of {', '.join(EXPORT_FORMATS)}.")
+    filters: dict[str, Any] = {
+        "role": request.query.get("role", ""),
+        "round_type": request.query.get("round", ""),
+        "difficulty": request.query.get("difficulty", ""),
+        "keyword": request.query.get("keyword", ""),
+    }
+    for name in ("since", "until"):
+        if name in request.query:
+            try:
+                filters[name] = float(request.query[name])
+            except ValueError as exc:
+                raise ApiError(400, f"{name} must be a Unix timestamp.") from exc
+    chunks = export_chunks(history_entries(get_history_store(), **filters), fmt)
+    return FileStream(chunks, EXPORT_FORMATS[fmt][1], f"interview_history.{fmt}")
+
+
+# ---------------------------------------------------------------------- ASGI plumbing
+@dataclass
+class EventStream:
+    """A server-sent events response.
+
+    ``events`` is an async generator function taking an ``asyncio.Event`` that
+    is set once the client disconnects, and yielding (event, data) pairs.
+    """
+
+    events: Any
+
+
+@dataclass
+class FileStream:
+    """A download response fed by a blocking iterator of text chunks."""
+
+    chunks: Any
+    content_type: str
+    file_name: str
+
+
+def _with_cors(send, origin: str):
+    """Wrap ``send`` to add CORS headers when ``origin`` is allowed."""
+
+    if origin not in API_CORS_ORIGINS and "*" not in API_CORS_ORIGINS:
+        return send
+    headers = [
+        (b"access-control-allow-origin", origin.encode()),
+        (b"access-control-allow-headers", b"authorization, content-type, x-goog-api-key"),
+        (b"access-control-allow-methods", b"GET, POST, OPTIONS"),
+        (b"vary", b"origin"),
+    ]
+
+    async def send_with_cors(message) -> None:
+        if message["type"] == "http.response.start":
+            message = {**message, "headers": list(message.get("headers", [])) + headers}
+        await send(message)
+
+    return send_with_cors
+
+
+async def _send_body(send, status: int, body: bytes, content_type: bytes) -> None:
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [(b"content-type", content_type), (b"content-length", str(len(body)).encode())],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _send_json(send, status: int, payload: Any) -> None:
+    await _send_body(send, status, json.dumps(payload).encode("utf-8"), b"application/json")
+
+
+async def _watch_disconnect(receive, disconnected: asyncio.Event) -> None:
+    while (await receive())["type"] != "http.disconnect":
+        pass
+    disconnected.set()
+
+
+async def _send_events(send, receive, stream: EventStream) -> None:
+    disconnected = asyncio.Event()
+    watcher = asyncio.create_task(_watch_disconnect(receive, disconnected))
+    events = stream.events(disconnected)
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [(b"content-type", b"text/event-stream"), (b"cache-control", b"no-cache")],
+        }
+    )
+    try:
+        async for event, data in events:
+            if disconnected.is_set():
+                return
+            chunk = f"event: {event}\ndata: {json.dumps(data)}\n\n".encode("utf-8")
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+    except Exception as exc:
+        chunk = f"event: error\ndata: {json.dumps({'error': str(exc)})}\n\n".encode("utf-8")
+        await send({"type": "http.response.body", "body": chunk, "more_body": True})
+    finally:
+        watcher.cancel()
+        await events.aclose()
+    await send({"type": "http.response.body", "body": b""})
+
+
+def _next_block(chunks) -> bytes:
+    # Runs on the thread pool: the export iterator reads the history store.
+    block, size = [], 0
+    for chunk in chunks:
+        data = chunk.encode("utf-8")
+        block.append(data)
+        size += len(data)
+        if size >= EXPORT_BLOCK_BYTES:
+            break
+    return b"".join(block)
+
+
+async def _send_file(send, stream: FileStream) -> None:
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", f"{stream.content_type}; charset=utf-8".encode()),
+                (b"content-disposition", f'attachment; filename="{stream.file_name}"'.encode()),
+            ],
+        }
+    )
+    # One bounded block in flight at a time, so memory does not grow with the export.
+    try:
+        while True:
+            block = await run_blocking(_next_block, stream.chunks)
+            if not block:
+                break
+            await send({"type": "http.response.body", "body": block, "more_body": True})
+    except Exception:
+        # The status line is already sent; end the body so the client sees a truncated file.
+        logger.exception("Export of %s failed", stream.file_name)
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def _read_body(receive) -> bytes:
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            raise ApiError(413, "Request body too large.")
+        chunks.append(chunk)
+        if not message.get("more_body"):
+            return b"".join(chunks)
+
+
+async def _lifespan(receive, send) -> None:
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            # Map the question bank and open the registry before taking traffic;
+            # the Gemini client warms up for GOOGLE_API_KEY in the background.
+            warm_up()
+            await asyncio.get_running_loop().run_in_executor(_executor, get_question_bank)
+            get_session_registry()
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            _executor.shutdown(wait=False)
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send) -> None:
+    if scope["type"] == "lifespan":
+        await _lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        return
+    method = scope["method"]
+    headers = {key.decode().lower(): value.decode() for key, value in scope["headers"]}
+    send = _with_cors(send, headers.get("origin", ""))
+    if method == "OPTIONS":
+        await _send_body(send, 204, b"", b"text/plain")
+        return
+    path = scope["path"].rstrip("/") or "/"
+    allowed = False
+    for route_method, regex, handler in _routes:
+        match = regex.match(path)
+        if not match:
+            continue
+        allowed = True
+        if route_method != method:
+            continue
+        try:
+            request = Request(
+                method=method,
+                path=path,
+                query={key: values[-1] for key, values in parse_qs(scope["query_string"].decode()).items()},
+                headers=headers,
+                body=await _read_body(receive),
+                params=match.groupdict(),
+            )
+            result = await handler(request)
+        except ApiError as exc:
+            await _send_json(send, exc.status, {"error": str(exc)})
+            return
+        except Exception as exc:
+            logger.exception("API error on %s %s", method, path)
+            await _send_json(send, 500, {"error": str(exc)})
+            return
+        if isinstance(result, EventStream):
+            await _send_events(send, receive, result)
+        elif isinstance(result, FileStream):
+            await _send_file(send, result)
+        elif isinstance(result, str):
+            await _send_body(send, 200, result.encode("utf-8"), b"text/plain; version=0.0.4")
+        elif isinstance(result, tuple):
+            await _send_json(send, *result)
+        else:
+            await _send_json(send, 200, result)
+        return
+    await _send_json(send, 405 if allowed else 404, {"error": "Method not allowed." if allowed else "Not found."})
+
+
+if __name__ == "__main__":
+    try:
+        import uvicorn
+    except ImportError as exc:
+        raise SystemExit("The API server needs uvicorn: pip install uvicorn") from exc
+    from dotenv import load_dotenv
+
+    load_dotenv()
+    uvicorn.run("api_server:app", host=API_HOST, port=API_PORT, workers=API_WORKERS)
@@ -0,0 +1,83 @@
+"""Cold-start import benchmark for the app entry points.
+
+Imports each module in a fresh interpreter with ``python -X importtime`` and
+reports its cumulative import time together with the slowest imports it
+pulled in. The setup page must render without the Gemini SDK, so the run
+fails if ``streamlit_app`` (or anything it imports at load) brings in
+``google.generativeai``, or if a module exceeds ``--max-ms``.
+
+Run with ``python benchmarks/bench_import_time.py [--repeat N] [--top N] [--max-ms MS] [module ...]``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[1]
+DEFAULT_MODULES = ["streamlit_app", "practice_app", "api_server", "llm_utils", "google.generativeai"]
+# Modules that must stay off the import path of the setup page.
+LAZY_MODULES = {"streamlit_app": ["google.generativeai"]}
+
+_LINE = re.compile(r"import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)")
+
+
+def _import_times(module: str) -> dict[str, tuple[int, int]]:
+    """Return ``{module: (self µs, cumulative µs)}`` for one cold import of ``module``."""
+
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE="1")
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=REPO_ROOT,
+        env=env,
+        capture_output=True,
+        text=True,
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+    times: dict[str, tuple[int, int]] = {}
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            times[match.group(4)] = (int(match.group(1)), int(match.group(2)))
+    return times
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("modules", nargs="*", default=DEFAULT_MODULES)
+    parser.add_argument("--repeat", type=int, default=3, help="cold imports per module; the median is reported")
+    parser.add_argument("--top", type=int, default=8, help="slowest nested imports to list per module")
+    parser.add_argument("--max-ms", type=float, default=0, help="fail if a module's median exceeds this (0 = off)")
+    args = parser.parse_args()
+
+    failures = []
+    for module in args.modules:
+        runs = [_import_times(module) for _ in range(args.repeat)]
+        totals = [run[module][1] for run in runs if module in run]
+        median_ms = statistics.median(totals) / 1000 if totals else 0.0
+        print(f"{module:<22} {median_ms:8.1f} ms  (median of {len(totals)})")
+        slowest = sorted(
+            ((cumulative, name) for name, (_, cumulative) in runs[-1].items() if name != module),
+            reverse=True,
+        )[: args.top]
+        for cumulative, name in slowest:
+            print(f"    {cumulative / 1000:8.1f} ms  {name}")
+        for forbidden in LAZY_MODULES.get(module, []):
+            if any(name == forbidden or name.startswith(forbidden + ".") for name in runs[-1]):
+                failures.append(f"{module} imports {forbidden} at load time")
+        if args.max_ms and median_ms > args.max_ms:
+            failures.append(f"{module} took {median_ms:.1f} ms (limit {args.max_ms:.1f} ms)")
+
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""Memory benchmark for the practice session state.
+
+Simulates repeated "Start New Interview" cycles against a plain dict standing in
+for ``st.session_state`` and reports the traced heap after each batch of cycles.
+The legacy layout (loose keys plus ``answer_input_{i}`` widget keys) is measured
+next to ``InterviewSession`` so regressions in either direction are visible.
+
+Run with ``python benchmarks/bench_session_memory.py [cycles] [questions]``.
+"""
+
+from __future__ import annotations
+
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from interview_session import (  # noqa: E402
+    answer_widget_key,
+    get_interview_session,
+    reset_interview_state,
+)
+
+ANSWER_TEXT = "I would start by clarifying the requirements and constraints. " * 12
+
+
+def _legacy_cycle(state: dict, cycle: int, questions: int) -> None:
+    state["questions"] = [f"Question {cycle}-{i}?" for i in range(questions)]
+    state["answers"] = {}
+    state["question_timers"] = {}
+    state["question_locked"] = {}
+    for i in range(questions):
+        state[f"answer_input_{i + cycle % 7}"] = ANSWER_TEXT
+        state["answers"][i] = ANSWER_TEXT
+        state["question_timers"][i] = time.time()
+    # The old reset path cleared ``answer_{i}`` which never matched the widget keys.
+    for key in ["finished", "questions", "question_timers", "question_locked"] + [
+        f"answer_{i}" for i in range(10)
+    ]:
+        state.pop(key, None)
+
+
+def _session_cycle(state: dict, cycle: int, questions: int) -> None:
+    session = get_interview_session(state)
+    session.load_questions([f"Question {cycle}-{i}?" for i in range(questions)])
+    for i in range(questions):
+        state[answer_widget_key(i + cycle % 7)] = ANSWER_TEXT
+        session.set_answer(i, ANSWER_TEXT)
+        session.start_timer(i, time.time())
+    session.finish()
+    reset_interview_state(state)
+
+
+def _measure(label: str, cycle_fn, cycles: int, questions: int) -> None:
+    state: dict = {}
+    tracemalloc.start()
+    baseline = tracemalloc.get_traced_memory()[0]
+    checkpoints = []
+    step = max(1, cycles // 5)
+    for cycle in range(cycles):
+        cycle_fn(state, cycle, questions)
+        if (cycle + 1) % step == 0:
+            checkpoints.append(tracemalloc.get_traced_memory()[0] - baseline)
+    tracemalloc.stop()
+    trend = " -> ".join(f"{value / 1024:.1f}" for value in checkpoints)
+    print(f"{label:<18} retained KiB after each {step} cycles: {trend}  (keys left: {len(state)})")
+
+
+def main() -> None:
+    cycles = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    questions = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    print(f"{cycles} cycles x {questions} questions")
+    _measure("legacy keys", _legacy_cycle, cycles, questions)
+    _measure("InterviewSession", _session_cycle, cycles, questions)
+
+    session = get_interview_session({})
+    session.load_questions([f"Question {i}?" for i in range(questions)])
+    for i in range(questions):
+        session.set_answer(i, ANSWER_TEXT)
+    print(f"InterviewSession.approx_size() with answers: {session.approx_size()} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""Circuit breaker around the LLM provider.
+
+Every provider call runs inside ``CircuitBreaker.guard()``, which records its
+outcome and latency in a rolling window. Only transient provider failures
+(5xx, 429, timeouts, dropped connections) and calls slower than the caller's
+threshold count against the provider; a rejected key or a bad request is the
+caller's problem and never opens the circuit for everyone else. When too many
+recent calls failed or were slow the circuit opens: calls are rejected immediately with
+``CircuitOpenError`` so callers can degrade (the practice page serves
+questions from the local question bank) instead of stacking threads on a
+failing upstream. After a cool-down the circuit goes half-open and lets a
+single probe through; a successful probe closes it again.
+
+Calls made inside ``background_calls()`` (spare and look-ahead question
+refills) are exempt from the in-flight bulkhead, so prefetching never pushes
+a candidate's own request into the question-bank fallback.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+STATE_CLOSED = "closed"
+STATE_OPEN = "open"
+STATE_HALF_OPEN = "half_open"
+
+WINDOW_SIZE = 20
+MIN_CALLS = 5
+FAILURE_RATE_THRESHOLD = 0.5
+SLOW_CALL_SECONDS = float(os.getenv("LLM_SLOW_CALL_SECONDS", "25"))
+OPEN_SECONDS = float(os.getenv("LLM_CIRCUIT_OPEN_SECONDS", "30"))
+# Bulkhead: calls beyond this many in flight are rejected rather than queued.
+MAX_CONCURRENT_CALLS = int(os.getenv("LLM_MAX_CONCURRENT_CALLS", "8"))
+TRANSIENT_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+# google.api_core exception names for the same conditions, matched by name so
+# this module does not import the SDK.
+_TRANSIENT_ERROR_NAMES = frozenset(
+    {
+        "DeadlineExceeded",
+        "GatewayTimeout",
+        "InternalServerError",
+        "ResourceExhausted",
+        "ServerError",
+        "ServiceUnavailable",
+        "TooManyRequests",
+    }
+)
+
+_local = threading.local()
+
+
+def is_transient_error(exc: BaseException) -> bool:
+    """Return whether ``exc`` is a provider-side failure worth retrying elsewhere."""
+
+    if isinstance(exc, (TimeoutError, ConnectionError)):
+        return True
+    code = getattr(exc, "code", None)
+    if isinstance(code, int) and not isinstance(code, bool):
+        return code in TRANSIENT_STATUS_CODES or code >= 500
+    return any(cls.__name__ in _TRANSIENT_ERROR_NAMES for cls in type(exc).__mro__)
+
+
+@contextmanager
+def background_calls() -> Iterator[None]:
+    """Mark provider calls made on this thread as background prefetching."""
+
+    previous = getattr(_local, "background", False)
+    _local.background = True
+    try:
+        yield
+    finally:
+        _local.background = previous
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised without calling the provider when the circuit is open or saturated."""
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        window_size: int = WINDOW_SIZE,
+        min_calls: int = MIN_CALLS,
+        failure_rate: float = FAILURE_RATE_THRESHOLD,
+        slow_call_seconds: float = SLOW_CALL_SECONDS,
+        open_seconds: float = OPEN_SECONDS,
+        max_concurrent: int = MAX_CONCURRENT_CALLS,
+    ) -> None:
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.max_concurrent = max_concurrent
+        self._outcomes: deque[bool] = deque(maxlen=window_size)  # True means failed or slow
+        self._state = STATE_CLOSED
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._in_flight = 0
+        self._background_in_flight = 0
+        self.rejected = 0
+        self.opened_total = 0
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state(time.monotonic())
+
+    def _current_state(self, now: float) -> str:
+        if self._state == STATE_OPEN and now - self._opened_at >= self.open_seconds:
+            self._state = STATE_HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def _acquire(self, background: bool) -> bool:
+        """Admit a call, returning whether it is the half-open probe."""
+
+        with self._lock:
+            state = self._current_state(time.monotonic())
+            if state == STATE_OPEN:
+                self.rejected += 1
+                raise CircuitOpenError(f"{self.name} circuit is open; try again shortly.")
+            if state == STATE_HALF_OPEN:
+                if self._probe_in_flight:
+                    self.rejected += 1
+                    raise CircuitOpenError(f"{self.name} circuit is half-open; a probe is already running.")
+                self._probe_in_flight = True
+            elif not background and self._in_flight >= self.max_concurrent:
+                self.rejected += 1
+                raise CircuitOpenError(f"{self.name} has too many requests in flight.")
+            if background:
+                self._background_in_flight += 1
+            else:
+                self._in_flight += 1
+            return state == STATE_HALF_OPEN
+
+    def _release(self, probe: bool, failed: bool, background: bool) -> None:
+        with self._lock:
+            if background:
+                self._background_in_flight -= 1
+            else:
+                self._in_flight -= 1
+            now = time.monotonic()
+            if probe:
+                self._probe_in_flight = False
+                if failed:
+                    self._trip(now)
+                else:
+                    self._state = STATE_CLOSED
+                    self._outcomes.clear()
+                return
+            self._outcomes.append(failed)
+            if self._state == STATE_CLOSED and len(self._outcomes) >= self.min_calls:
+                if sum(self._outcomes) / len(self._outcomes) >= self.failure_rate:
+                    self._trip(now)
+
+    def _trip(self, now: float) -> None:
+        if self._state != STATE_OPEN:
+            self.opened_total += 1
+            logger.warning("%s circuit opened", self.name)
+        self._state = STATE_OPEN
+        self._opened_at = now
+
+    @contextmanager
+    def guard(self, slow_call_seconds: Optional[float] = None) -> Iterator[None]:
+        """Run one provider call under the breaker; raises CircuitOpenError if it is not admitted.
+
+        ``slow_call_seconds`` overrides the breaker-wide slow-call threshold,
+        so each task is judged against its own latency objective.
+        """
+
+        background = getattr(_local, "background", False)
+        probe = self._acquire(background)
+        started = time.monotonic()
+        failed = True
+        try:
+            yield
+        except BaseException as exc:
+            failed = is_transient_error(exc)
+            raise
+        else:
+            threshold = self.slow_call_seconds if slow_call_seconds is None else slow_call_seconds
+            failed = time.monotonic() - started >= threshold
+        finally:
+            self._release(probe, failed, background)
+
+    def gauges(self) -> dict[str, object]:
+        with self._lock:
+            outcomes = list(self._outcomes)
+            return {
+                "state": self._current_state(time.monotonic()),
+                "in_flight": self._in_flight,
+                "background_in_flight": self._background_in_flight,
+                "failure_rate": (sum(outcomes) / len(outcomes)) if outcomes else 0.0,
+                "rejected_total": self.rejected,
+                "opened_total": self.opened_total,
+            }
+
+
+_breaker: Optional[CircuitBreaker] = None
+_breaker_lock = threading.Lock()
+
+
+def get_provider_breaker() -> CircuitBreaker:
+    global _breaker
+    if _breaker is None:
+        with _breaker_lock:
+            if _breaker is None:
+                _breaker = CircuitBreaker("gemini")
+    return _breaker
@@ -0,0 +1,414 @@
+"""Sandboxed execution of candidate code for the Coding round.
+
+Submitted Python is run against a small test suite (from the question bank
+or generated by Gemini) in a pool of long-lived worker processes. Each worker
+is a warm, isolated interpreter (``python -I``); for every run it forks a
+child that drops into a scratch directory, closes its standard streams and
+applies CPU, address-space, file-size and process limits before executing
+the code, so a run costs a fork rather than a fresh interpreter. The worker
+kills the child's process group once the wall-clock limit passes.
+
+Results are cached by a hash of the code and the suite, so re-running an
+unchanged solution is free.
+
+The runner is off unless ``CODE_RUNNER_ENABLED=1``, and even then it only
+starts workers inside bubblewrap (``bwrap``, or ``CODE_RUNNER_BWRAP``): every
+namespace is unshared (so there is no network), the worker runs as uid/gid
+65534 and only sees read-only system directories plus its own module. The app
+directory is masked with an empty tmpfs and ``/tmp`` is private, so the
+history database, journals and ``.env`` are out of reach. Without bubblewrap,
+``CodeRunner.available`` is False and the Coding round hides the editor.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import logging
+import os
+import queue
+import select
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field, replace
+from typing import Any, Optional
+
+logger = logging.getLogger(__name__)
+
+RUNNER_ENABLED = os.getenv("CODE_RUNNER_ENABLED", "0").lower() in ("1", "true", "yes")
+RUNNER_BWRAP = os.getenv("CODE_RUNNER_BWRAP") or shutil.which("bwrap")
+RUNNER_WORKERS = int(os.getenv("CODE_RUNNER_WORKERS", "2"))
+RUN_TIMEOUT_SECONDS = float(os.getenv("CODE_RUN_TIMEOUT_SECONDS", "5"))
+RUN_CPU_SECONDS = int(os.getenv("CODE_RUN_CPU_SECONDS", "3"))
+RUN_MEMORY_MB = int(os.getenv("CODE_RUN_MEMORY_MB", "256"))
+MAX_OUTPUT_CHARS = 4000
+MAX_FILE_BYTES = 1 << 20
+RESULT_CACHE_SIZE = 512
+# Extra time the app waits on a worker before declaring it hung and replacing it.
+WORKER_GRACE_SECONDS = 5.0
+APP_DIR = os.path.dirname(os.path.abspath(__file__))
+SANDBOX_UID = 65534
+# Read-only system paths visible inside the sandbox; missing ones are skipped.
+SANDBOX_SYSTEM_PATHS = ("/usr", "/lib", "/lib64", "/bin", "/etc/ld.so.cache")
+
+STATUS_PASSED = "passed"
+STATUS_FAILED = "failed"
+STATUS_ERROR = "error"
+STATUS_TIMEOUT = "timeout"
+STATUS_MEMORY = "memory"
+
+
+@dataclass(frozen=True)
+class TestCase:
+    args: tuple
+    expected: Any
+
+
+@dataclass(frozen=True)
+class TestSuite:
+    function: str
+    cases: tuple[TestCase, ...]
+    source: str = "bank"
+
+    @classmethod
+    def from_dict(cls, data: dict, source: str = "bank") -> "TestSuite":
+        return cls(
+            function=str(data["function"]),
+            cases=tuple(TestCase(tuple(case.get("args", [])), case.get("expected")) for case in data.get("cases", [])),
+            source=source,
+        )
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "function": self.function,
+            "cases": [{"args": list(case.args), "expected": case.expected} for case in self.cases],
+        }
+
+
+@dataclass(frozen=True)
+class CaseResult:
+    passed: bool
+    actual: str = ""
+    error: str = ""
+    seconds: float = 0.0
+
+
+@dataclass(frozen=True)
+class RunResult:
+    status: str
+    cases: tuple[CaseResult, ...] = ()
+    stdout: str = ""
+    error: str = ""
+    seconds: float = 0.0
+    cached: bool = field(default=False, compare=False)
+
+    @property
+    def passed(self) -> int:
+        return sum(1 for case in self.cases if case.passed)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "RunResult":
+        return cls(
+            status=data["status"],
+            cases=tuple(CaseResult(**case) for case in data.get("cases", [])),
+            stdout=data.get("stdout", ""),
+            error=data.get("error", ""),
+            seconds=data.get("seconds", 0.0),
+        )
+
+
+def result_key(code: str, suite: TestSuite) -> str:
+    payload = json.dumps([code, suite.to_dict(), RUN_CPU_SECONDS, RUN_MEMORY_MB], sort_keys=True, default=repr)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+# ---------------------------------------------------------------------------- worker side
+# Everything below up to CodeRunner runs inside the worker interpreter and only uses the stdlib.
+
+
+def _limit_child(cpu_seconds: int, memory_mb: int) -> None:
+    import resource
+
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds + 1))
+    memory = memory_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    resource.setrlimit(resource.RLIMIT_FSIZE, (MAX_FILE_BYTES, MAX_FILE_BYTES))
+    try:
+        resource.setrlimit(resource.RLIMIT_NPROC, (0, 0))  # No fork bombs; ignored for root.
+    except (ValueError, OSError):
+        pass
+
+
+def _normalize(value: Any) -> Any:
+    # Compare the way the expected values were written: as JSON (tuples become lists).
+    return json.loads(json.dumps(value, default=repr))
+
+
+def _run_suite(job: dict) -> dict:
+    import copy
+    import io
+    import traceback
+    from contextlib import redirect_stdout
+
+    started = time.perf_counter()
+    output = io.StringIO()
+    namespace: dict[str, Any] = {"__name__": "__solution__"}
+    try:
+        with redirect_stdout(output):
+            exec(compile(job["code"], "<solution>", "exec"), namespace)
+    except MemoryError:
+        return {"status": STATUS_MEMORY, "error": "Memory limit exceeded while loading the code."}
+    except BaseException:
+        return {"status": STATUS_ERROR, "error": traceback.format_exc(limit=-1)[-MAX_OUTPUT_CHARS:]}
+    function = namespace.get(job["function"])
+    if not callable(function):
+        return {"status": STATUS_ERROR, "error": f"Define a function named `{job['function']}`."}
+    cases = []
+    for case in job["cases"]:
+        case_started = time.perf_counter()
+        try:
+            with redirect_stdout(output):
+                actual = function(*copy.deepcopy(case["args"]))
+            passed = _normalize(actual) == case["expected"]
+            cases.append({"passed": passed, "actual": repr(actual)[:200]})
+        except MemoryError:
+            return {"status": STATUS_MEMORY, "error": "Memory limit exceeded."}
+        except BaseException as exc:
+            cases.append({"passed": False, "error": f"{type(exc).__name__}: {exc}"[:300]})
+        cases[-1]["seconds"] = round(time.perf_counter() - case_started, 6)
+    return {
+        "status": STATUS_PASSED if all(case["passed"] for case in cases) else STATUS_FAILED,
+        "cases": cases,
+        "stdout": output.getvalue()[:MAX_OUTPUT_CHARS],
+        "seconds": round(time.perf_counter() - started, 6),
+    }
+
+
+def _execute_job(job: dict) -> dict:
+    import signal
+
+    scratch = tempfile.mkdtemp(prefix="code-run-")
+    read_fd, write_fd = os.pipe()
+    pid = os.fork()
+    if pid == 0:  # Child: confine, run, report, exit without cleanup handlers.
+        try:
+            os.close(read_fd)
+            os.setpgid(0, 0)
+            os.chdir(scratch)
+            devnull = os.open(os.devnull, os.O_RDWR)
+            for fd in (0, 1, 2):
+                os.dup2(devnull, fd)
+            _limit_child(job["cpu_seconds"], job["memory_mb"])
+            runner_pid = os.getpid()
+            payload = json.dumps(_run_suite(job)).encode("utf-8")
+            if os.getpid() != runner_pid:
+                os._exit(0)  # A process the code forked; only the runner reports.
+        except BaseException as exc:
+            payload = json.dumps({"status": STATUS_ERROR, "error": repr(exc)}).encode("utf-8")
+        view = memoryview(payload)
+        while view:
+            view = view[os.write(write_fd, view):]
+        os._exit(0)
+
+    os.close(write_fd)
+    chunks = []
+    deadline = time.monotonic() + job["timeout"]
+    timed_out = False
+    while True:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0 or not select.select([read_fd], [], [], remaining)[0]:
+            timed_out = True
+            break
+        chunk = os.read(read_fd, 65536)
+        if not chunk:
+            break
+        chunks.append(chunk)
+    # Also reaps anything the code left running in its process group.
+    try:
+        os.killpg(pid, signal.SIGKILL)
+    except (ProcessLookupError, PermissionError):
+        pass
+    os.close(read_fd)
+    _, wait_status = os.waitpid(pid, 0)
+    shutil.rmtree(scratch, ignore_errors=True)
+    if timed_out:
+        return {"status": STATUS_TIMEOUT, "error": f"Stopped after {job['timeout']:g}s."}
+    if chunks:
+        try:
+            return json.loads(b"".join(chunks))
+        except ValueError:
+            pass
+    signal_number = os.WTERMSIG(wait_status) if os.WIFSIGNALED(wait_status) else 0
+    if signal_number in (signal.SIGXCPU, signal.SIGKILL):
+        return {"status": STATUS_TIMEOUT, "error": f"CPU limit of {job['cpu_seconds']}s exceeded."}
+    return {"status": STATUS_ERROR, "error": f"The process exited unexpectedly (signal {signal_number})."}
+
+
+def _worker_main() -> None:
+    for line in sys.stdin.buffer:
+        sys.stdout.write(json.dumps(_execute_job(json.loads(line))) + "\n")
+        sys.stdout.flush()
+
+
+# ---------------------------------------------------------------------------- app side
+
+
+def sandbox_command(bwrap: str) -> list[str]:
+    """Return the bubblewrap command line that starts one isolated worker."""
+
+    python = getattr(sys, "_base_executable", None) or sys.executable
+    command = [
+        bwrap,
+        "--unshare-all",
+        "--die-with-parent",
+        "--new-session",
+        "--clearenv",
+        "--uid", str(SANDBOX_UID),
+        "--gid", str(SANDBOX_UID),
+        "--setenv", "PATH", "/usr/bin:/bin",
+        "--setenv", "LANG", "C.UTF-8",
+    ]
+    for path in (*SANDBOX_SYSTEM_PATHS, sys.base_prefix):
+        command += ["--ro-bind-try", path, path]
+    command += ["--proc", "/proc", "--dev", "/dev", "--tmpfs", "/tmp"]
+    # The app may live under a bound prefix (e.g. /usr/local/app); hide it.
+    command += ["--tmpfs", APP_DIR]
+    command += ["--ro-bind", os.path.abspath(__file__), "/sandbox/code_runner.py", "--chdir", "/tmp"]
+    return command + ["--", python, "-I", "/sandbox/code_runner.py", "--worker"]
+
+
+class _Worker:
+    def __init__(self, bwrap: str) -> None:
+        self.proc = subprocess.Popen(
+            sandbox_command(bwrap),
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            env={},
+            cwd=tempfile.gettempdir(),
+        )
+        self._buffer = b""
+
+    def run(self, job: dict, timeout: float) -> dict:
+        self.proc.stdin.write(json.dumps(job).encode("utf-8") + b"\n")
+        self.proc.stdin.flush()
+        fd = self.proc.stdout.fileno()
+        deadline = time.monotonic() + timeout
+        while b"\n" not in self._buffer:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([fd], [], [], remaining)[0]:
+                raise TimeoutError("code runner worker did not answer")
+            chunk = os.read(fd, 65536)
+            if not chunk:
+                raise RuntimeError("code runner worker exited")
+            self._buffer += chunk
+        line, self._buffer = self._buffer.split(b"\n", 1)
+        return json.loads(line)
+
+    def close(self) -> None:
+        self.proc.kill()
+        self.proc.wait()
+
+
+class CodeRunner:
+    """Pool of pre-started sandbox workers with a result cache."""
+
+    def __init__(
+        self,
+        size: int = RUNNER_WORKERS,
+        *,
+        enabled: bool = RUNNER_ENABLED,
+        bwrap: Optional[str] = RUNNER_BWRAP,
+    ) -> None:
+        self.size = max(1, size)
+        self.bwrap = bwrap
+        if not enabled:
+            self.unavailable_reason = "Running code is disabled on this server."
+        elif not hasattr(os, "fork") or sys.platform != "linux":
+            self.unavailable_reason = "Running code needs a Linux host."
+        elif not bwrap:
+            self.unavailable_reason = "Running code needs bubblewrap (bwrap) on the server."
+        else:
+            self.unavailable_reason = ""
+        self.available = not self.unavailable_reason
+        self._idle: "queue.Queue[_Worker]" = queue.Queue()
+        self._workers = 0
+        self._start_lock = threading.Lock()
+        self._cache: "OrderedDict[str, RunResult]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    def start(self) -> None:
+        """Start the workers now so the first run does not pay for interpreter start-up."""
+
+        if not self.available:
+            return
+        with self._start_lock:
+            # Also tops the pool back up after a worker was lost.
+            while self._workers < self.size:
+                self._idle.put(_Worker(self.bwrap))
+                self._workers += 1
+
+    def run(self, code: str, suite: TestSuite) -> RunResult:
+        if not self.available:
+            return RunResult(STATUS_ERROR, error=self.unavailable_reason)
+        key = result_key(code, suite)
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached is not None:
+                self._cache.move_to_end(key)
+                return replace(cached, cached=True)
+        try:
+            self.start()
+        except OSError as exc:
+            logger.warning("Could not start code runner workers: %s", exc)
+            return RunResult(STATUS_ERROR, error="The code runner is unavailable; please try again.")
+        job = {
+            "code": code,
+            **suite.to_dict(),
+            "timeout": RUN_TIMEOUT_SECONDS,
+            "cpu_seconds": RUN_CPU_SECONDS,
+            "memory_mb": RUN_MEMORY_MB,
+        }
+        # Waits here while every worker is busy with another candidate's run.
+        worker = self._idle.get()
+        try:
+            result = RunResult.from_dict(worker.run(job, RUN_TIMEOUT_SECONDS + WORKER_GRACE_SECONDS))
+        except (OSError, RuntimeError, TimeoutError, ValueError) as exc:
+            logger.warning("Replacing code runner worker: %s", exc)
+            worker.close()
+            with self._start_lock:
+                self._workers -= 1
+            try:
+                self.start()
+            except OSError as start_exc:
+                logger.warning("Could not replace code runner worker: %s", start_exc)
+            return RunResult(STATUS_ERROR, error="The code runner failed; please try again.")
+        self._idle.put(worker)
+        # Timeouts are cached too: the same code will time out again.
+        with self._cache_lock:
+            self._cache[key] = result
+            while len(self._cache) > RESULT_CACHE_SIZE:
+                self._cache.popitem(last=False)
+        return result
+
+
+_runner: Optional[CodeRunner] = None
+_runner_lock = threading.Lock()
+
+
+def get_code_runner() -> CodeRunner:
+    global _runner
+    if _runner is None:
+        with _runner_lock:
+            if _runner is None:
+                _runner = CodeRunner()
+    return _runner
+
+
+if __name__ == "__main__" and "--worker" in sys.argv:
+    _worker_main()
@@ -0,0 +1,161 @@
+"""Rolling-context engine for adaptive follow-up questions.
+
+In adaptive mode each question reacts to the candidate's previous answer. The
+prompt never carries the full transcript: earlier turns are folded into a
+compact extractive summary with a fixed character budget and only the latest
+exchange is included in full (truncated). The next question is generated
+speculatively on a worker thread while the candidate is still answering, so
+clicking "Next" usually finds it ready.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+SUMMARY_CHAR_BUDGET = 700
+TURN_QUESTION_CHARS = 90
+TURN_ANSWER_CHARS = 110
+LAST_ANSWER_CHARS = 600
+RECENT_QUESTIONS = 3
+# Speculate once an answer has some substance, and again only after it grew noticeably.
+SPECULATION_MIN_CHARS = 40
+SPECULATION_MIN_DELTA = 120
+# A speculative question is reused if the final answer only grew by this fraction.
+SPECULATION_REUSE_GROWTH = 0.25
+MAX_TRACKED_ENGINES = 1024
+
+FollowUpGenerator = Callable[[list[str], str], str]
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="follow-up")
+
+
+def _shorten(text: str, limit: int) -> str:
+    text = " ".join((text or "").split())
+    return text if len(text) <= limit else text[: limit - 1].rstrip() + "…"
+
+
+def _first_sentence(text: str) -> str:
+    match = re.match(r"(.+?[.!?])(\s|$)", " ".join((text or "").split()))
+    return match.group(1) if match else text
+
+
+class ConversationEngine:
+    def __init__(self) -> None:
+        self._lines: deque[str] = deque()
+        self._chars = 0
+        self._dropped = 0
+        self._summarized = 0
+        self._last_summarized: Optional[tuple[str, str]] = None
+        self._speculation: Optional[Future] = None
+        self._speculation_turn = -1
+        self._speculation_answer = ""
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------ summary
+    def _summary_line(self, number: int, question: str, answer: str) -> str:
+        answer_text = _shorten(_first_sentence(answer), TURN_ANSWER_CHARS) if answer.strip() else "(no answer)"
+        return f"Q{number}: {_shorten(question, TURN_QUESTION_CHARS)} → {answer_text}"
+
+    def _fold(self, questions: list[str], answers: list[str], upto: int) -> None:
+        """Fold turns ``[summarized, upto)`` into the rolling summary."""
+
+        if self._summarized > upto or (
+            self._summarized
+            and self._last_summarized != (questions[self._summarized - 1], answers[self._summarized - 1])
+        ):
+            # An earlier turn changed (edited answer or swapped question): rebuild.
+            self._lines.clear()
+            self._chars = self._dropped = self._summarized = 0
+        for index in range(self._summarized, upto):
+            line = self._summary_line(index + 1, questions[index], answers[index])
+            self._lines.append(line)
+            self._chars += len(line)
+            while self._chars > SUMMARY_CHAR_BUDGET and len(self._lines) > 1:
+                self._chars -= len(self._lines.popleft())
+                self._dropped += 1
+        self._summarized = upto
+        if upto:
+            self._last_summarized = (questions[upto - 1], answers[upto - 1])
+
+    def context(self, questions: list[str], answers: list[str]) -> str:
+        """Return the bounded prompt context: rolling summary plus the latest exchange."""
+
+        if not questions:
+            return ""
+        with self._lock:
+            self._fold(questions, answers, len(questions) - 1)
+            parts = []
+            if self._dropped:
+                parts.append(f"(Earlier: {self._dropped} more questions covered.)")
+            parts.extend(self._lines)
+        last_answer = answers[-1].strip() if answers else ""
+        parts.append(f"Latest question: {questions[-1]}")
+        parts.append(f"Candidate's answer: {_shorten(last_answer, LAST_ANSWER_CHARS) or '(no answer yet)'}")
+        return "\n".join(parts)
+
+    # ------------------------------------------------------------------ generation
+    def _generate(self, generate: FollowUpGenerator, questions: list[str], answers: list[str]) -> str:
+        return generate(questions[-RECENT_QUESTIONS:], self.context(questions, answers))
+
+    def speculate(self, generate: FollowUpGenerator, questions: list[str], answers: list[str]) -> None:
+        """Start generating the follow-up for the current partial answer if it is worth it."""
+
+        answer = answers[-1].strip() if answers else ""
+        turn = len(questions)
+        with self._lock:
+            if self._speculation is not None and not self._speculation.done():
+                return
+            if len(answer) < SPECULATION_MIN_CHARS:
+                return
+            if turn == self._speculation_turn and abs(len(answer) - len(self._speculation_answer)) < SPECULATION_MIN_DELTA:
+                return
+            self._speculation_turn = turn
+            self._speculation_answer = answer
+            self._speculation = _executor.submit(self._generate, generate, list(questions), list(answers))
+
+    def next_question(self, generate: FollowUpGenerator, questions: list[str], answers: list[str]) -> str:
+        """Return the follow-up, reusing the speculative result when the answer barely changed."""
+
+        answer = answers[-1].strip() if answers else ""
+        with self._lock:
+            speculation = self._speculation
+            reusable = (
+                speculation is not None
+                and self._speculation_turn == len(questions)
+                and answer.startswith(self._speculation_answer)
+                and len(answer) - len(self._speculation_answer)
+                <= max(len(self._speculation_answer) * SPECULATION_REUSE_GROWTH, 1)
+            )
+            self._speculation = None
+            self._speculation_turn = -1
+        if reusable:
+            try:
+                return speculation.result()
+            except Exception:
+                pass
+        return self._generate(generate, questions, answers)
+
+
+_engines: "OrderedDict[str, ConversationEngine]" = OrderedDict()
+_engines_lock = threading.Lock()
+
+
+def get_conversation_engine(token: str) -> ConversationEngine:
+    with _engines_lock:
+        engine = _engines.get(token)
+        if engine is None:
+            engine = ConversationEngine()
+            _engines[token] = engine
+        _engines.move_to_end(token)
+        while len(_engines) > MAX_TRACKED_ENGINES:
+            _engines.popitem(last=False)
+        return engine
+
+
+def discard_conversation_engine(token: str) -> None:
+    with _engines_lock:
+        _engines.pop(token, None)
@@ -0,0 +1,175 @@
+"""Instant, offline answer scoring from precomputed keyword indexes.
+
+For every (role profile, round) pair the concept lists in ``role_profiles`` are
+compiled once into a term vocabulary and a term→concept matrix. Scoring a whole
+interview then tokenizes each answer into 1–3-grams, builds one answer×term
+indicator matrix and derives concept coverage, structure (STAR markers for
+Behavioral) and length scores for all answers with a few NumPy operations.
+"""
+
+from __future__ import annotations
+
+import re
+from dataclasses import dataclass, field
+from functools import lru_cache
+
+import numpy as np
+
+from role_profiles import (
+    DEFAULT_LENGTH_TARGET,
+    DEFAULT_ROLE_TIPS,
+    LENGTH_TARGETS,
+    ROLE_PROFILES,
+    ROUND_CONCEPTS,
+    STAR_MARKERS,
+    STAR_LABELS,
+    STRUCTURE_MARKERS,
+    match_role_profile,
+)
+
+MAX_NGRAM = 3
+COVERAGE_TARGET = 3  # concepts an answer should touch for full coverage credit
+STRUCTURE_TARGET = 3
+WEIGHTS = (0.45, 0.30, 0.25)  # coverage, structure, length
+
+
+def tokenize(text: str) -> list[str]:
+    return re.findall(r"[a-z0-9+#]+", (text or "").lower().replace("%", " percent "))
+
+
+def _ngrams(tokens: list[str]) -> set[str]:
+    grams = set(tokens)
+    for size in range(2, MAX_NGRAM + 1):
+        grams.update(" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1))
+    return grams
+
+
+@dataclass(frozen=True)
+class _KeywordIndex:
+    vocabulary: dict[str, int]
+    term_concepts: np.ndarray  # (n_terms, n_concepts) uint8
+    topic_columns: slice
+    structure_columns: slice
+    concept_labels: tuple[str, ...]
+
+
+@lru_cache(maxsize=64)
+def _build_index(profile_name: str | None, round_key: str) -> _KeywordIndex:
+    topic_concepts = list(ROUND_CONCEPTS.get(round_key, []))
+    if profile_name:
+        topic_concepts = ROLE_PROFILES[profile_name]["concepts"] + topic_concepts
+    structure_concepts = STAR_MARKERS if round_key == "behavioral" else STRUCTURE_MARKERS
+    concepts = topic_concepts + structure_concepts
+
+    vocabulary: dict[str, int] = {}
+    pairs: list[tuple[int, int]] = []
+    for concept_id, terms in enumerate(concepts):
+        for term in terms:
+            key = " ".join(tokenize(term))
+            if key:
+                pairs.append((vocabulary.setdefault(key, len(vocabulary)), concept_id))
+    term_concepts = np.zeros((len(vocabulary), len(concepts)), dtype=np.uint8)
+    rows, cols = zip(*pairs)
+    term_concepts[list(rows), list(cols)] = 1
+    return _KeywordIndex(
+        vocabulary=vocabulary,
+        term_concepts=term_concepts,
+        topic_columns=slice(0, len(topic_concepts)),
+        structure_columns=slice(len(topic_concepts), len(concepts)),
+        concept_labels=tuple(terms[0] for terms in concepts),
+    )
+
+
+@dataclass(frozen=True)
+class AnswerFeedback:
+    score: int  # 0-10, 0 means the question was not answered
+    feedback: str
+    coverage: float
+    structure: float
+    length_ratio: float
+
+
+@dataclass
+class LocalFeedback:
+    answers: list[AnswerFeedback] = field(default_factory=list)
+    overall: list[str] = field(default_factory=list)
+
+
+def score_answers(
+    role: str,
+    round_type: str,
+    difficulty: str,
+    answers: list[str],
+) -> LocalFeedback:
+    """Score every answer of an interview at once and build the overall feedback list."""
+
+    profile_name = match_role_profile(role)
+    round_key = (round_type or "").lower()
+    is_behavioral = round_key == "behavioral"
+    index = _build_index(profile_name, round_key)
+    minimum, target = LENGTH_TARGETS.get((round_key, (difficulty or "").lower()), DEFAULT_LENGTH_TARGET)
+
+    n_answers = len(answers)
+    hits = np.zeros((n_answers, len(index.vocabulary)), dtype=np.uint8)
+    rows: list[int] = []
+    cols: list[int] = []
+    for row, answer in enumerate(answers):
+        for gram in _ngrams(tokenize(answer)):
+            term_id = index.vocabulary.get(gram)
+            if term_id is not None:
+                rows.append(row)
+                cols.append(term_id)
+    hits[rows, cols] = 1
+
+    concept_hits = (hits @ index.term_concepts) > 0
+    topic_hits = concept_hits[:, index.topic_columns]
+    structure_hits = concept_hits[:, index.structure_columns]
+    lengths = np.fromiter((len(answer.strip()) for answer in answers), dtype=np.float64, count=n_answers)
+
+    coverage = np.minimum(topic_hits.sum(axis=1) / COVERAGE_TARGET, 1.0)
+    structure_target = structure_hits.shape[1] if is_behavioral else STRUCTURE_TARGET
+    structure = np.minimum(structure_hits.sum(axis=1) / max(structure_target, 1), 1.0)
+    length_ratio = np.minimum(lengths / target, 1.0)
+    scores = np.rint(10 * (WEIGHTS[0] * coverage + WEIGHTS[1] * structure + WEIGHTS[2] * length_ratio))
+    scores = np.where(lengths > 0, np.maximum(scores, 1), 0).astype(int)
+
+    topic_labels = index.concept_labels[index.topic_columns]
+    result = LocalFeedback()
+    for row in range(n_answers):
+        if not lengths[row]:
+            result.answers.append(AnswerFeedback(0, "No response provided.", 0.0, 0.0, 0.0))
+            continue
+        notes = []
+        if lengths[row] < minimum:
+            notes.append("Expand with more detail and a concrete example.")
+        if is_behavioral:
+            missing = [label for label, hit in zip(STAR_LABELS, structure_hits[row]) if not hit]
+            if missing:
+                notes.append(f"Make the STAR structure explicit: add the {', '.join(missing)}.")
+        elif structure[row] < 0.5:
+            notes.append("Walk through your answer step by step and explain why.")
+        if coverage[row] < 1.0:
+            uncovered = [label for label, hit in zip(topic_labels, topic_hits[row]) if not hit][:2]
+            if uncovered:
+                notes.append(f"Consider touching on {' and '.join(uncovered)}.")
+        result.answers.append(
+            AnswerFeedback(
+                score=int(scores[row]),
+                feedback=" ".join(notes) or "Solid, well-structured answer.",
+                coverage=float(coverage[row]),
+                structure=float(structure[row]),
+                length_ratio=float(length_ratio[row]),
+            )
+        )
+
+    result.overall.append("✅ You completed all the interview questions!")
+    if n_answers and lengths.mean() < 100:
+        result.overall.append("🔧 Consider providing more detailed answers with specific examples.")
+    answered = lengths > 0
+    if answered.any():
+        if is_behavioral and structure[answered].mean() < 0.75:
+            result.overall.append("⭐ Use the STAR format (Situation, Task, Action, Result) in every story.")
+        if coverage[answered].mean() < 0.5:
+            result.overall.append("🧩 Reference more role-specific concepts to show depth.")
+    result.overall.extend(ROLE_PROFILES[profile_name]["tips"] if profile_name else DEFAULT_ROLE_TIPS)
+    return result
@@ -0,0 +1,106 @@
+from datetime import date, datetime, time as dt_time, timedelta
+
+import streamlit as st
+
+from history_store import DEFAULT_PAGE_SIZE, get_history_store
+from interview_export import EXPORT_FORMATS, export_bytes, export_chunks, history_entries
+
+ROUND_FILTERS = ["Any", "Warm Up", "Coding", "Role Related", "Behavioral"]
+DIFFICULTY_FILTERS = ["Any", "Beginner", "Professional"]
+
+
+def _reset_paging() -> None:
+    st.session_state.history_pages = []
+
+
+def render_history_page() -> None:
+    """Browse and search stored interviews, loading one page at a time."""
+
+    st.title("Interview History")
+    if st.button("⬅️ Back to Setup"):
+        st.query_params.clear()
+        st.rerun()
+
+    store = get_history_store()
+
+    col1, col2 = st.columns(2)
+    with col1:
+        keyword = st.text_input("Keyword", key="history_keyword", on_change=_reset_paging)
+        role = st.text_input("Role", key="history_role", on_change=_reset_paging)
+    with col2:
+        round_type = st.selectbox("Round", ROUND_FILTERS, key="history_round", on_change=_reset_paging)
+        difficulty = st.selectbox(
+            "Difficulty", DIFFICULTY_FILTERS, key="history_difficulty", on_change=_reset_paging
+        )
+    date_range = st.date_input(
+        "Finished between",
+        value=(date.today() - timedelta(days=90), date.today()),
+        key="history_dates",
+        on_change=_reset_paging,
+    )
+
+    since = until = None
+    if isinstance(date_range, (tuple, list)) and len(date_range) == 2:
+        since = datetime.combine(date_range[0], dt_time.min).timestamp()
+        until = datetime.combine(date_range[1] + timedelta(days=1), dt_time.min).timestamp()
+
+    filters = {
+        "keyword": keyword,
+        "role": role,
+        "round_type": "" if round_type == "Any" else round_type,
+        "difficulty": "" if difficulty == "Any" else difficulty,
+        "since": since,
+        "until": until,
+    }
+
+    # Each entry is one fetched page; "Load more" appends the next page using the
+    # last row as the keyset cursor instead of re-running an OFFSET scan.
+    pages = st.session_state.setdefault("history_pages", [])
+    if not pages:
+        pages.append(store.search(**filters, limit=DEFAULT_PAGE_SIZE))
+
+    records = [record for page in pages for record in page]
+    if not records:
+        st.info("No stored interviews match these filters yet.")
+        return
+
+    with st.expander("📦 Export matching interviews"):
+        fmt = st.selectbox(
+            "Format",
+            list(EXPORT_FORMATS),
+            index=list(EXPORT_FORMATS).index("jsonl"),
+            format_func=lambda ext: EXPORT_FORMATS[ext][0],
+            key="history_export_format",
+        )
+        # Every interview matching the filters, not just the loaded pages; the
+        # file is built from the store in batches only when clicked.
+        st.download_button(
+            "📥 Download",
+            data=lambda: export_bytes(export_chunks(history_entries(store, **filters), fmt)),
+            file_name=f"interview_history.{fmt}",
+            mime=EXPORT_FORMATS[fmt][1],
+        )
+
+    for record in records:
+        finished = datetime.fromtimestamp(record.finished_at).strftime("%Y-%m-%d %H:%M")
+        title = (
+            f"{finished} • {record.role or 'Unknown role'} • {record.round_type} • {record.difficulty} "
+            f"({record.answered_count}/{record.question_count} answered)"
+        )
+        with st.expander(title):
+            if record.company:
+                st.caption(record.company)
+            if st.button("Show transcript", key=f"history_show_{record.id}"):
+                session = store.load_session(record.id)
+                if session is None:
+                    st.warning("This interview could not be loaded.")
+                else:
+                    for index, (question, answer) in enumerate(session.iter_pairs()):
+                        st.markdown(f"**Question {index + 1}:** {question}")
+                        st.write(answer if answer else "_No response provided_")
+
+    last_page = pages[-1]
+    if len(last_page) == DEFAULT_PAGE_SIZE and st.button("Load more"):
+        last = last_page[-1]
+        pages.append(store.search(**filters, after=(last.finished_at, last.id), limit=DEFAULT_PAGE_SIZE))
+        st.rerun()
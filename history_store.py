@@ -0,0 +1,394 @@
+"""Persistent, searchable history of finished interviews.
+
+Finished sessions are stored in SQLite with their transcript as a compressed
+JSON blob and the question/answer text in an FTS5 index. Listing queries only
+touch the narrow ``interviews`` columns and page with a keyset cursor, so
+browsing stays fast no matter how many interviews have been stored.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Iterable, Iterator, Optional
+
+from interview_session import InterviewSession
+
+DEFAULT_HISTORY_DB = Path(__file__).resolve().parent / "data" / "interview_history.sqlite3"
+DEFAULT_PAGE_SIZE = 20
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS interviews (
+    id INTEGER PRIMARY KEY,
+    session_token TEXT UNIQUE,
+    role TEXT NOT NULL,
+    role_norm TEXT NOT NULL,
+    company TEXT NOT NULL,
+    round_type TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    finished_at REAL NOT NULL,
+    question_count INTEGER NOT NULL,
+    answered_count INTEGER NOT NULL,
+    transcript BLOB NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_interviews_finished ON interviews (finished_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS idx_interviews_role ON interviews (role_norm, finished_at DESC);
+CREATE INDEX IF NOT EXISTS idx_interviews_round ON interviews (round_type, difficulty, finished_at DESC);
+CREATE TABLE IF NOT EXISTS answer_metrics (
+    interview_id INTEGER NOT NULL,
+    question_index INTEGER NOT NULL,
+    round_type TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    finished_at REAL NOT NULL,
+    answer_chars INTEGER NOT NULL,
+    time_to_answer REAL NOT NULL,
+    locked INTEGER NOT NULL,
+    PRIMARY KEY (interview_id, question_index)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS answer_timings (
+    interview_id INTEGER NOT NULL,
+    question_index INTEGER NOT NULL,
+    first_input REAL NOT NULL,
+    settled REAL NOT NULL,
+    edits INTEGER NOT NULL,
+    audio_edits INTEGER NOT NULL,
+    bursts INTEGER NOT NULL,
+    visits INTEGER NOT NULL,
+    active_seconds REAL NOT NULL,
+    PRIMARY KEY (interview_id, question_index)
+) WITHOUT ROWID;
+CREATE VIRTUAL TABLE IF NOT EXISTS interviews_fts USING fts5(
+    role, company, questions, answers,
+    content='',
+    tokenize='porter unicode61'
+);
+"""
+
+_SUMMARY_COLUMNS = (
+    "id, role, company, round_type, difficulty, finished_at, question_count, answered_count"
+)
+
+
+def normalize_role(role: str) -> str:
+    return " ".join(re.findall(r"[a-z0-9+#]+", (role or "").lower()))
+
+
+def _answer_metric_rows(
+    interview_id: int, session: InterviewSession, finished_at: float
+) -> list[tuple]:
+    rows = []
+    for index, answer in enumerate(session.answers):
+        started = session.timer_starts[index]
+        answered = session.answered_at[index]
+        # -1 marks "unknown" so the analytics arrays stay plain float64.
+        time_to_answer = answered - started if started and answered >= started else -1.0
+        rows.append(
+            (
+                interview_id,
+                index,
+                session.round_type,
+                session.difficulty,
+                finished_at,
+                len(answer.strip()),
+                time_to_answer,
+                session.locked[index],
+            )
+        )
+    return rows
+
+
+def _answer_timing_rows(interview_id: int, session: InterviewSession) -> list[tuple]:
+    # Interviews recorded before timing telemetry existed have no events and no rows.
+    if not len(session.events):
+        return []
+    return [
+        (
+            interview_id,
+            index,
+            timing.first_input,
+            timing.settled,
+            timing.edits,
+            timing.audio_edits,
+            timing.bursts,
+            timing.visits,
+            timing.active_seconds,
+        )
+        for index, timing in enumerate(session.events.question_timings(session.total))
+    ]
+
+
+def _fts_query(keyword: str) -> str:
+    # Quote every term so user input can never be parsed as FTS5 syntax.
+    terms = re.findall(r"\w+", keyword or "")
+    return " ".join(f'"{term}"' for term in terms)
+
+
+@dataclass(slots=True)
+class InterviewRecord:
+    id: int
+    role: str
+    company: str
+    round_type: str
+    difficulty: str
+    finished_at: float
+    question_count: int
+    answered_count: int
+
+
+class HistoryStore:
+    def __init__(self, path: str | os.PathLike) -> None:
+        self.path = str(path)
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        with self._connection() as conn:
+            conn.executescript(_SCHEMA)
+            self._backfill_answer_metrics(conn)
+
+    def _backfill_answer_metrics(self, conn: sqlite3.Connection) -> None:
+        # Databases written before per-answer metrics existed only have transcripts.
+        if conn.execute("SELECT 1 FROM answer_metrics LIMIT 1").fetchone():
+            return
+        for interview_id, finished_at, transcript in conn.execute(
+            "SELECT id, finished_at, transcript FROM interviews"
+        ).fetchall():
+            session = InterviewSession.from_dict(json.loads(zlib.decompress(transcript).decode("utf-8")))
+            conn.executemany(
+                "INSERT OR IGNORE INTO answer_metrics VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                _answer_metric_rows(interview_id, session, finished_at),
+            )
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    # ------------------------------------------------------------------ writes
+    def save_interviews(
+        self,
+        sessions: Iterable[tuple[str, InterviewSession]],
+        finished_at: Optional[float] = None,
+    ) -> int:
+        """Store ``(token, session)`` pairs in one transaction and return how many were new."""
+
+        finished_at = time.time() if finished_at is None else finished_at
+        conn = self._connection()
+        inserted = 0
+        with conn:
+            for token, session in sessions:
+                transcript = zlib.compress(
+                    json.dumps(session.to_dict(), ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+                )
+                cursor = conn.execute(
+                    "INSERT OR IGNORE INTO interviews (session_token, role, role_norm, company, round_type, "
+                    "difficulty, finished_at, question_count, answered_count, transcript) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    (
+                        token,
+                        session.role,
+                        normalize_role(session.role),
+                        session.company,
+                        session.round_type,
+                        session.difficulty,
+                        finished_at,
+                        session.total,
+                        sum(1 for answer in session.answers if answer.strip()),
+                        transcript,
+                    ),
+                )
+                if not cursor.rowcount:
+                    continue
+                conn.execute(
+                    "INSERT INTO interviews_fts (rowid, role, company, questions, answers) VALUES (?, ?, ?, ?, ?)",
+                    (
+                        cursor.lastrowid,
+                        session.role,
+                        session.company,
+                        "\n".join(session.questions),
+                        "\n".join(session.answers),
+                    ),
+                )
+                conn.executemany(
+                    "INSERT OR IGNORE INTO answer_metrics VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    _answer_metric_rows(cursor.lastrowid, session, finished_at),
+                )
+                conn.executemany(
+                    "INSERT OR IGNORE INTO answer_timings VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    _answer_timing_rows(cursor.lastrowid, session),
+                )
+                inserted += 1
+        return inserted
+
+    def save_interview(self, token: str, session: InterviewSession) -> bool:
+        return bool(self.save_interviews([(token, session)]))
+
+    # ------------------------------------------------------------------ reads
+    @staticmethod
+    def _filters(
+        *,
+        role: str = "",
+        round_type: str = "",
+        difficulty: str = "",
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        keyword: str = "",
+        after: Optional[tuple[float, int]] = None,
+    ) -> tuple[str, list[object]]:
+        clauses: list[str] = []
+        params: list[object] = []
+        if role:
+            clauses.append("role_norm LIKE ?")
+            params.append(f"%{normalize_role(role)}%")
+        if round_type:
+            clauses.append("round_type = ?")
+            params.append(round_type)
+        if difficulty:
+            clauses.append("difficulty = ?")
+            params.append(difficulty)
+        if since is not None:
+            clauses.append("finished_at >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("finished_at < ?")
+            params.append(until)
+        match = _fts_query(keyword)
+        if match:
+            clauses.append("id IN (SELECT rowid FROM interviews_fts WHERE interviews_fts MATCH ?)")
+            params.append(match)
+        if after is not None:
+            clauses.append("(finished_at < ? OR (finished_at = ? AND id < ?))")
+            params.extend([after[0], after[0], after[1]])
+        return (f"WHERE {' AND '.join(clauses)}" if clauses else ""), params
+
+    def search(
+        self,
+        *,
+        role: str = "",
+        round_type: str = "",
+        difficulty: str = "",
+        since: Optional[float] = None,
+        until: Optional[float] = None,
+        keyword: str = "",
+        after: Optional[tuple[float, int]] = None,
+        limit: int = DEFAULT_PAGE_SIZE,
+    ) -> list[InterviewRecord]:
+        """Return one page of interviews, newest first.
+
+        ``after`` is the ``(finished_at, id)`` of the last row of the previous
+        page; paging by that key keeps deep pages as cheap as the first one.
+        """
+
+        where, params = self._filters(
+            role=role,
+            round_type=round_type,
+            difficulty=difficulty,
+            since=since,
+            until=until,
+            keyword=keyword,
+            after=after,
+        )
+        rows = self._connection().execute(
+            f"SELECT {_SUMMARY_COLUMNS} FROM interviews {where} "
+            "ORDER BY finished_at DESC, id DESC LIMIT ?",
+            (*params, limit),
+        ).fetchall()
+        return [InterviewRecord(*row) for row in rows]
+
+    def iter_sessions(
+        self, *, batch_size: int = DEFAULT_PAGE_SIZE, **filters: Any
+    ) -> Iterator[tuple[InterviewRecord, InterviewSession]]:
+        """Yield every matching interview with its transcript, newest first.
+
+        Rows are fetched ``batch_size`` at a time with the same keyset cursor as
+        ``search`` and no cursor is held between batches, so a bulk export keeps
+        one batch in memory and each batch may be read from a different thread.
+        """
+
+        after: Optional[tuple[float, int]] = None
+        while True:
+            where, params = self._filters(after=after, **filters)
+            rows = self._connection().execute(
+                f"SELECT {_SUMMARY_COLUMNS}, transcript FROM interviews {where} "
+                "ORDER BY finished_at DESC, id DESC LIMIT ?",
+                (*params, batch_size),
+            ).fetchall()
+            for *summary, transcript in rows:
+                record = InterviewRecord(*summary)
+                yield record, InterviewSession.from_dict(json.loads(zlib.decompress(transcript).decode("utf-8")))
+            if len(rows) < batch_size:
+                return
+            after = (rows[-1][5], rows[-1][0])
+
+    def load_session(self, interview_id: int) -> Optional[InterviewSession]:
+        row = self._connection().execute(
+            "SELECT transcript FROM interviews WHERE id = ?", (interview_id,)
+        ).fetchone()
+        if row is None:
+            return None
+        return InterviewSession.from_dict(json.loads(zlib.decompress(row[0]).decode("utf-8")))
+
+    def answer_metrics_after(self, interview_id: int) -> list[tuple]:
+        """Return per-answer metric rows for interviews stored after ``interview_id``."""
+
+        return self._connection().execute(
+            "SELECT interview_id, round_type, difficulty, finished_at, answer_chars, time_to_answer, locked "
+            "FROM answer_metrics WHERE interview_id > ? ORDER BY interview_id, question_index",
+            (interview_id,),
+        ).fetchall()
+
+    def answer_timings_between(self, after_id: int, upto_id: int) -> list[tuple]:
+        """Return per-answer timing rows for interviews with ``after_id < id <= upto_id``."""
+
+        return self._connection().execute(
+            "SELECT m.round_type, m.difficulty, t.first_input, t.settled, t.bursts, t.visits "
+            "FROM answer_timings t JOIN answer_metrics m USING (interview_id, question_index) "
+            "WHERE t.interview_id > ? AND t.interview_id <= ? ORDER BY t.interview_id, t.question_index",
+            (after_id, upto_id),
+        ).fetchall()
+
+    def recent_questions(self, *, role: str, round_type: str, limit: int) -> list[str]:
+        """Return up to ``limit`` questions from the newest interviews for this role and round."""
+
+        questions: list[str] = []
+        rows = self._connection().execute(
+            "SELECT transcript FROM interviews WHERE role_norm = ? AND round_type = ? "
+            "ORDER BY finished_at DESC LIMIT ?",
+            (normalize_role(role), round_type, limit),
+        )
+        for (transcript,) in rows:
+            questions.extend(json.loads(zlib.decompress(transcript).decode("utf-8")).get("questions", []))
+            if len(questions) >= limit:
+                break
+        return questions[:limit]
+
+    def latest_interview_id(self) -> int:
+        return self._connection().execute("SELECT COALESCE(MAX(id), 0) FROM interviews").fetchone()[0]
+
+    def count(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM interviews").fetchone()[0]
+
+
+_store: Optional[HistoryStore] = None
+_store_lock = threading.Lock()
+
+
+def get_history_store() -> HistoryStore:
+    """Return the process-wide history store (``INTERVIEW_HISTORY_DB`` overrides the path)."""
+
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = HistoryStore(os.getenv("INTERVIEW_HISTORY_DB") or DEFAULT_HISTORY_DB)
+    return _store
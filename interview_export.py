@@ -0,0 +1,149 @@
+"""Lazy, chunked export of interview transcripts.
+
+Exports are generators that yield one small chunk per question (or per
+interview for the JSON formats), so nothing is produced until a download is
+actually requested. The API streams the chunks straight to the client, so a
+bulk export there holds one batch of interviews in memory at a time.
+Streamlit downloads need the whole file, so ``export_bytes`` joins the chunks
+when the button is clicked; use the API for very large exports.
+
+Formats: ``txt`` (the original plain transcript), ``md``, ``json`` (one array
+of interviews) and ``jsonl`` (one interview per line, for batch processing).
+"""
+
+from __future__ import annotations
+
+import io
+import json
+from datetime import datetime
+from typing import Any, Iterable, Iterator, Optional
+
+from interview_session import InterviewSession
+
+# Extension -> (label, MIME type); the first entry is the default format.
+EXPORT_FORMATS: dict[str, tuple[str, str]] = {
+    "txt": ("Text", "text/plain"),
+    "md": ("Markdown", "text/markdown"),
+    "json": ("JSON", "application/json"),
+    "jsonl": ("JSON Lines", "application/x-ndjson"),
+}
+
+
+def interview_entry(
+    questions: list,
+    answers: dict,
+    grades: Optional[list] = None,
+    **details: Any,
+) -> dict[str, Any]:
+    """Return the export form of one interview.
+
+    ``details`` carries optional metadata (role, company, round_type,
+    difficulty, finished_at); the single-interview download leaves it empty.
+    """
+
+    items = []
+    for i, question in enumerate(questions):
+        item: dict[str, Any] = {"question": question, "answer": answers.get(i, "")}
+        grade = grades[i] if grades and i < len(grades) else None
+        if grade and grade.score:
+            item["score"] = grade.score
+            item["feedback"] = grade.feedback
+        items.append(item)
+    return {**{key: value for key, value in details.items() if value not in (None, "")}, "questions": items}
+
+
+def session_entry(session: InterviewSession, finished_at: Optional[float] = None) -> dict[str, Any]:
+    return interview_entry(
+        session.questions,
+        session.answers_by_index(),
+        role=session.role,
+        company=session.company,
+        round_type=session.round_type,
+        difficulty=session.difficulty,
+        finished_at=finished_at,
+    )
+
+
+def history_entries(store, **filters: Any) -> Iterator[dict[str, Any]]:
+    """Yield the export form of every stored interview matching ``filters``."""
+
+    for record, session in store.iter_sessions(**filters):
+        yield session_entry(session, record.finished_at)
+
+
+def _heading(entry: dict[str, Any]) -> str:
+    parts = [entry.get("role") or "Interview"]
+    if entry.get("round_type"):
+        parts.append(entry["round_type"])
+    if entry.get("difficulty"):
+        parts.append(entry["difficulty"])
+    if entry.get("company"):
+        parts.append(entry["company"])
+    if entry.get("finished_at"):
+        parts.append(datetime.fromtimestamp(entry["finished_at"]).strftime("%Y-%m-%d %H:%M"))
+    return " • ".join(parts)
+
+
+def _text_chunks(entries: Iterable[dict[str, Any]]) -> Iterator[str]:
+    for n, entry in enumerate(entries):
+        if n:
+            yield "\n\n\n"
+        if entry.keys() != {"questions"}:
+            yield f"=== {_heading(entry)} ===\n\n"
+        for i, item in enumerate(entry["questions"]):
+            if i:
+                yield "\n\n"
+            yield f"Question {i+1}: {item['question']}\nAnswer: {item['answer'] or 'No response'}"
+            if "score" in item:
+                yield f"\nScore: {item['score']}/10 - {item['feedback']}"
+
+
+def _markdown_chunks(entries: Iterable[dict[str, Any]]) -> Iterator[str]:
+    for n, entry in enumerate(entries):
+        if n:
+            yield "\n"
+        yield f"# {_heading(entry)}\n"
+        for i, item in enumerate(entry["questions"]):
+            answer = item["answer"] or "_No response provided_"
+            yield f"\n## Question {i+1}\n\n{item['question']}\n\n**Your Answer:**\n\n{answer}\n"
+            if "score" in item:
+                yield f"\n**Score:** {item['score']}/10 — {item['feedback']}\n"
+
+
+def _json_chunks(entries: Iterable[dict[str, Any]]) -> Iterator[str]:
+    yield "["
+    for n, entry in enumerate(entries):
+        yield ("," if n else "") + "\n" + json.dumps(entry, ensure_ascii=False)
+    yield "\n]\n"
+
+
+def _jsonl_chunks(entries: Iterable[dict[str, Any]]) -> Iterator[str]:
+    for entry in entries:
+        yield json.dumps(entry, ensure_ascii=False) + "\n"
+
+
+_WRITERS = {
+    "txt": _text_chunks,
+    "md": _markdown_chunks,
+    "json": _json_chunks,
+    "jsonl": _jsonl_chunks,
+}
+
+
+def export_chunks(entries: Iterable[dict[str, Any]], fmt: str) -> Iterator[str]:
+    """Yield the export of ``entries`` in ``fmt`` as a stream of text chunks."""
+
+    try:
+        writer = _WRITERS[fmt]
+    except KeyError:
+        raise ValueError(f"Unknown export format {fmt!r}; expected one of {', '.join(EXPORT_FORMATS)}.") from None
+    return writer(entries)
+
+
+def export_bytes(chunks: Iterable[str]) -> bytes:
+    """Return the UTF-8 encoded export, for callers that need the whole file."""
+
+    buffer = io.BytesIO()
+    for chunk in chunks:
+        buffer.write(chunk.encode("utf-8"))
+    return buffer.getvalue()
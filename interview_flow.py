@@ -1,8 +1,46 @@
 import streamlit as st
 
+from interview_sets import get_interview_set_store
+
+DEFAULT_QUESTION_COUNT = 5
+# Marathon sessions generate as they go, keeping a few questions ready ahead of the cursor.
+MARATHON_MIN_QUESTIONS = 25
+MARATHON_MAX_QUESTIONS = 100
+
+
+def question_count_from(value: str | None) -> int:
+    """Number of questions for a session from the ``length`` query param."""
+
+    try:
+        length = int(value) if value else DEFAULT_QUESTION_COUNT
+    except ValueError:
+        return DEFAULT_QUESTION_COUNT
+    if length <= DEFAULT_QUESTION_COUNT:
+        return DEFAULT_QUESTION_COUNT
+    return max(MARATHON_MIN_QUESTIONS, min(length, MARATHON_MAX_QUESTIONS))
+
 
 def handle_practice_navigation() -> bool:
     """Update query params when practice starts and report whether practice mode is active."""
+    set_code = st.query_params.get("set")
+    if set_code and st.query_params.get("page") != "practice":
+        # A shared set carries its own configuration, so the link alone starts practice.
+        interview_set = get_interview_set_store().get(set_code)
+        if interview_set is None:
+            del st.query_params["set"]
+            st.session_state.set_code_error = f"No interview set found for code {set_code}."
+            return False
+        st.query_params.clear()
+        st.query_params.update(
+            page="practice",
+            round=interview_set.round_type,
+            difficulty=interview_set.difficulty,
+            role=interview_set.role,
+            company=interview_set.company,
+            set=interview_set.code,
+        )
+        st.rerun()
+
     if st.session_state.get("start_practice", False):
         st.session_state.start_practice = False
 
@@ -10,8 +48,21 @@ def handle_practice_navigation() -> bool:
         selected_difficulty = st.session_state.get("difficulty_radio", "Professional")
         role = st.session_state.get("role", "Software Engineer")
         company = st.session_state.get("company", "")
+        adaptive = st.session_state.get("adaptive_checkbox", False)
+        use_bank = st.session_state.get("bank_checkbox", False)
+        marathon = st.session_state.get("marathon_checkbox", False)
 
         params = dict(st.query_params)
+        params.pop("mode", None)
+        params.pop("source", None)
+        params.pop("set", None)
+        params.pop("length", None)
+        if adaptive:
+            params["mode"] = "adaptive"
+        if use_bank:
+            params["source"] = "bank"
+        if marathon:
+            params["length"] = str(st.session_state.get("marathon_length", MARATHON_MIN_QUESTIONS))
         params.update(
             {
                 "page": "practice",
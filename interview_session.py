@@ -0,0 +1,272 @@
+"""Typed container for one practice interview.
+
+The practice flow used to keep its state in loose ``st.session_state`` keys
+(``questions``, ``answers``, ``question_timers``, ``question_locked`` ...).
+``InterviewSession`` groups all of it in a single slotted object with
+array-backed per-question fields so the footprint of a session only depends
+on the number of questions and the answer text.
+"""
+
+from __future__ import annotations
+
+import sys
+import uuid
+from array import array
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Iterator, MutableMapping
+
+from answer_telemetry import AnswerEventLog
+
+if TYPE_CHECKING:
+    from session_registry import SessionRegistry
+
+SESSION_STATE_KEY = "interview_session"
+SESSION_TOKEN_KEY = "interview_session_token"
+ANSWER_WIDGET_PREFIX = "answer_input_"
+CODE_WIDGET_PREFIX = "code_input_"
+CODE_RESULT_PREFIX = "code_result_"
+
+# Keys owned by the practice flow that must be dropped when an interview is reset.
+PRACTICE_FLAG_KEYS = (
+    "paused",
+    "audio_mode_enabled",
+    "audio_checkbox",
+    "ai_grading_requested",
+    "shared_set_code",
+    "summary_page",
+    "summary_export_format",
+    "history_save_error",
+)
+
+
+def answer_widget_key(index: int) -> str:
+    """Return the Streamlit widget key used by the response area of a question."""
+
+    return f"{ANSWER_WIDGET_PREFIX}{index}"
+
+
+def code_widget_keys(index: int) -> tuple[str, str]:
+    """Return the code editor and last test run keys of a Coding question."""
+
+    return f"{CODE_WIDGET_PREFIX}{index}", f"{CODE_RESULT_PREFIX}{index}"
+
+
+@dataclass(slots=True)
+class InterviewSession:
+    role: str = ""
+    company: str = ""
+    round_type: str = ""
+    difficulty: str = ""
+    questions: list[str] = field(default_factory=list)
+    answers: list[str] = field(default_factory=list)
+    # Timer start per question as a wall-clock timestamp, 0.0 means "not started".
+    timer_starts: array = field(default_factory=lambda: array("d"))
+    # Wall-clock time of the latest answer edit per question, 0.0 means "unanswered".
+    answered_at: array = field(default_factory=lambda: array("d"))
+    locked: bytearray = field(default_factory=bytearray)
+    # Per-question timing events (views, edits, navigation), see answer_telemetry.
+    events: AnswerEventLog = field(default_factory=AnswerEventLog)
+    current_index: int = 0
+    finished: bool = False
+
+    # ------------------------------------------------------------------ lifecycle
+    def load_questions(self, questions: list[str]) -> None:
+        """Install a freshly generated question set and size the per-question arrays."""
+
+        count = len(questions)
+        self.questions = list(questions)
+        self.answers = [""] * count
+        self.timer_starts = array("d", bytes(8 * count))
+        self.answered_at = array("d", bytes(8 * count))
+        self.locked = bytearray(count)
+        self.events = AnswerEventLog()
+        self.current_index = 0
+        self.finished = False
+
+    def finish(self) -> None:
+        self.finished = True
+
+    def reset(self) -> None:
+        """Drop all questions and answers while keeping the interview configuration."""
+
+        self.questions = []
+        self.answers = []
+        self.timer_starts = array("d")
+        self.answered_at = array("d")
+        self.locked = bytearray()
+        self.events = AnswerEventLog()
+        self.current_index = 0
+        self.finished = False
+
+    # ------------------------------------------------------------------ accessors
+    @property
+    def total(self) -> int:
+        return len(self.questions)
+
+    @property
+    def has_questions(self) -> bool:
+        return bool(self.questions)
+
+    @property
+    def current_question(self) -> str:
+        return self.questions[self.current_index]
+
+    def answer(self, index: int) -> str:
+        if 0 <= index < len(self.answers):
+            return self.answers[index]
+        return ""
+
+    def set_answer(self, index: int, text: str | None, at: float | None = None) -> None:
+        self.answers[index] = text or ""
+        if at is not None:
+            self.answered_at[index] = at
+
+    def answers_by_index(self) -> dict[int, str]:
+        """Return answers keyed by question index for the summary helpers."""
+
+        return dict(enumerate(self.answers))
+
+    def iter_pairs(self) -> Iterator[tuple[str, str]]:
+        return zip(self.questions, self.answers)
+
+    def timer_start(self, index: int) -> float | None:
+        value = self.timer_starts[index]
+        return value or None
+
+    def start_timer(self, index: int, now: float) -> float:
+        """Start the countdown for ``index`` if needed and return its start time."""
+
+        if not self.timer_starts[index]:
+            self.timer_starts[index] = now
+        return self.timer_starts[index]
+
+    def is_locked(self, index: int) -> bool:
+        return bool(self.locked[index]) if 0 <= index < len(self.locked) else False
+
+    def lock(self, index: int) -> None:
+        self.locked[index] = 1
+
+    def append_question(self, question: str) -> None:
+        """Add one more question, as adaptive mode does when the candidate moves on."""
+
+        self.questions.append(question)
+        self.answers.append("")
+        self.timer_starts.append(0.0)
+        self.answered_at.append(0.0)
+        self.locked.append(0)
+
+    def replace_question(self, index: int, question: str) -> None:
+        """Swap in a new question and reset that slot's answer, timer and lock."""
+
+        self.questions[index] = question
+        self.answers[index] = ""
+        self.timer_starts[index] = 0.0
+        self.answered_at[index] = 0.0
+        self.locked[index] = 0
+
+    def go_to(self, index: int) -> None:
+        if self.questions:
+            self.current_index = max(0, min(index, len(self.questions) - 1))
+
+    # ------------------------------------------------------------------ persistence
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "role": self.role,
+            "company": self.company,
+            "round_type": self.round_type,
+            "difficulty": self.difficulty,
+            "questions": list(self.questions),
+            "answers": list(self.answers),
+            "timer_starts": self.timer_starts.tolist(),
+            "answered_at": self.answered_at.tolist(),
+            "locked": list(self.locked),
+            "events": self.events.to_dict(),
+            "current_index": self.current_index,
+            "finished": self.finished,
+        }
+
+    @classmethod
+    def from_dict(cls, data: dict[str, Any]) -> "InterviewSession":
+        session = cls(
+            role=data.get("role", ""),
+            company=data.get("company", ""),
+            round_type=data.get("round_type", ""),
+            difficulty=data.get("difficulty", ""),
+        )
+        session.load_questions(data.get("questions", []))
+        for index, answer in enumerate(data.get("answers", [])[: session.total]):
+            session.answers[index] = answer or ""
+        for index, started in enumerate(data.get("timer_starts", [])[: session.total]):
+            session.timer_starts[index] = float(started)
+        for index, answered in enumerate(data.get("answered_at", [])[: session.total]):
+            session.answered_at[index] = float(answered)
+        for index, flag in enumerate(data.get("locked", [])[: session.total]):
+            session.locked[index] = 1 if flag else 0
+        if data.get("events"):
+            session.events = AnswerEventLog.from_dict(data["events"])
+        session.go_to(int(data.get("current_index", 0)))
+        session.finished = bool(data.get("finished", False))
+        return session
+
+    # ------------------------------------------------------------------ sizing
+    def approx_size(self) -> int:
+        """Return an estimate of the bytes held by this session."""
+
+        size = sys.getsizeof(self)
+        for value in (self.role, self.company, self.round_type, self.difficulty):
+            size += sys.getsizeof(value)
+        size += sys.getsizeof(self.questions) + sum(sys.getsizeof(q) for q in self.questions)
+        size += sys.getsizeof(self.answers) + sum(sys.getsizeof(a) for a in self.answers)
+        size += sys.getsizeof(self.timer_starts) + sys.getsizeof(self.answered_at)
+        size += sys.getsizeof(self.locked) + self.events.approx_size()
+        return size
+
+
+def get_interview_session(
+    state: MutableMapping[str, Any],
+    registry: "SessionRegistry | None" = None,
+) -> InterviewSession:
+    """Return the session for ``state``, creating an empty one on first use.
+
+    Without a registry the session object lives directly in ``state``. With a
+    registry, ``state`` only keeps a short token and the registry owns the
+    object so idle sessions can be spilled to disk and restored later.
+    """
+
+    if registry is None:
+        session = state.get(SESSION_STATE_KEY)
+        if not isinstance(session, InterviewSession):
+            session = InterviewSession()
+            state[SESSION_STATE_KEY] = session
+        return session
+
+    token = state.get(SESSION_TOKEN_KEY)
+    if not token:
+        token = uuid.uuid4().hex
+        state[SESSION_TOKEN_KEY] = token
+    session = registry.get(token)
+    if session is None:
+        session = InterviewSession()
+        registry.put(token, session)
+    return session
+
+
+def reset_interview_state(
+    state: MutableMapping[str, Any],
+    registry: "SessionRegistry | None" = None,
+) -> None:
+    """Reset the stored session and drop every widget key the practice flow created."""
+
+    if registry is None:
+        session = state.get(SESSION_STATE_KEY)
+    else:
+        token = state.get(SESSION_TOKEN_KEY)
+        session = registry.get(token) if token else None
+    if isinstance(session, InterviewSession):
+        session.reset()
+    stale_keys = [
+        key for key in list(state.keys())
+        if isinstance(key, str) and key.startswith((ANSWER_WIDGET_PREFIX, CODE_WIDGET_PREFIX, CODE_RESULT_PREFIX))
+    ]
+    for key in [*stale_keys, *PRACTICE_FLAG_KEYS]:
+        state.pop(key, None)
@@ -0,0 +1,164 @@
+"""Shareable pre-generated interview sets.
+
+A set is one generated question list stored under a short code, so a whole
+cohort practising the same interview costs a single generation: everyone who
+opens ``?set=<code>`` loads the stored questions instead of calling Gemini.
+Sets live in the history database and are cached in memory once read, so
+starting from a set is a dictionary lookup. A set can ask for a per-user
+order, which is shuffled deterministically from the user's session token.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import random
+import re
+import secrets
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from history_store import DEFAULT_HISTORY_DB
+
+CODE_ALPHABET = "ABCDEFGHJKMNPQRSTUVWXYZ23456789"  # No 0/O or 1/I/L to misread.
+CODE_LENGTH = 8
+MAX_CACHED_SETS = 512
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS interview_sets (
+    code TEXT PRIMARY KEY,
+    role TEXT NOT NULL,
+    company TEXT NOT NULL,
+    round_type TEXT NOT NULL,
+    difficulty TEXT NOT NULL,
+    questions TEXT NOT NULL,
+    shuffle INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+"""
+
+
+@dataclass(frozen=True)
+class InterviewSet:
+    code: str
+    role: str
+    company: str
+    round_type: str
+    difficulty: str
+    questions: tuple[str, ...]
+    shuffle: bool = False
+
+    def questions_for(self, seed: Optional[str] = None) -> list[str]:
+        """Return the questions, in a stable per-user order when the set shuffles."""
+
+        questions = list(self.questions)
+        if self.shuffle and seed:
+            random.Random(f"{self.code}:{seed}").shuffle(questions)
+        return questions
+
+
+def normalize_code(code: Optional[str]) -> Optional[str]:
+    cleaned = re.sub(r"[^A-Za-z0-9]", "", code or "").upper()
+    if len(cleaned) != CODE_LENGTH or any(char not in CODE_ALPHABET for char in cleaned):
+        return None
+    return cleaned
+
+
+class InterviewSetStore:
+    def __init__(self, path: str | os.PathLike) -> None:
+        self.path = str(path)
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        self._cache: "OrderedDict[str, InterviewSet]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        with self._connection() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _remember(self, interview_set: InterviewSet) -> None:
+        with self._cache_lock:
+            self._cache[interview_set.code] = interview_set
+            self._cache.move_to_end(interview_set.code)
+            while len(self._cache) > MAX_CACHED_SETS:
+                self._cache.popitem(last=False)
+
+    def create(
+        self,
+        *,
+        role: str,
+        company: str,
+        round_type: str,
+        difficulty: str,
+        questions: list[str],
+        shuffle: bool = False,
+    ) -> InterviewSet:
+        """Store a question list under a new code and return the set."""
+
+        if not questions:
+            raise ValueError("An interview set needs at least one question.")
+        conn = self._connection()
+        while True:
+            code = "".join(secrets.choice(CODE_ALPHABET) for _ in range(CODE_LENGTH))
+            try:
+                with conn:
+                    conn.execute(
+                        "INSERT INTO interview_sets VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        (code, role, company, round_type, difficulty, json.dumps(questions), int(shuffle), time.time()),
+                    )
+                break
+            except sqlite3.IntegrityError:
+                continue  # Code collision; draw another.
+        interview_set = InterviewSet(code, role, company, round_type, difficulty, tuple(questions), shuffle)
+        self._remember(interview_set)
+        return interview_set
+
+    def get(self, code: Optional[str]) -> Optional[InterviewSet]:
+        code = normalize_code(code)
+        if code is None:
+            return None
+        with self._cache_lock:
+            cached = self._cache.get(code)
+            if cached is not None:
+                self._cache.move_to_end(code)
+                return cached
+        row = self._connection().execute(
+            "SELECT role, company, round_type, difficulty, questions, shuffle FROM interview_sets WHERE code = ?",
+            (code,),
+        ).fetchone()
+        if row is None:
+            return None
+        role, company, round_type, difficulty, questions, shuffle = row
+        interview_set = InterviewSet(
+            code, role, company, round_type, difficulty, tuple(json.loads(questions)), bool(shuffle)
+        )
+        self._remember(interview_set)
+        return interview_set
+
+
+_store: Optional[InterviewSetStore] = None
+_store_lock = threading.Lock()
+
+
+def get_interview_set_store() -> InterviewSetStore:
+    """Return the process-wide set store, kept in the history database."""
+
+    global _store
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = InterviewSetStore(os.getenv("INTERVIEW_HISTORY_DB") or DEFAULT_HISTORY_DB)
+    return _store
@@ -1,19 +1,73 @@
+import hashlib
+import json
+import logging
 import os
+import string
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
 from typing import Optional, Dict, Any, List, Tuple
 
-import google.generativeai as genai
-from google.generativeai.types import HarmCategory, HarmBlockThreshold
+from circuit_breaker import CircuitOpenError, get_provider_breaker, is_transient_error
+from model_router import (
+    TASK_FOLLOW_UP,
+    TASK_GRADING,
+    TASK_QUESTION,
+    TASK_TEST_SUITE,
+    TASK_VALIDATION,
+    RouteDecision,
+    get_model_router,
+)
+from offline_provider import OfflineModel, is_offline_provider
+from token_budget import (
+    MAX_ESCALATIONS,
+    QUESTION_STOP_SEQUENCES,
+    get_token_budgeter,
+    hit_max_tokens,
+    usage_from_response,
+)
+from question_index import QuestionIndex, is_near_duplicate
+from usage_ledger import BudgetExceededError, UsageLedger, get_usage_ledger, key_hash
 
-DEFAULT_GEMINI_MODEL = "gemini-2.5-pro"
-GEMINI_MODEL = os.getenv("GEMINI_MODEL", DEFAULT_GEMINI_MODEL)
+logger = logging.getLogger(__name__)
+
+# Only the most recent questions go into the prompt as an "avoid" hint; everything
+# else is caught by the local near-duplicate check after generation.
+MAX_AVOID_HINTS = 5
+DEDUP_MAX_ATTEMPTS = 3
+LLM_REQUEST_TIMEOUT_SECONDS = float(os.getenv("LLM_REQUEST_TIMEOUT_SECONDS", "60"))
+# A call counts as slow for the circuit breaker past this multiple of its task's latency SLO.
+SLOW_CALL_SLO_FACTOR = float(os.getenv("LLM_SLOW_CALL_SLO_FACTOR", "2"))
 
 DEFAULT_GENERATION_CONFIG: dict[str, float | int] = {
     "temperature": 0.75,
     "top_p": 0.9,
     "top_k": 40,
-    "max_output_tokens": 3000,  # Increased from 2048 to handle longer responses
+    "max_output_tokens": 3000,  # Ceiling; each question starts from a learned per-round budget
 }
 
+
+
+class HarmCategory:
+    """Safety category names. The SDK accepts these strings wherever it takes its own enums,
+    so the settings UI does not have to import google.generativeai to render."""
+
+    HARM_CATEGORY_HARASSMENT = "HARM_CATEGORY_HARASSMENT"
+    HARM_CATEGORY_HATE_SPEECH = "HARM_CATEGORY_HATE_SPEECH"
+    HARM_CATEGORY_SEXUALLY_EXPLICIT = "HARM_CATEGORY_SEXUALLY_EXPLICIT"
+    HARM_CATEGORY_DANGEROUS_CONTENT = "HARM_CATEGORY_DANGEROUS_CONTENT"
+
+
+class HarmBlockThreshold:
+    BLOCK_NONE = "BLOCK_NONE"
+    BLOCK_ONLY_HIGH = "BLOCK_ONLY_HIGH"
+    BLOCK_MEDIUM_AND_ABOVE = "BLOCK_MEDIUM_AND_ABOVE"
+    BLOCK_LOW_AND_ABOVE = "BLOCK_LOW_AND_ABOVE"
+
+
 # Default safety settings - block medium or higher probability of unsafe content
 DEFAULT_SAFETY_SETTINGS = {
     HarmCategory.HARM_CATEGORY_HARASSMENT: HarmBlockThreshold.BLOCK_MEDIUM_AND_ABOVE,
@@ -23,6 +77,34 @@ DEFAULT_SAFETY_SETTINGS = {
 }
 
 
+_sdk_preload_started = False
+_sdk_preload_lock = threading.Lock()
+
+
+def _genai():
+    """Import the Gemini SDK on first use.
+
+    google.generativeai pulls in protobuf and gRPC and is by far the slowest
+    import in the app, so nothing imports it at module load.
+    """
+
+    import google.generativeai as genai
+
+    return genai
+
+
+def preload_sdk() -> None:
+    """Import the Gemini SDK on a background thread so the first request does not pay for it."""
+
+    global _sdk_preload_started
+    if is_offline_provider() or "google.generativeai" in sys.modules:
+        return
+    with _sdk_preload_lock:
+        if _sdk_preload_started:
+            return
+        _sdk_preload_started = True
+    threading.Thread(target=_genai, name="gemini-sdk-preload", daemon=True).start()
+
 
 def _merge_generation_config(
     overrides: Optional[dict[str, float | int]] = None,
@@ -62,26 +144,374 @@ def _extract_text_from_response(response) -> str:
     return ""
 
 
+@dataclass(frozen=True)
+class PromptTemplate:
+    """A prompt split into a fixed instruction prefix and a compiled per-call body.
+
+    The prefix never changes between calls, so it is sent once as the model's
+    system instruction instead of with every request.
+    """
+
+    system_instruction: str
+    body: string.Template
+
+    def render(self, **fields: Any) -> str:
+        return self.body.substitute(fields)
+
+
+QUESTION_PROMPT = PromptTemplate(
+    system_instruction=(
+        "You are an expert interview coach. For each request you receive the candidate's role, "
+        "company, interview round and difficulty, plus questions that were already asked. "
+        "Generate exactly ONE interview question. The question should be challenging and relevant "
+        "to the role and company, must not repeat a previously asked question, and is returned "
+        "on its own without any preamble."
+    ),
+    body=string.Template(
+        """Role: $role
+Company: $company
+Round: $round_type
+Difficulty: $difficulty
+
+Previously asked questions (do not repeat these):
+$prior_list
+$follow_up
+Question: """
+    ),
+)
+
+FOLLOW_UP_TEMPLATE = string.Template(
+    """
+Interview so far:
+$conversation_context
+
+Ask a natural follow-up that builds on the candidate's latest answer, probing deeper or
+covering a gap it left open, the way a real interviewer would.
+"""
+)
+
+MAX_POOLED_MODELS = 32
+
+_model_pool: "OrderedDict[tuple, Any]" = OrderedDict()
+_key_clients: "OrderedDict[str, Any]" = OrderedDict()
+_model_pool_lock = threading.Lock()
+
+
+def model_pool_stats() -> dict[str, int]:
+    """How warm the model pool is: pooled model instances and per-key clients."""
+
+    with _model_pool_lock:
+        return {"pooled_models": len(_model_pool), "pooled_clients": len(_key_clients)}
+
+
+def _build_question_prompt(
+    role: str,
+    company: str,
+    round_type: str,
+    difficulty: str,
+    avoid_questions: List[str],
+    conversation_context: Optional[str] = None,
+) -> str:
+    follow_up = ""
+    if conversation_context:
+        follow_up = FOLLOW_UP_TEMPLATE.substitute(conversation_context=conversation_context)
+    return QUESTION_PROMPT.render(
+        role=role,
+        company=company or "a company",
+        round_type=round_type,
+        difficulty=difficulty,
+        prior_list="\n".join(f"- {q}" for q in avoid_questions) or "None",
+        follow_up=follow_up,
+    )
+
+
+def _settings_key(value: Any) -> str:
+    if isinstance(value, dict):
+        return json.dumps({str(k): v for k, v in value.items()}, sort_keys=True, default=str)
+    return repr(value)
+
+
+def _client_for(genai, hashed_key: str, api_key: str | None):
+    """Return the generation client bound to ``api_key``; call with the pool lock held.
+
+    ``genai.configure`` is process-wide, so it is only called here, under the
+    pool lock, and every pooled model gets its own key's client instead of
+    resolving the default client later, when another key may be configured.
+    """
+
+    from google.generativeai.client import get_default_generative_client
+
+    client = _key_clients.get(hashed_key)
+    if client is not None:
+        _key_clients.move_to_end(hashed_key)
+        return client
+    genai.configure(api_key=api_key or None)
+    client = _key_clients[hashed_key] = get_default_generative_client()
+    while len(_key_clients) > MAX_POOLED_MODELS:
+        _key_clients.popitem(last=False)
+    return client
+
+
+def _get_model(
+    api_key: str | None,
+    model_name: str,
+    generation_config: dict[str, Any],
+    safety_settings: Optional[dict],
+    system_instruction: Optional[str] = None,
+):
+    """Return a pooled model bound to ``system_instruction``.
+
+    Models are reused across calls with the same key, settings and prefix, so
+    the fixed instructions are attached once per model instead of being
+    rebuilt and resent as part of every prompt. The offline provider gets a
+    fresh stand-in model and never touches the Gemini SDK.
+    """
+
+    if is_offline_provider():
+        return OfflineModel(
+            model_name=model_name,
+            generation_config=generation_config,
+            safety_settings=safety_settings,
+            system_instruction=system_instruction,
+        )
+    hashed_key = hashlib.sha256((api_key or "").encode("utf-8")).hexdigest()
+    key = (
+        hashed_key,
+        model_name,
+        _settings_key(generation_config),
+        _settings_key(safety_settings),
+        system_instruction,
+    )
+    with _model_pool_lock:
+        model = _model_pool.get(key)
+        if model is not None:
+            _model_pool.move_to_end(key)
+            return model
+        genai = _genai()
+        client = _client_for(genai, hashed_key, api_key)
+        model = genai.GenerativeModel(
+            model_name=model_name,
+            generation_config=generation_config,
+            safety_settings=safety_settings,
+            system_instruction=system_instruction,
+        )
+        # Private in google-generativeai 0.8.x (pinned in requirements.txt): the
+        # model would otherwise pick up whichever key is configured when it is first used.
+        model._client = client
+        _model_pool[key] = model
+        while len(_model_pool) > MAX_POOLED_MODELS:
+            _model_pool.popitem(last=False)
+        return model
+
+
+def _generate_routed(
+    decision: RouteDecision,
+    prompt: str,
+    api_key: str | None,
+    generation_config: dict[str, Any],
+    safety_settings: Optional[dict],
+    system_instruction: Optional[str] = None,
+    overrides: Optional[dict[str, Any]] = None,
+    session_id: Optional[str] = None,
+):
+    """Call the routed model, retrying once on the route's faster fallback if it fails.
+
+    ``overrides`` are per-request generation settings (such as the output
+    budget) merged over the pooled model's config, so they do not fragment the pool.
+    Each successful call is charged to ``session_id`` and the key in the usage ledger.
+    """
+
+    router = get_model_router()
+    breaker = get_provider_breaker()
+    ledger = get_usage_ledger()
+    ledger.check(api_key, session_id)
+    request_config: dict[str, Any] = {"generation_config": overrides} if overrides else {}
+    if not is_offline_provider():
+        # Bound each call so a hung upstream cannot hold a worker thread indefinitely.
+        request_config["request_options"] = {"timeout": LLM_REQUEST_TIMEOUT_SECONDS}
+    model = _get_model(api_key, decision.model, generation_config, safety_settings, system_instruction)
+    try:
+        with breaker.guard(decision.slo_seconds * SLOW_CALL_SLO_FACTOR), router.timed(decision):
+            response = model.generate_content(prompt, **request_config)
+    except CircuitOpenError:
+        raise
+    except Exception as exc:
+        # Auth and request errors would fail on the fallback model too.
+        fallback = router.fallback_for(decision) if is_transient_error(exc) else None
+        if fallback is None:
+            raise
+        logger.warning(
+            "%s failed on route %s, retrying with %s: %s", decision.model, decision.route, fallback.model, exc
+        )
+        model = _get_model(api_key, fallback.model, generation_config, safety_settings, system_instruction)
+        with breaker.guard(fallback.slo_seconds * SLOW_CALL_SLO_FACTOR), router.timed(fallback):
+            response = model.generate_content(prompt, **request_config)
+        decision = fallback
+    _record_usage(ledger, api_key, session_id, decision, response)
+    return response
+
+
+def is_provider_incident(exc: BaseException) -> bool:
+    """Return whether a generation error should degrade to the question bank.
+
+    That is the case for an open circuit, an exhausted budget and transient
+    provider failures; key, request and content errors are surfaced instead.
+    """
+
+    if isinstance(exc, (CircuitOpenError, BudgetExceededError)):
+        return True
+    return is_transient_error(exc.__cause__ or exc)
+
+
+def _record_usage(ledger: UsageLedger, api_key: str | None, session_id: Optional[str], decision: RouteDecision, response) -> None:
+    model = "offline" if is_offline_provider() else decision.model
+    ledger.record(api_key, session_id, decision.route, model, usage_from_response(response))
+
+
+def token_usage_report(ceiling: int = DEFAULT_GENERATION_CONFIG["max_output_tokens"]) -> list[dict[str, float]]:
+    """Tokens spent per generated question, per round, with the current learned budget."""
+
+    return get_token_budgeter().report(ceiling)
+
+
+# Keys that already passed validation in this process; re-validating costs a request.
+_validated_keys: set[str] = set()
+_validated_keys_lock = threading.Lock()
+
+# Warm-up: import the SDK, build the client and open the transport with one
+# unbilled count_tokens call, off the request path. Runs once per key.
+WARMUP_ENABLED = os.getenv("LLM_WARMUP", "1") != "0"
+# A key whose warm-up failed is not retried for this long; Streamlit calls
+# warm_up on every rerun.
+WARMUP_RETRY_SECONDS = float(os.getenv("LLM_WARMUP_RETRY_SECONDS", "60"))
+_warmups: dict[str, Future] = {}
+_warmup_failed_at: dict[str, float] = {}
+_warmup_status: dict[str, dict[str, Any]] = {}
+_warmup_lock = threading.Lock()
+_warmup_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix="llm-warmup")
+
+
+def _ping_key(
+    api_key: str,
+    generation_config: Optional[dict[str, float | int]],
+    safety_settings: Optional[dict],
+    steps: Optional[dict[str, float]] = None,
+) -> None:
+    """Issue the cheapest authenticated request for ``api_key`` and mark it validated."""
+
+    started = time.perf_counter()
+    router = get_model_router()
+    decision = router.choose(TASK_VALIDATION)
+    model = _get_model(
+        api_key,
+        decision.model,
+        _merge_generation_config(generation_config),
+        safety_settings or DEFAULT_SAFETY_SETTINGS,
+        QUESTION_PROMPT.system_instruction,
+    )
+    client_ready = time.perf_counter()
+    with router.timed(decision):
+        model.count_tokens("ping", request_options={"timeout": LLM_REQUEST_TIMEOUT_SECONDS})
+    if steps is not None:
+        steps["client_seconds"] = round(client_ready - started, 4)
+        steps["request_seconds"] = round(time.perf_counter() - client_ready, 4)
+    # count_tokens is not billed, but it is still a request against the key's quota.
+    get_usage_ledger().record(api_key, None, decision.route, decision.model, None)
+    with _validated_keys_lock:
+        _validated_keys.add(key_hash(api_key))
+
+
+def _run_warm_up(
+    api_key: str,
+    hashed_key: str,
+    generation_config: Optional[dict[str, float | int]],
+    safety_settings: Optional[dict],
+) -> None:
+    status = _warmup_status[hashed_key]
+    started = time.perf_counter()
+    try:
+        _genai()
+        status["sdk_seconds"] = round(time.perf_counter() - started, 4)
+        _ping_key(api_key, generation_config, safety_settings, status)
+    except Exception as exc:
+        status.update(state="failed", error=str(exc), seconds=round(time.perf_counter() - started, 4))
+        with _warmup_lock:
+            _warmup_failed_at[hashed_key] = time.monotonic()  # Retried after WARMUP_RETRY_SECONDS.
+        logger.warning("LLM warm-up failed after %.2fs: %s", status["seconds"], exc)
+        raise
+    status.update(state="warm", seconds=round(time.perf_counter() - started, 4))
+    logger.info("LLM warm-up finished in %.2fs: %s", status["seconds"], status)
+
+
+def warm_up(
+    api_key: str | None = None,
+    generation_config: Optional[dict[str, float | int]] = None,
+    safety_settings: Optional[dict] = None,
+) -> Optional[Future]:
+    """Warm the Gemini client and connection for ``api_key`` in the background.
+
+    Falls back to GOOGLE_API_KEY; without any key only the SDK import is
+    preloaded. Repeated calls for a key that is warm or warming are free, and
+    a key whose warm-up failed is only retried after WARMUP_RETRY_SECONDS.
+    """
+
+    if not WARMUP_ENABLED or is_offline_provider():
+        return None
+    api_key = (api_key or os.getenv("GOOGLE_API_KEY") or "").strip()
+    if not api_key:
+        preload_sdk()
+        return None
+    hashed_key = key_hash(api_key)
+    with _warmup_lock:
+        future = _warmups.get(hashed_key)
+        failed_at = _warmup_failed_at.get(hashed_key)
+        if future is not None and failed_at is not None and time.monotonic() - failed_at >= WARMUP_RETRY_SECONDS:
+            del _warmup_failed_at[hashed_key]
+            future = None
+        if future is None:
+            _warmup_status[hashed_key] = {"state": "running", "started_at": time.time()}
+            future = _warmup_executor.submit(_run_warm_up, api_key, hashed_key, generation_config, safety_settings)
+            _warmups[hashed_key] = future
+    return future
+
+
+def warmup_status(api_key: str | None = None) -> dict[str, Any]:
+    """Warm-up state and step timings, for one key or keyed by key hash."""
+
+    with _warmup_lock:
+        if api_key is not None:
+            return dict(_warmup_status.get(key_hash(api_key), {"state": "idle"}))
+        return {
+            "sdk_loaded": "google.generativeai" in sys.modules,
+            "keys": {hashed: dict(status) for hashed, status in _warmup_status.items()},
+        }
+
+
 def validate_google_api_key(
     api_key: str,
     generation_config: Optional[dict[str, float | int]] = None,
     safety_settings: Optional[dict] = None,
 ) -> None:
     """Raise if the provided API key fails a lightweight validation call."""
+    if is_offline_provider():
+        return
     if not api_key or not api_key.strip():
         raise ValueError("GOOGLE_API_KEY missing. Provide it via .env before generating questions.")
+    hashed_key = key_hash(api_key)
+    with _warmup_lock:
+        warming = _warmups.get(hashed_key)
+    if warming is not None:
+        # A warm-up for this key makes the same request; share it instead of sending another.
+        try:
+            warming.result(timeout=LLM_REQUEST_TIMEOUT_SECONDS)
+        except Exception:
+            pass  # Validate directly below to report the error.
+    with _validated_keys_lock:
+        if hashed_key in _validated_keys:
+            return
 
     try:
-        genai.configure(api_key=api_key)
-        effective_config = _merge_generation_config(generation_config)
-
-        effective_safety = safety_settings or DEFAULT_SAFETY_SETTINGS
-        model = genai.GenerativeModel(
-            model_name=GEMINI_MODEL,
-            generation_config=effective_config,
-            safety_settings=effective_safety,
-        )
-        model.count_tokens("ping")
+        _ping_key(api_key, generation_config, safety_settings)
     except Exception as exc:
         raise RuntimeError(f"GOOGLE_API_KEY validation failed: {exc}") from exc
 
@@ -95,61 +525,84 @@ def generate_question(
     api_key: str | None = None,
     generation_config: Optional[dict[str, float | int]] = None,
     safety_settings: Optional[dict] = None,
+    conversation_context: Optional[str] = None,
+    similarity_index: Optional[QuestionIndex] = None,
+    session_id: Optional[str] = None,
 ) -> str:
-    # Debug: Print the API key status (first few characters for security)
-    print(f"API Key provided: {'Yes' if api_key else 'No'}")
-    if api_key:
-        print(f"API Key starts with: {api_key[:5]}...")
-
-    if not api_key:
+    if not api_key and not is_offline_provider():
         raise ValueError("GOOGLE_API_KEY missing. Please provide it via the .env file or settings.")
 
     # Generate using Gemini
     try:
-        # Configure the API
-        genai.configure(api_key=api_key)
+        # Pick the model for this round; the fixed coach instructions live on
+        # the pooled model, not in the prompt
+        decision = get_model_router().choose(
+            TASK_FOLLOW_UP if conversation_context else TASK_QUESTION, round_type, difficulty
+        )
         effective_config = _merge_generation_config(generation_config)
         effective_safety = safety_settings or DEFAULT_SAFETY_SETTINGS
-        
-        # Initialize the model
-        model = genai.GenerativeModel(
-            model_name=GEMINI_MODEL,
-            generation_config=effective_config,
-            safety_settings=effective_safety,
-        )
-        
-        # Prepare the prompt
-        prior_list = "\n".join(f"- {q}" for q in (previous_questions or [])) or "None"
-        prompt = f"""
-You are an expert interview coach. Generate a single, focused interview question based on the following:
+        logger.debug("Routing %s to %s", decision.route, decision.model)
 
-Role: {role}
-Company: {company or 'a company'}
-Round: {round_type}
-Difficulty: {difficulty}
-
-Previously asked questions (do not repeat these):
-{prior_list}
+        # Prompt size stays flat: only a few recent questions are listed, and near
+        # duplicates of anything asked before are rejected locally and retried.
+        previous = list(previous_questions or [])
+        session_index = QuestionIndex(previous)
+        avoid_questions = previous[-MAX_AVOID_HINTS:]
+        # The slider value is a ceiling: requests reserve a budget learned per round
+        # and only escalate towards the ceiling when a response is cut off.
+        budgeter = get_token_budgeter()
+        ceiling = int(effective_config.get("max_output_tokens") or DEFAULT_GENERATION_CONFIG["max_output_tokens"])
+        for attempt in range(DEDUP_MAX_ATTEMPTS):
+            prompt = _build_question_prompt(
+                role, company, round_type, difficulty, avoid_questions, conversation_context
+            )
+            budget = budgeter.budget(round_type, ceiling)
+            escalations = 0
+            while True:
+                logger.debug("Sending request to Gemini API (budget %d output tokens)", budget)
+                response = _generate_routed(
+                    decision,
+                    prompt,
+                    api_key,
+                    effective_config,
+                    effective_safety,
+                    QUESTION_PROMPT.system_instruction,
+                    overrides={"max_output_tokens": budget, "stop_sequences": QUESTION_STOP_SEQUENCES},
+                    session_id=session_id,
+                )
+                next_budget = None
+                if hit_max_tokens(response) and escalations < MAX_ESCALATIONS:
+                    next_budget = budgeter.escalate(budget, ceiling)
+                if next_budget is None:
+                    break
+                logger.debug("Hit MAX_TOKENS at %d output tokens, retrying with %d", budget, next_budget)
+                budgeter.record_attempt(round_type, usage_from_response(response))
+                budget = next_budget
+                escalations += 1
+            logger.debug("Received response: %s", response)
+            usage = usage_from_response(response)
 
-Generate exactly ONE interview question. The question should be challenging and relevant to the role and company.
+            question = _extract_text_from_response(response)
+            logger.debug("Extracted question: %s", question)
+            if not question:
+                budgeter.record_attempt(round_type, usage)
+                break
 
-Question: """
-            
-        print("Sending request to Gemini API...")
-        response = model.generate_content(prompt)
-        print(f"Received response: {response}")
-        
-        question = _extract_text_from_response(response)
-        print(f"Extracted question: {question}")
-        
-        # Return the question if we got one
-        if question:
             # Clean up the question
             question = question.strip()
             if not question.endswith("?"):
                 question += "?"
-                
-            print(f"Returning generated question: {question}")
+            if attempt + 1 < DEDUP_MAX_ATTEMPTS and is_near_duplicate(
+                question, session_index, similarity_index
+            ):
+                logger.debug("Rejected near-duplicate question: %s", question)
+                avoid_questions = (avoid_questions + [question])[-MAX_AVOID_HINTS:]
+                session_index.add(question)
+                budgeter.record_attempt(round_type, usage)
+                continue
+
+            budgeter.record(round_type, usage, escalations)
+            logger.debug("Returning generated question: %s", question)
             return question
         # Get detailed error information
         finish_reasons = []
@@ -165,19 +618,17 @@ Question: """
                     finish_reasons.append(f"BLOCKED: {getattr(rating, 'category', 'Unknown')}")
         
         finish_reason_str = ", ".join(finish_reasons) if finish_reasons else "No finish reason provided"
-        print(f"Generation failed. Finish reasons: {finish_reason_str}")
+        logger.warning("Generation failed. Finish reasons: %s", finish_reason_str)
         
         # Check for MAX_TOKENS issue
         if "MAX_TOKENS" in finish_reason_str.upper() or "2" in finish_reason_str:
-            print("Hit max tokens limit")
             raise RuntimeError(
-                "Response exceeded token limit. "
-                "Try increasing 'Max Tokens' in the LLM Generation Settings (recommended: 1024-2048)."
+                f"Response exceeded the token limit even after raising the budget to {ceiling}. "
+                "Try increasing 'Max Tokens' in the LLM Generation Settings."
             )
         
         # If we have safety issues, provide clear guidance
         if any(r in finish_reason_str.upper() for r in ["SAFETY", "BLOCKED"]):
-            print("Content blocked by safety filters")
             raise RuntimeError(
                 "Content blocked by Gemini safety filters. "
                 "Try adjusting your safety settings to 'Block None' or 'Block Few' in the app settings."
@@ -192,11 +643,309 @@ Question: """
             "finish_reasons": finish_reasons,
             "prompt_preview": prompt[:200] + "..." if len(prompt) > 200 else prompt
         }
-        print(f"Error details: {error_details}")
+        logger.debug("Error details: %s", error_details)
         
         raise RuntimeError(
             "Gemini returned an empty or invalid response. "
             f"Finish reasons: {finish_reason_str}"
         )
+    except (CircuitOpenError, BudgetExceededError):
+        raise
     except Exception as exc:
         raise RuntimeError(f"Gemini question generation failed: {exc}") from exc
+
+
+# Per-round rubric used when grading answers. Each entry lists what a 10/10 answer shows.
+ROUND_RUBRICS: dict[str, str] = {
+    "warm up": "Clear and concise, relevant personal context, confident tone, stays on topic.",
+    "coding": (
+        "Correct approach, explains time/space complexity, considers edge cases, "
+        "communicates reasoning step by step, mentions testing."
+    ),
+    "role related": (
+        "Accurate domain knowledge, concrete examples from experience, trade-offs discussed, "
+        "ties the answer back to the role and company."
+    ),
+    "behavioral": (
+        "Follows the STAR structure (Situation, Task, Action, Result), specific and measurable "
+        "result, shows ownership and reflection."
+    ),
+}
+DEFAULT_RUBRIC = "Relevant, specific, well structured and supported by concrete examples."
+
+GRADING_GENERATION_CONFIG: dict[str, Any] = {
+    "temperature": 0.2,
+    "response_mime_type": "application/json",
+    "response_schema": {
+        "type": "ARRAY",
+        "items": {
+            "type": "OBJECT",
+            "properties": {
+                "index": {"type": "INTEGER"},
+                "score": {"type": "INTEGER"},
+                "feedback": {"type": "STRING"},
+            },
+            "required": ["index", "score", "feedback"],
+        },
+    },
+}
+GRADING_CACHE_SIZE = 256
+
+
+@dataclass(frozen=True)
+class AnswerGrade:
+    score: int  # 0-10, 0 means the question was not answered
+    feedback: str
+
+
+_grading_cache: "OrderedDict[str, list[AnswerGrade]]" = OrderedDict()
+_grading_inflight: dict[str, Future] = {}
+_grading_lock = threading.Lock()
+_grading_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="answer-grading")
+
+
+def grading_cache_key(
+    round_type: str,
+    difficulty: str,
+    questions: List[str],
+    answers: List[str],
+) -> str:
+    payload = json.dumps([round_type.lower(), difficulty.lower(), questions, answers], ensure_ascii=False)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+GRADING_PROMPT = PromptTemplate(
+    system_instruction=(
+        "You are an expert interview coach grading a candidate's answers. Score every answer "
+        "you are given from 1 to 10 against the rubric in the request and give one sentence of "
+        "actionable feedback. Return a JSON array with one object per answer using the "
+        "bracketed index."
+    ),
+    body=string.Template(
+        """Role: $role
+Company: $company
+Round: $round_type
+Difficulty: $difficulty
+Rubric for a 10/10 answer: $rubric
+
+$transcript
+"""
+    ),
+)
+
+
+def _build_grading_prompt(
+    role: str,
+    company: str,
+    round_type: str,
+    difficulty: str,
+    pairs: List[Tuple[int, str, str]],
+) -> str:
+    transcript = "\n\n".join(
+        f"[{index}] Question: {question}\nAnswer: {answer}" for index, question, answer in pairs
+    )
+    return GRADING_PROMPT.render(
+        role=role,
+        company=company or "a company",
+        round_type=round_type,
+        difficulty=difficulty,
+        rubric=ROUND_RUBRICS.get(round_type.lower(), DEFAULT_RUBRIC),
+        transcript=transcript,
+    )
+
+
+def grade_answers(
+    role: str,
+    company: str,
+    round_type: str,
+    difficulty: str,
+    questions: List[str],
+    answers: List[str],
+    api_key: str | None = None,
+    safety_settings: Optional[dict] = None,
+    session_id: Optional[str] = None,
+) -> list[AnswerGrade]:
+    """Grade every question/answer pair with a single structured-output request."""
+
+    key = grading_cache_key(round_type, difficulty, questions, answers)
+    with _grading_lock:
+        cached = _grading_cache.get(key)
+        if cached is not None:
+            _grading_cache.move_to_end(key)
+            return cached
+
+    grades = [AnswerGrade(0, "No response provided.") for _ in questions]
+    pairs = [
+        (index, question, answer.strip())
+        for index, (question, answer) in enumerate(zip(questions, answers))
+        if answer and answer.strip()
+    ]
+    if pairs:
+        if not api_key and not is_offline_provider():
+            raise ValueError("GOOGLE_API_KEY missing. Please provide it via the .env file or settings.")
+        try:
+            response = _generate_routed(
+                get_model_router().choose(TASK_GRADING, round_type, difficulty),
+                _build_grading_prompt(role, company, round_type, difficulty, pairs),
+                api_key,
+                _merge_generation_config(GRADING_GENERATION_CONFIG),
+                safety_settings or DEFAULT_SAFETY_SETTINGS,
+                GRADING_PROMPT.system_instruction,
+                session_id=session_id,
+            )
+            items = json.loads(_extract_text_from_response(response) or "[]")
+        except Exception as exc:
+            raise RuntimeError(f"Gemini answer grading failed: {exc}") from exc
+        answered = {index for index, _, _ in pairs}
+        for item in items:
+            index = item.get("index")
+            if index in answered:
+                score = max(1, min(10, int(item.get("score", 1))))
+                grades[index] = AnswerGrade(score, str(item.get("feedback", "")).strip())
+
+    with _grading_lock:
+        _grading_cache[key] = grades
+        while len(_grading_cache) > GRADING_CACHE_SIZE:
+            _grading_cache.popitem(last=False)
+    return grades
+
+
+def submit_grading(
+    role: str,
+    company: str,
+    round_type: str,
+    difficulty: str,
+    questions: List[str],
+    answers: List[str],
+    api_key: str | None = None,
+    safety_settings: Optional[dict] = None,
+    session_id: Optional[str] = None,
+) -> Future:
+    """Start grading in the background, reusing an in-flight request for identical answers."""
+
+    key = grading_cache_key(round_type, difficulty, questions, answers)
+    with _grading_lock:
+        cached = _grading_cache.get(key)
+        if cached is not None:
+            done: Future = Future()
+            done.set_result(cached)
+            return done
+        future = _grading_inflight.get(key)
+        if future is None:
+            future = _grading_executor.submit(
+                grade_answers,
+                role,
+                company,
+                round_type,
+                difficulty,
+                list(questions),
+                list(answers),
+                api_key,
+                safety_settings,
+                session_id,
+            )
+            _grading_inflight[key] = future
+            future.add_done_callback(lambda _: _grading_inflight.pop(key, None))
+    return future
+
+
+# Test suites for the Coding round's code runner. Gemini writes the cases with
+# JSON-encoded arguments so any argument shape fits one response schema.
+TEST_SUITE_GENERATION_CONFIG: dict[str, Any] = {
+    "temperature": 0.2,
+    "response_mime_type": "application/json",
+    "response_schema": {
+        "type": "OBJECT",
+        "properties": {
+            "function": {"type": "STRING"},
+            "cases": {
+                "type": "ARRAY",
+                "items": {
+                    "type": "OBJECT",
+                    "properties": {
+                        "args": {"type": "STRING"},
+                        "expected": {"type": "STRING"},
+                    },
+                    "required": ["args", "expected"],
+                },
+            },
+        },
+        "required": ["function", "cases"],
+    },
+}
+TEST_SUITE_CACHE_SIZE = 256
+MAX_TEST_CASES = 8
+
+TEST_SUITE_PROMPT = PromptTemplate(
+    system_instruction=(
+        "You write unit tests for coding interview questions. Choose a snake_case Python "
+        "function name and signature that a candidate would implement for the question, then "
+        "write up to 8 test cases covering normal inputs and edge cases. Each case gives "
+        "'args' as a JSON array of positional arguments and 'expected' as the JSON return "
+        "value. Use only JSON types; represent tuples and sets as sorted arrays. Return an "
+        "empty case list if the question cannot be answered by a single pure function."
+    ),
+    body=string.Template(
+        """Test suite request
+Round: $round_type
+Difficulty: $difficulty
+Question: $question
+"""
+    ),
+)
+
+_test_suite_cache: "OrderedDict[str, Optional[dict]]" = OrderedDict()
+_test_suite_lock = threading.Lock()
+
+
+def generate_test_suite(
+    question: str,
+    round_type: str,
+    difficulty: str,
+    api_key: str | None = None,
+    safety_settings: Optional[dict] = None,
+    session_id: Optional[str] = None,
+) -> Optional[dict]:
+    """Return ``{"function": name, "cases": [{"args": [...], "expected": ...}]}`` for a coding question.
+
+    Returns None when the question does not lend itself to automated tests.
+    Suites are cached per question, so every candidate shares one generation.
+    """
+
+    key = hashlib.sha256(question.strip().encode("utf-8")).hexdigest()
+    with _test_suite_lock:
+        if key in _test_suite_cache:
+            _test_suite_cache.move_to_end(key)
+            return _test_suite_cache[key]
+    if not api_key and not is_offline_provider():
+        raise ValueError("GOOGLE_API_KEY missing. Please provide it via the .env file or settings.")
+    try:
+        response = _generate_routed(
+            get_model_router().choose(TASK_TEST_SUITE, round_type, difficulty),
+            TEST_SUITE_PROMPT.render(round_type=round_type, difficulty=difficulty, question=question),
+            api_key,
+            _merge_generation_config(TEST_SUITE_GENERATION_CONFIG),
+            safety_settings or DEFAULT_SAFETY_SETTINGS,
+            TEST_SUITE_PROMPT.system_instruction,
+            session_id=session_id,
+        )
+        data = json.loads(_extract_text_from_response(response) or "{}")
+    except (CircuitOpenError, BudgetExceededError):
+        raise
+    except Exception as exc:
+        raise RuntimeError(f"Gemini test generation failed: {exc}") from exc
+
+    cases = []
+    for case in data.get("cases", [])[:MAX_TEST_CASES]:
+        try:
+            args = json.loads(case["args"])
+            cases.append({"args": args if isinstance(args, list) else [args], "expected": json.loads(case["expected"])})
+        except (KeyError, TypeError, ValueError):
+            continue  # Drop malformed cases rather than failing the whole suite.
+    function = str(data.get("function", "")).strip()
+    suite = {"function": function, "cases": cases} if function.isidentifier() and cases else None
+    with _test_suite_lock:
+        _test_suite_cache[key] = suite
+        while len(_test_suite_cache) > TEST_SUITE_CACHE_SIZE:
+            _test_suite_cache.popitem(last=False)
+    return suite
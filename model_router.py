@@ -0,0 +1,238 @@
+"""Latency-aware routing between the fast and high-quality Gemini models.
+
+Each LLM call names a task (validation, question, follow-up, grading) and the
+router picks a model for it: a flash-class model where responsiveness matters
+more than depth, and the pro model where answer quality matters (Professional
+Coding questions, grading). Every call's latency and outcome is recorded per
+model and task, so slow grading calls do not count against question generation
+on the same model; when a quality model's recent p90 latency for a task
+breaches that task's SLO, or it keeps failing, the route falls back to the
+fast model. A small share of requests still goes to the primary so the route
+recovers once it is healthy.
+"""
+
+from __future__ import annotations
+
+import os
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import numpy as np
+
+DEFAULT_QUALITY_MODEL = "gemini-2.5-pro"
+DEFAULT_FAST_MODEL = "gemini-2.5-flash"
+QUALITY_MODEL = os.getenv("GEMINI_MODEL", DEFAULT_QUALITY_MODEL)
+FAST_MODEL = os.getenv("GEMINI_FAST_MODEL", DEFAULT_FAST_MODEL)
+
+TASK_VALIDATION = "validation"
+TASK_QUESTION = "question"
+TASK_FOLLOW_UP = "follow_up"
+TASK_GRADING = "grading"
+TASK_TEST_SUITE = "test_suite"
+
+# p90 latency objective per task, in seconds.
+LATENCY_SLO_SECONDS = {
+    TASK_VALIDATION: 3.0,
+    TASK_QUESTION: 8.0,
+    TASK_FOLLOW_UP: 8.0,
+    TASK_GRADING: 30.0,
+    TASK_TEST_SUITE: 20.0,
+}
+WINDOW_SIZE = 50
+MIN_SAMPLES = 5
+MAX_ERROR_RATE = 0.5
+# While degraded, one request in this many still probes the primary model.
+PROBE_EVERY = 10
+
+
+@dataclass(frozen=True)
+class RouteDecision:
+    route: str
+    model: str
+    primary: str
+    fallback: Optional[str]
+
+    @property
+    def degraded(self) -> bool:
+        return self.model != self.primary
+
+    @property
+    def task(self) -> str:
+        return self.route.split(":", 1)[0]
+
+    @property
+    def slo_seconds(self) -> float:
+        return LATENCY_SLO_SECONDS.get(self.task, LATENCY_SLO_SECONDS[TASK_QUESTION])
+
+
+class _ModelStats:
+    def __init__(self) -> None:
+        self.samples: deque[tuple[float, bool]] = deque(maxlen=WINDOW_SIZE)
+        self.calls = 0
+        self.errors = 0
+
+    def record(self, latency: float, ok: bool) -> None:
+        self.samples.append((latency, ok))
+        self.calls += 1
+        self.errors += 0 if ok else 1
+
+    def p90(self) -> float:
+        if not self.samples:
+            return 0.0
+        return float(np.percentile([latency for latency, _ in self.samples], 90))
+
+    def error_rate(self) -> float:
+        if not self.samples:
+            return 0.0
+        return sum(1 for _, ok in self.samples if not ok) / len(self.samples)
+
+
+class _RouteStats:
+    def __init__(self) -> None:
+        self.requests = 0
+        self.fallbacks = 0
+        self.errors = 0
+        self.latencies: deque[float] = deque(maxlen=WINDOW_SIZE)
+
+
+def route_name(task: str, round_type: str = "", difficulty: str = "") -> str:
+    parts = [task]
+    if round_type:
+        parts.append(round_type.lower().replace(" ", "_"))
+    if difficulty:
+        parts.append(difficulty.lower())
+    return ":".join(parts)
+
+
+class ModelRouter:
+    def __init__(self, quality_model: str = QUALITY_MODEL, fast_model: str = FAST_MODEL) -> None:
+        self.quality_model = quality_model
+        self.fast_model = fast_model
+        # Keyed by (model, task): tasks on one model have very different latencies.
+        self._models: dict[tuple[str, str], _ModelStats] = {}
+        self._routes: dict[str, _RouteStats] = {}
+        self._lock = threading.Lock()
+
+    def primary_model(self, task: str, round_type: str = "", difficulty: str = "") -> str:
+        round_key = (round_type or "").lower()
+        professional = (difficulty or "").lower() == "professional"
+        if task == TASK_VALIDATION:
+            return self.fast_model
+        if task in (TASK_GRADING, TASK_TEST_SUITE):
+            return self.quality_model
+        if round_key == "warm up":
+            return self.fast_model
+        if round_key == "coding" or professional:
+            return self.quality_model
+        return self.fast_model
+
+    def _healthy(self, model: str, task: str) -> bool:
+        stats = self._models.get((model, task))
+        if stats is None or len(stats.samples) < MIN_SAMPLES:
+            return True
+        slo = LATENCY_SLO_SECONDS.get(task, LATENCY_SLO_SECONDS[TASK_QUESTION])
+        return stats.p90() <= slo and stats.error_rate() <= MAX_ERROR_RATE
+
+    def choose(self, task: str, round_type: str = "", difficulty: str = "") -> RouteDecision:
+        route = route_name(task, round_type, difficulty)
+        primary = self.primary_model(task, round_type, difficulty)
+        fallback = self.fast_model if primary != self.fast_model else None
+        with self._lock:
+            stats = self._routes.setdefault(route, _RouteStats())
+            stats.requests += 1
+            model = primary
+            if fallback and not self._healthy(primary, task) and stats.requests % PROBE_EVERY:
+                model = fallback
+                stats.fallbacks += 1
+        return RouteDecision(route=route, model=model, primary=primary, fallback=fallback)
+
+    def fallback_for(self, decision: RouteDecision) -> Optional[RouteDecision]:
+        """Return the decision to retry with after the primary model failed, if any."""
+
+        if not decision.fallback or decision.degraded:
+            return None
+        with self._lock:
+            self._routes.setdefault(decision.route, _RouteStats()).fallbacks += 1
+        return RouteDecision(
+            route=decision.route, model=decision.fallback, primary=decision.primary, fallback=None
+        )
+
+    def record(self, decision: RouteDecision, latency: float, ok: bool) -> None:
+        with self._lock:
+            self._models.setdefault((decision.model, decision.task), _ModelStats()).record(latency, ok)
+            route = self._routes.setdefault(decision.route, _RouteStats())
+            route.latencies.append(latency)
+            route.errors += 0 if ok else 1
+
+    def timed(self, decision: RouteDecision) -> "_Timer":
+        return _Timer(self, decision)
+
+    def metrics(self) -> dict[str, dict[str, Any]]:
+        """Return per-route request, fallback and latency metrics plus per-model, per-task health."""
+
+        with self._lock:
+            routes = {}
+            for name, stats in self._routes.items():
+                latencies = list(stats.latencies)
+                routes[name] = {
+                    "requests": stats.requests,
+                    "fallbacks": stats.fallbacks,
+                    "errors": stats.errors,
+                    "p50_seconds": float(np.percentile(latencies, 50)) if latencies else 0.0,
+                    "p90_seconds": float(np.percentile(latencies, 90)) if latencies else 0.0,
+                }
+            models: dict[str, dict[str, dict[str, float]]] = {}
+            for (name, task), stats in self._models.items():
+                models.setdefault(name, {})[task] = {
+                    "calls": stats.calls,
+                    "errors": stats.errors,
+                    "p90_seconds": stats.p90(),
+                    "error_rate": stats.error_rate(),
+                }
+        return {"routes": routes, "models": models}
+
+    def format_metrics(self) -> str:
+        """Render the metrics in the Prometheus text exposition format."""
+
+        metrics = self.metrics()
+        lines = []
+        for name, route in metrics["routes"].items():
+            for key, value in route.items():
+                lines.append(f'llm_route_{key}{{route="{name}"}} {value}')
+        for name, tasks in metrics["models"].items():
+            for task, model in tasks.items():
+                for key, value in model.items():
+                    lines.append(f'llm_model_{key}{{model="{name}",task="{task}"}} {value}')
+        return "\n".join(lines) + "\n"
+
+
+class _Timer:
+    """Context manager that records one call's latency and outcome on exit."""
+
+    def __init__(self, router: ModelRouter, decision: RouteDecision) -> None:
+        self.router = router
+        self.decision = decision
+
+    def __enter__(self) -> "_Timer":
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.router.record(self.decision, time.perf_counter() - self.started, exc_type is None)
+        return False
+
+
+_router: Optional[ModelRouter] = None
+_router_lock = threading.Lock()
+
+
+def get_model_router() -> ModelRouter:
+    global _router
+    if _router is None:
+        with _router_lock:
+            if _router is None:
+                _router = ModelRouter()
+    return _router
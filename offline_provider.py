@@ -0,0 +1,149 @@
+"""Deterministic offline stand-in for the Gemini model.
+
+Selected with ``LLM_PROVIDER=offline``. It mirrors the small part of the
+``GenerativeModel`` surface that llm_utils uses (``generate_content`` and
+``count_tokens``) and answers from local templates, so question generation,
+grading and batch tooling can run without network access or an API key.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import re
+from dataclasses import dataclass, field
+from typing import Any, Optional
+
+OFFLINE_MODEL_NAME = "offline"
+
+_TOPICS = {
+    "warm up": ["your background", "what drew you to this field", "a project you are proud of", "how you keep learning"],
+    "coding": [
+        "detecting a cycle in a linked list",
+        "merging overlapping intervals",
+        "an LRU cache",
+        "finding the k most frequent elements",
+        "validating a binary search tree",
+        "rate limiting API requests",
+    ],
+    "role related": [
+        "a technical decision you had to defend",
+        "measuring the success of your work",
+        "a trade-off between speed and quality",
+        "keeping up with changes in your domain",
+    ],
+    "behavioral": [
+        "a conflict within your team",
+        "a deadline you were about to miss",
+        "feedback that changed how you work",
+        "a decision made with incomplete information",
+        "a time you failed",
+    ],
+}
+_TEMPLATES = {
+    "warm up": ["As a {role}, can you walk me through {topic}?", "What would you tell us about {topic} as a {role}?"],
+    "coding": [
+        "As a {role}, how would you implement {topic}, and what is its time complexity?",
+        "Walk me through your approach to {topic}; which edge cases would you test?",
+    ],
+    "role related": [
+        "As a {role} at {company}, can you describe {topic}?",
+        "How have you handled {topic} in a {role} position?",
+    ],
+    "behavioral": [
+        "Tell me about {topic}. What was the situation and what did you do?",
+        "Can you describe {topic} and what you learned from it as a {role}?",
+    ],
+}
+
+
+def is_offline_provider() -> bool:
+    return os.getenv("LLM_PROVIDER", "gemini").strip().lower() == OFFLINE_MODEL_NAME
+
+
+def _estimate_tokens(text: str) -> int:
+    return max(1, len(text or "") // 4)
+
+
+@dataclass
+class OfflineUsage:
+    prompt_token_count: int = 0
+    candidates_token_count: int = 0
+    total_token_count: int = 0
+    cached_content_token_count: int = 0
+
+
+@dataclass
+class OfflineResponse:
+    text: str
+    usage_metadata: OfflineUsage
+    candidates: list = field(default_factory=list)
+
+
+@dataclass
+class OfflineTokenCount:
+    total_tokens: int
+
+
+class OfflineModel:
+    def __init__(
+        self,
+        model_name: str = OFFLINE_MODEL_NAME,
+        generation_config: Optional[dict[str, Any]] = None,
+        safety_settings: Optional[dict] = None,
+        system_instruction: Optional[str] = None,
+    ) -> None:
+        self.model_name = model_name
+        self.generation_config = dict(generation_config or {})
+        self.system_instruction = system_instruction or ""
+
+    def count_tokens(self, contents: str) -> OfflineTokenCount:
+        return OfflineTokenCount(_estimate_tokens(self.system_instruction) + _estimate_tokens(contents))
+
+    def generate_content(self, contents: str, **_: Any) -> OfflineResponse:
+        if contents.startswith("Test suite request"):
+            # No stand-in can know a question's reference behaviour; report "not testable".
+            text = json.dumps({"function": "solution", "cases": []})
+        elif self.generation_config.get("response_mime_type") == "application/json":
+            text = self._grade(contents)
+        else:
+            text = self._question(contents)
+        prompt_tokens = self.count_tokens(contents).total_tokens
+        output_tokens = _estimate_tokens(text)
+        return OfflineResponse(
+            text=text,
+            usage_metadata=OfflineUsage(prompt_tokens, output_tokens, prompt_tokens + output_tokens),
+        )
+
+    @staticmethod
+    def _field(prompt: str, name: str, default: str) -> str:
+        match = re.search(rf"^{name}:\s*(.+)$", prompt, re.MULTILINE)
+        return match.group(1).strip() if match else default
+
+    def _question(self, prompt: str) -> str:
+        role = self._field(prompt, "Role", "candidate")
+        company = self._field(prompt, "Company", "the company")
+        round_key = self._field(prompt, "Round", "Role Related").lower()
+        topics = _TOPICS.get(round_key, _TOPICS["role related"])
+        templates = _TEMPLATES.get(round_key, _TEMPLATES["role related"])
+        # Seed from the whole prompt so a changed "avoid" list yields a different question.
+        seed = int.from_bytes(hashlib.sha256(prompt.encode("utf-8")).digest()[:8], "big")
+        topic = topics[seed % len(topics)]
+        template = templates[(seed // len(topics)) % len(templates)]
+        return template.format(role=role, company=company, topic=topic)
+
+    @staticmethod
+    def _grade(prompt: str) -> str:
+        grades = []
+        for index, answer in re.findall(r"^\[(\d+)\] Question: .*?\nAnswer: (.*?)(?=\n\n\[\d+\] |\Z)", prompt, re.S | re.M):
+            words = len(answer.split())
+            score = max(1, min(10, 2 + words // 25))
+            grades.append(
+                {
+                    "index": int(index),
+                    "score": score,
+                    "feedback": "Add a concrete example and explain your reasoning." if score < 7 else "Clear and well supported.",
+                }
+            )
+        return json.dumps(grades)
@@ -1,4 +1,5 @@
 import json
+import logging
 import os
 import time
 
@@ -7,21 +8,59 @@ import streamlit.components.v1 as components
 
 from llm_utils import (
     generate_question, 
+    generate_test_suite,
+    is_provider_incident,
+    submit_grading,
     validate_google_api_key, 
     HarmCategory, 
     HarmBlockThreshold, 
     DEFAULT_SAFETY_SETTINGS,
     DEFAULT_GENERATION_CONFIG
 )
+from answer_telemetry import (
+    EVENT_AUDIO,
+    EVENT_EDIT,
+    EVENT_FINISH,
+    EVENT_LEAVE,
+    EVENT_LOCK,
+    EVENT_REPLACE,
+    EVENT_VIEW,
+)
 from audio_input import render_audio_input_panel
+from circuit_breaker import STATE_CLOSED, get_provider_breaker
+from code_runner import RUNNER_ENABLED, TestSuite, get_code_runner
+from conversation_engine import discard_conversation_engine, get_conversation_engine
+from feedback_engine import score_answers
+from history_store import get_history_store
+from question_bank import get_question_bank
+from question_index import get_history_index
+from interview_sets import get_interview_set_store
+from interview_session import (
+    SESSION_TOKEN_KEY,
+    answer_widget_key,
+    code_widget_keys,
+    get_interview_session,
+    reset_interview_state,
+)
+from session_journal import get_session_journal, is_valid_session_token
+from session_registry import get_session_registry
+from interview_flow import DEFAULT_QUESTION_COUNT, question_count_from
+from spare_questions import discard_spare_pool, get_spare_pool, get_window_pool
+from usage_ledger import get_usage_ledger
 from ui_components import (
     display_question,
     display_response_area,
     display_navigation_buttons,
     display_interview_summary,
+    display_code_results,
     get_response_aria_label,
 )
 
+logger = logging.getLogger(__name__)
+
+GRADING_TIMEOUT_SECONDS = 60
+
+
 def practice_session(standalone: bool = True):
     if standalone:
         st.set_page_config(
@@ -32,11 +71,6 @@ def practice_session(standalone: bool = True):
     
     # Initialize session state variables if they don't exist
     required_state = {
-        'questions': [],
-        'current_question_index': 0,
-        'answers': {},
-        'question_timers': {},
-        'question_locked': {},
         'safety_settings': DEFAULT_SAFETY_SETTINGS.copy(),
         'generation_config': DEFAULT_GENERATION_CONFIG.copy(),
         'initialized': True,
@@ -100,6 +134,11 @@ def practice_session(standalone: bool = True):
     company = st.query_params.get("company", "a tech company")
     round_type = st.query_params.get("round", "Coding")
     difficulty = st.query_params.get("difficulty", "Professional")
+    adaptive_mode = st.query_params.get("mode") == "adaptive"
+    bank_mode = st.query_params.get("source") == "bank"
+    question_count = question_count_from(st.query_params.get("length"))
+    # Long sessions generate through a look-ahead window instead of all up front.
+    windowed = question_count > DEFAULT_QUESTION_COUNT and not adaptive_mode
     audio_required = round_type.lower() == "coding"
     if "audio_checkbox" not in st.session_state:
         default_audio = st.session_state.get("audio_mode_enabled")
@@ -110,8 +149,112 @@ def practice_session(standalone: bool = True):
     # Resolve API key (session first, then environment)
     api_key = st.session_state.get('google_api_key') or os.getenv('GOOGLE_API_KEY')
 
+    # A session token in the URL lets a reloaded tab (or a restarted server)
+    # pick the interview back up from its journal.
+    requested_token = st.query_params.get("session")
+    if SESSION_TOKEN_KEY not in st.session_state and is_valid_session_token(requested_token):
+        st.session_state[SESSION_TOKEN_KEY] = requested_token
+
+    registry = get_session_registry()
+    session = get_interview_session(st.session_state, registry)
+    session_token = st.session_state[SESSION_TOKEN_KEY]
+    journal = get_session_journal(session_token)
+    if not session.has_questions:
+        resumed = journal.load()
+        if resumed is not None and resumed.has_questions:
+            registry.put(session_token, resumed)
+            session = resumed
+    if st.query_params.get("session") != session_token:
+        st.query_params["session"] = session_token
+    interview_set = get_interview_set_store().get(st.query_params.get("set"))
+    session.role = role
+    session.company = company
+    session.round_type = round_type
+    session.difficulty = difficulty
+
+    # Snapshot settings so background spare generation never touches st.session_state.
+    generation_config = dict(st.session_state.generation_config)
+    safety_settings = dict(st.session_state.safety_settings)
+    # Questions from earlier stored interviews for this role/round, used to filter repeats.
+    history_index = get_history_index(role, round_type)
+
+    def bank_fallback(exc: RuntimeError, asked: list) -> str:
+        # Keep the session alive during provider incidents: serve a local question instead.
+        if not is_provider_incident(exc):
+            raise exc
+        question = get_question_bank().lookup(role, round_type, difficulty, exclude=asked)
+        if question is None:
+            raise exc
+        logger.warning("Serving a question-bank question after provider failure: %s", exc)
+        return question
+
+    def generate_for_session(previous_questions: list) -> str:
+        # Set sessions stay off the network too: their spares come from the bank.
+        if bank_mode or interview_set is not None:
+            # Bank questions need no network call; Gemini only fills in once the bank runs dry.
+            question = get_question_bank().lookup(role, round_type, difficulty, exclude=previous_questions)
+            if question is not None:
+                return question
+        try:
+            return generate_question(
+                role=role,
+                company=company,
+                round_type=round_type,
+                difficulty=difficulty,
+                previous_questions=previous_questions,
+                api_key=api_key,
+                generation_config=generation_config,
+                safety_settings=safety_settings,
+                similarity_index=history_index,
+                session_id=session_token,
+            )
+        except RuntimeError as exc:
+            return bank_fallback(exc, previous_questions)
+
+    def generate_follow_up(recent_questions: list, conversation_context: str) -> str:
+        try:
+            return generate_question(
+                role=role,
+                company=company,
+                round_type=round_type,
+                difficulty=difficulty,
+                previous_questions=recent_questions,
+                api_key=api_key,
+                generation_config=generation_config,
+                safety_settings=safety_settings,
+                similarity_index=history_index,
+                conversation_context=conversation_context,
+                session_id=session_token,
+            )
+        except RuntimeError as exc:
+            return bank_fallback(exc, list(session.questions))
+
+    spare_pool = get_spare_pool(session_token)
+    window_pool = get_window_pool(session_token) if windowed else None
+    conversation = get_conversation_engine(session_token)
+    # Adaptive mode starts with one question and generates each follow-up on demand;
+    # marathon mode starts with one and keeps the next few ready in the window.
+    initial_question_count = 1 if adaptive_mode or windowed else question_count
+    planned_total = max(session.total, question_count) if adaptive_mode or windowed else session.total
+
+    def queued_questions() -> list[str]:
+        # Asked plus prefetched questions, so the spare and window pools never pick the same one.
+        queued = session.questions + spare_pool.ready()
+        return queued + window_pool.ready() if window_pool is not None else queued
+
+    def refill_window() -> None:
+        if window_pool is not None and session.total < planned_total:
+            window_pool.target = min(window_pool.target, planned_total - session.total)
+            window_pool.refill(generate_for_session, queued_questions())
+
+    # A shared set replaces generation entirely: the questions are a cache read.
+    if not session.has_questions and interview_set is not None:
+        session.load_questions(interview_set.questions_for(session_token))
+        journal.record_questions(session)
+        st.rerun()
+
     # Generate questions if we don't have any yet
-    if not st.session_state.questions:
+    if not session.has_questions:
         # Create a container for the loading message
         loading_placeholder = st.empty()
         
@@ -123,27 +266,21 @@ def practice_session(standalone: bool = True):
             
             # Generate questions
             questions = []
-            for i in range(5):
+            for i in range(initial_question_count):
                 # Update progress
-                progress = (i + 1) / 5
+                progress = (i + 1) / initial_question_count
                 with loading_placeholder.container():
-                    st.info(f"🔄 Generating question {i+1} of 5...")
+                    st.info(f"🔄 Generating question {i+1} of {initial_question_count}...")
                     progress_bar.progress(progress)
                 
-                question = generate_question(
-                    role=role,
-                    company=company,
-                    round_type=round_type,
-                    difficulty=difficulty,
-                    previous_questions=questions,  # Use the local questions list
-                    api_key=api_key,
-                    generation_config=st.session_state.generation_config,
-                    safety_settings=st.session_state.safety_settings,
-                )
+                question = generate_for_session(questions)  # Use the local questions list
                 questions.append(question)
             
-            # Store all questions in session state at once
-            st.session_state.questions = questions
+            # Store all questions in the session at once
+            session.load_questions(questions)
+            journal.record_questions(session)
+            spare_pool.refill(generate_for_session, queued_questions())
+            refill_window()
             
             # Clear the loading message
             loading_placeholder.empty()
@@ -155,7 +292,7 @@ def practice_session(standalone: bool = True):
             loading_placeholder.empty()
             st.error(f"❌ Content safety violation: {str(e)}")
             st.info("Please adjust your safety settings or try again.")
-            st.session_state.questions = []  # Reset questions
+            session.reset()
             st.stop()
             
         except Exception as e:
@@ -166,10 +303,37 @@ def practice_session(standalone: bool = True):
                 st.info("Please check your API key in the settings and try again.")
             else:
                 st.error(f"❌ An error occurred while generating questions: {str(e)}")
-            st.session_state.questions = []  # Reset questions
+            session.reset()
             st.stop()
-            
-        st.session_state.question_timers = {}
+
+    if get_provider_breaker().state != STATE_CLOSED:
+        st.info("⚡ Gemini is having trouble right now, so new questions come from the local question bank.")
+
+    session_spend = get_usage_ledger().session_totals(session_token)
+    if session_spend.calls:
+        st.caption(
+            f"Gemini usage this interview: {session_spend.tokens:,} tokens "
+            f"(${session_spend.cost_usd:.4f}, {session_spend.calls} calls)"
+        )
+
+    if interview_set is not None:
+        st.caption(f"🔗 Interview set {interview_set.code}")
+    elif not session.finished:
+        with st.expander("🔗 Share this question set"):
+            st.caption("Save these questions under a short code so others can practise the same interview without generating it again.")
+            shuffle_set = st.checkbox("Shuffle the order for each person", key="share_set_shuffle")
+            if st.button("Create share code"):
+                st.session_state.shared_set_code = get_interview_set_store().create(
+                    role=role,
+                    company=company,
+                    round_type=round_type,
+                    difficulty=difficulty,
+                    questions=list(session.questions),
+                    shuffle=shuffle_set,
+                ).code
+            if st.session_state.get("shared_set_code"):
+                st.success(f"Share code: **{st.session_state.shared_set_code}**")
+                st.code(f"?set={st.session_state.shared_set_code}", language=None)
 
     round_key = round_type.lower()
     difficulty_key = difficulty.lower()
@@ -184,19 +348,27 @@ def practice_session(standalone: bool = True):
         }
         per_question_seconds = per_question_seconds_map.get(difficulty_key, 5 * 60)
 
-    interview_finished = st.session_state.get('finished', False)
-    if interview_finished:
+    if session.finished:
         st.session_state.audio_mode_enabled = False
         st.session_state.audio_checkbox = False
-        total_questions = len(st.session_state.questions)
-        snapshot_answers: dict[int, str] = {}
-        for idx in range(total_questions):
-            widget_key = f"answer_input_{idx}"
-            if widget_key in st.session_state:
-                snapshot_answers[idx] = st.session_state[widget_key]
-            else:
-                snapshot_answers[idx] = st.session_state.answers.get(idx, "")
-        st.session_state.answers.update(snapshot_answers)
+        if st.session_state.get("history_save_error"):
+            st.warning(f"Interview could not be saved to history: {st.session_state.history_save_error}")
+        # Local scoring is instant and offline; the Gemini grader is an optional
+        # deeper pass that runs on a worker thread while the status block renders.
+        local_feedback = score_answers(role, round_type, difficulty, session.answers)
+        grading_future = None
+        if st.session_state.get("ai_grading_requested"):
+            grading_future = submit_grading(
+                role,
+                company,
+                round_type,
+                difficulty,
+                session.questions,
+                session.answers,
+                api_key=api_key,
+                safety_settings=st.session_state.safety_settings,
+                session_id=session_token,
+            )
         st.markdown(
             """
             <div style="
@@ -220,80 +392,58 @@ def practice_session(standalone: bool = True):
             """,
             unsafe_allow_html=True,
         )
-        display_interview_summary(st.session_state.questions, st.session_state.answers)
+        grades = local_feedback.answers
+        if grading_future is not None:
+            try:
+                with st.spinner("Scoring your answers with Gemini..."):
+                    grades = grading_future.result(timeout=GRADING_TIMEOUT_SECONDS)
+            except TimeoutError:
+                st.caption("AI scoring is taking longer than expected. Reload the page to check again.")
+            except Exception as e:
+                st.caption(f"AI scoring is unavailable right now: {str(e)}")
+        elif st.button("🤖 Deeper AI Review", help="Score every answer with Gemini in a single request."):
+            st.session_state.ai_grading_requested = True
+            st.rerun()
+        display_interview_summary(session.questions, session.answers_by_index(), grades)
 
-        role = st.query_params.get("role", "Software Engineer").lower()
         st.write("### Overall Feedback")
-        response_lengths = [len(st.session_state.answers.get(i, "")) for i in range(len(st.session_state.questions))]
-        avg_response_length = sum(response_lengths) / len(response_lengths) if response_lengths else 0
-        feedback = ["✅ You completed all the interview questions!"]
-        if avg_response_length < 100:
-            feedback.append("🔧 Consider providing more detailed answers with specific examples.")
-        role_specific = {
-            "software engineer": [
-                "💻 Great job on the technical questions!",
-                "💡 Consider discussing your problem-solving process in more detail.",
-                "📚 Keep practicing coding challenges to improve your speed and accuracy.",
-            ],
-            "data scientist": [
-                "📊 Good work on the data analysis questions!",
-                "🧠 Consider discussing more about your approach to data cleaning and feature engineering.",
-                "📈 Practice explaining complex statistical concepts in simple terms.",
-            ],
-            "product manager": [
-                "🎯 Good job on the product thinking questions!",
-                "🤝 Consider discussing more about stakeholder management.",
-                "📝 Practice creating clear and concise product requirements.",
-            ],
-        }
-        feedback.extend(
-            role_specific.get(
-                role,
-                [
-                    "😎 You're doing great!",
-                    "📚 Keep practicing to improve your interview skills.",
-                ],
-            )
-        )
-        for item in feedback:
+        for item in local_feedback.overall:
             st.write(f"- {item}")
 
         col1, col2 = st.columns(2)
         with col1:
             if st.button("🔄 Start New Interview", use_container_width=True):
-                all_keys = (
-                    [
-                        'paused',
-                        'finished',
-                        'questions',
-                        'current_question_index',
-                        'question_timers',
-                        'question_locked',
-                        'audio_mode_enabled',
-                        'audio_checkbox',
-                    ]
-                    + [f"answer_{i}" for i in range(10)]
-                )
-                for key in all_keys:
-                    st.session_state.pop(key, None)
+                # History keys interviews by session token, so the next one gets a fresh token.
+                registry.discard(session_token)
+                journal.discard()
+                discard_spare_pool(session_token)
+                discard_conversation_engine(session_token)
+                reset_interview_state(st.session_state)
+                st.session_state.pop(SESSION_TOKEN_KEY, None)
+                st.query_params.pop("session", None)
                 st.rerun()
         with col2:
             if st.button("🏠 Back to Setup", use_container_width=True):
+                registry.discard(session_token)
+                journal.discard()
+                discard_spare_pool(session_token)
+                discard_conversation_engine(session_token)
                 st.query_params.clear()
                 st.session_state.clear()
                 st.rerun()
 
         return
     else:
-        current_index = st.session_state.current_question_index
-        if 'question_timers' not in st.session_state:
-            st.session_state.question_timers = {}
-        if 'question_locked' not in st.session_state:
-            st.session_state.question_locked = {}
-        if current_index not in st.session_state.question_timers:
-            st.session_state.question_timers[current_index] = time.time()
-
-        question_start_time = st.session_state.question_timers[current_index]
+        # Keeps spares topped up after a resume or a failed background refill.
+        spare_pool.refill(generate_for_session, queued_questions())
+        refill_window()
+        current_index = session.current_index
+        timer_was_running = session.timer_start(current_index) is not None
+        question_start_time = session.start_timer(current_index, time.time())
+        if session.events.viewing != current_index:
+            session.events.record(EVENT_VIEW, current_index)
+        if not timer_was_running:
+            journal.record_timer(session, current_index)
         elapsed = max(0, int(time.time() - question_start_time))
         elapsed = min(elapsed, per_question_seconds)
         remaining = per_question_seconds - elapsed
@@ -364,35 +514,35 @@ def practice_session(standalone: bool = True):
         
         components.html(timer_html, height=110, scrolling=False)
         if remaining == 0:
-            st.session_state.question_locked[current_index] = True
+            if not session.is_locked(current_index):
+                session.lock(current_index)
+                session.events.record(EVENT_LOCK, current_index)
+                journal.record_lock(session, current_index)
             st.warning("Time's up for this question. Move to the next one when you're ready.")
 
     # Display the current question with safety check
     try:
-        current_question = st.session_state.questions[st.session_state.current_question_index]
+        current_question = session.current_question
         st.markdown(f'<div class="question">{current_question}</div>', unsafe_allow_html=True)
     except IndexError:
         st.error("No questions available. Please check your settings and try again.")
         return
     
     # Display current question and response area
+    current_index = session.current_index
     display_question(
         current_question,
-        st.session_state.current_question_index,
-        len(st.session_state.questions)
+        current_index,
+        planned_total
     )
     
-    # Initialize answers in session state if not exists
-    if 'answers' not in st.session_state:
-        st.session_state.answers = {}
-    
     # Get current answer or initialize empty
-    current_answer = st.session_state.answers.get(st.session_state.current_question_index, "")
+    current_answer = session.answer(current_index)
     
     # Display response area and get user input
-    current_locked = st.session_state.question_locked.get(st.session_state.current_question_index, False)
-    response_container_id = f"response-area-{st.session_state.current_question_index}"
-    widget_key = f"answer_input_{st.session_state.current_question_index}"
+    current_locked = session.is_locked(current_index)
+    response_container_id = f"response-area-{current_index}"
+    widget_key = answer_widget_key(current_index)
     
     # Get audio mode state
     audio_mode = st.session_state.get("audio_mode_enabled", st.session_state.get("audio_checkbox", False))
@@ -409,7 +559,7 @@ def practice_session(standalone: bool = True):
         # Response area (text input or hidden when in audio mode)
         st.markdown(f'<div id="{response_container_id}">', unsafe_allow_html=True)
         user_response = display_response_area(
-            st.session_state.current_question_index,
+            current_index,
             current_answer,
             disabled=current_locked,
             hidden=audio_mode and not current_locked,
@@ -433,10 +583,65 @@ def practice_session(standalone: bool = True):
         if audio_only_mode and not current_locked:
             st.info("🎙️ Audio mode is enabled. Answers are captured from your microphone only.")
     
+    if round_key == "coding" and RUNNER_ENABLED:
+        # Optional: run a Python solution against the question's tests in the sandbox pool.
+        code_runner = get_code_runner()
+        code_key, code_result_key = code_widget_keys(current_index)
+        with st.expander("🧪 Test your code", expanded=bool(st.session_state.get(code_key))):
+            if not code_runner.available:
+                st.caption(code_runner.unavailable_reason)
+            else:
+                code_runner.start()
+                code = st.text_area(
+                    "Python solution",
+                    key=code_key,
+                    height=240,
+                    placeholder="def solution(...):\n    ...",
+                    disabled=current_locked,
+                )
+                if st.button("▶️ Run tests", key=f"run_{code_key}", disabled=not (code or "").strip()):
+                    record = get_question_bank().record_for(current_question, round_type)
+                    try:
+                        if record and record.get("tests"):
+                            suite = TestSuite.from_dict(record["tests"], source="bank")
+                        else:
+                            with st.spinner("Writing test cases for this question..."):
+                                generated = generate_test_suite(
+                                    current_question,
+                                    round_type,
+                                    difficulty,
+                                    api_key=api_key,
+                                    safety_settings=safety_settings,
+                                    session_id=session_token,
+                                )
+                            suite = TestSuite.from_dict(generated, source="generated") if generated else None
+                    except (RuntimeError, ValueError) as e:
+                        st.error(f"❌ Could not prepare tests: {str(e)}")
+                    else:
+                        if suite is None:
+                            st.info("This question has no automated tests. Explain your approach in the answer instead.")
+                        else:
+                            with st.spinner(f"Running {len(suite.cases)} tests..."):
+                                st.session_state[code_result_key] = (code_runner.run(code, suite), suite)
+                stored = st.session_state.get(code_result_key)
+                if stored:
+                    st.caption(f"Tests call `{stored[1].function}(...)`.")
+                    display_code_results(*stored)
+
     # Get the latest response after potential audio updates
     latest_response = st.session_state.get(widget_key, user_response)
-    st.session_state.answers[st.session_state.current_question_index] = latest_response
-    aria_label = get_response_aria_label(st.session_state.current_question_index)
+    if (latest_response or "") != session.answer(current_index):
+        session.set_answer(current_index, latest_response, time.time())
+        session.events.record(EVENT_AUDIO if audio_mode else EVENT_EDIT, current_index, len(latest_response or ""))
+        journal.record_answer(session, current_index)
+    awaiting_follow_up = (
+        adaptive_mode and current_index == session.total - 1 and session.total < planned_total
+    )
+    if awaiting_follow_up:
+        # Start on the follow-up while the candidate is still answering.
+        conversation.speculate(generate_follow_up, session.questions, session.answers)
+    awaiting_window = windowed and current_index == session.total - 1 and session.total < planned_total
+    aria_label = get_response_aria_label(current_index)
     
     # Add some spacing before navigation
     st.markdown('<div style="margin-top: 1.5rem;"></div>', unsafe_allow_html=True)
@@ -517,7 +722,7 @@ def practice_session(standalone: bool = True):
             }}
 
             window.addEventListener('message', (event) => {{
-                if (event?.data?.type === 'timer-lock' && event.data.index === {st.session_state.current_question_index}) {{
+                if (event?.data?.type === 'timer-lock' && event.data.index === {current_index}) {{
                     lockTextarea();
                 }}
                 if (event?.data?.type === 'audio-transcript' && event.data.targetId === containerId) {{
@@ -535,19 +740,69 @@ def practice_session(standalone: bool = True):
     
     # Handle navigation buttons
     prev_clicked, next_clicked, new_question_clicked, finish_clicked = display_navigation_buttons(
-        st.session_state.current_question_index,
-        len(st.session_state.questions)
+        current_index,
+        planned_total
     )
     
     # Handle button actions
     if prev_clicked:
-        st.session_state.current_question_index -= 1
+        session.events.record(EVENT_LEAVE, current_index)
+        session.go_to(current_index - 1)
+        journal.record_navigation(session)
         st.rerun()
     elif next_clicked:
-        st.session_state.current_question_index += 1
+        if awaiting_follow_up:
+            try:
+                with st.spinner("Preparing a follow-up question..."):
+                    follow_up = conversation.next_question(
+                        generate_follow_up, session.questions, session.answers
+                    )
+            except Exception as e:
+                st.error(f"❌ Could not generate a follow-up question: {str(e)}")
+                st.stop()
+            session.append_question(follow_up)
+            journal.record_append(session)
+        elif awaiting_window:
+            upcoming = window_pool.take()
+            if upcoming is None:
+                try:
+                    with st.spinner("Generating the next question..."):
+                        upcoming = generate_for_session(queued_questions())
+                except Exception as e:
+                    st.error(f"❌ Could not generate the next question: {str(e)}")
+                    st.stop()
+            session.append_question(upcoming)
+            journal.record_append(session)
+        session.events.record(EVENT_LEAVE, current_index)
+        session.go_to(current_index + 1)
+        journal.record_navigation(session)
+        st.rerun()
+    elif new_question_clicked:
+        replacement = spare_pool.take()
+        if replacement is None:
+            try:
+                with st.spinner("Generating a new question..."):
+                    replacement = generate_for_session(queued_questions())
+            except Exception as e:
+                st.error(f"❌ Could not generate a new question: {str(e)}")
+                st.stop()
+        session.replace_question(current_index, replacement)
+        session.events.record(EVENT_REPLACE, current_index)
+        st.session_state.pop(answer_widget_key(current_index), None)
+        for key in code_widget_keys(current_index):
+            st.session_state.pop(key, None)
+        journal.record_replace(session, current_index)
+        spare_pool.refill(generate_for_session, queued_questions())
         st.rerun()
     elif finish_clicked:
-        st.session_state.finished = True
+        session.finish()
+        session.events.record(EVENT_FINISH, current_index)
+        journal.record_finish(session)
+        try:
+            get_history_store().save_interview(session_token, session)
+        except Exception as e:
+            # Shown on the summary page; a warning here would vanish with the rerun.
+            st.session_state.history_save_error = str(e)
         st.session_state.audio_mode_enabled = False
         st.session_state.audio_checkbox = False
         st.rerun()
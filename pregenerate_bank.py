@@ -0,0 +1,285 @@
+"""Bulk pre-generation of question banks.
+
+Reads a list of targets (CSV with ``role,company,round,difficulty[,count]``
+columns, or JSONL with the same keys), generates questions for them in
+parallel with ``generate_question`` and writes the result in the indexed
+question-bank format (see question_bank.py).
+
+Calls are I/O bound, so targets run on a thread pool; a shared token bucket
+keeps the whole run under ``--rpm`` requests per minute. Every accepted
+question is appended to a checkpoint file first, so an interrupted run picks
+up where it stopped. Questions are de-duplicated across all targets and any
+existing output with the same near-duplicate check used at runtime.
+
+    python pregenerate_bank.py targets.csv banks/catalogue.jsonl --workers 8 --rpm 120
+    LLM_PROVIDER=offline python pregenerate_bank.py targets.csv /tmp/bank.jsonl
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+DEFAULT_COUNT = 10
+DEFAULT_WORKERS = 4
+DEFAULT_RPM = 60
+# Attempts per wanted question before a target is reported as exhausted.
+MAX_ATTEMPTS_PER_QUESTION = 4
+CIRCUIT_RETRY_SECONDS = 5.0
+
+
+@dataclass(frozen=True)
+class Target:
+    role: str
+    company: str
+    round_type: str
+    difficulty: str
+    count: int
+
+    @property
+    def key(self) -> str:
+        return target_key(self.role, self.company, self.round_type, self.difficulty)
+
+
+def target_key(role: str, company: str, round_type: str, difficulty: str) -> str:
+    return "|".join([role, company, round_type, difficulty]).lower()
+
+
+def record_key(record: dict) -> str:
+    return target_key(record["role"], record.get("company", ""), record["round"], record["difficulty"])
+
+
+def load_targets(path: Path, default_count: int) -> list[Target]:
+    with open(path, encoding="utf-8", newline="") as handle:
+        if path.suffix == ".jsonl":
+            rows = [json.loads(line) for line in handle if line.strip()]
+        else:
+            rows = list(csv.DictReader(handle))
+    return [
+        Target(
+            role=row["role"].strip(),
+            company=(row.get("company") or "").strip(),
+            round_type=row["round"].strip(),
+            difficulty=row["difficulty"].strip(),
+            count=int(row.get("count") or default_count),
+        )
+        for row in rows
+    ]
+
+
+class RateLimiter:
+    """Token bucket shared by all workers."""
+
+    def __init__(self, per_minute: float) -> None:
+        self.interval = 60.0 / per_minute if per_minute > 0 else 0.0
+        self._next = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            now = time.monotonic()
+            slot = max(self._next, now)
+            self._next = slot + self.interval
+        if slot > now:
+            time.sleep(slot - now)
+
+
+class Checkpoint:
+    """Append-only log of accepted questions, the source of truth for resuming."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        self.records: list[dict] = []
+        if path.exists():
+            with open(path, encoding="utf-8") as handle:
+                for line in handle:
+                    try:
+                        self.records.append(json.loads(line))
+                    except ValueError:
+                        break  # Torn final line from an interrupted write.
+        self._handle = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def append(self, record: dict) -> None:
+        with self._lock:
+            self.records.append(record)
+            self._handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._handle.flush()
+            os.fsync(self._handle.fileno())
+
+    def close(self) -> None:
+        self._handle.close()
+
+
+class BankGenerator:
+    def __init__(
+        self,
+        output: Path,
+        workers: int = DEFAULT_WORKERS,
+        rpm: float = DEFAULT_RPM,
+        api_key: Optional[str] = None,
+    ) -> None:
+        # Imported here so ``--help`` and argument errors stay instant.
+        from question_index import QuestionIndex
+
+        self.output = output
+        self.workers = workers
+        self.api_key = api_key
+        self.limiter = RateLimiter(rpm)
+        self.checkpoint = Checkpoint(output.with_suffix(output.suffix + ".checkpoint"))
+        existing = self._read_bank(output)
+        self.existing = existing
+        self.seen_exact = {record["question"] for record in existing + self.checkpoint.records}
+        self.seen_index = QuestionIndex(self.seen_exact)
+        # Questions already written or checkpointed count towards each target, so reruns resume.
+        self.done: dict[str, list[str]] = {}
+        for record in existing + self.checkpoint.records:
+            self.done.setdefault(record_key(record), []).append(record["question"])
+        self._seen_lock = threading.Lock()
+        self.exhausted: list[str] = []
+
+    @staticmethod
+    def _read_bank(path: Path) -> list[dict]:
+        if not path.exists():
+            return []
+        with open(path, encoding="utf-8") as handle:
+            return [json.loads(line) for line in handle if line.strip()]
+
+    def _accept(self, question: str) -> bool:
+        from question_index import is_near_duplicate
+
+        with self._seen_lock:
+            if question in self.seen_exact or is_near_duplicate(question, self.seen_index):
+                return False
+            self.seen_exact.add(question)
+            self.seen_index.add(question)
+            return True
+
+    def _run_target(self, target: Target) -> int:
+        from circuit_breaker import CircuitOpenError
+        from llm_utils import generate_question
+
+        questions = list(self.done.get(target.key, []))
+        attempts = 0
+        while len(questions) < target.count:
+            if attempts >= target.count * MAX_ATTEMPTS_PER_QUESTION:
+                self.exhausted.append(target.key)
+                break
+            self.limiter.wait()
+            try:
+                question = generate_question(
+                    role=target.role,
+                    company=target.company,
+                    round_type=target.round_type,
+                    difficulty=target.difficulty,
+                    previous_questions=questions,
+                    api_key=self.api_key,
+                )
+            except CircuitOpenError:
+                # A provider outage is not this target's fault: wait without using an attempt.
+                time.sleep(CIRCUIT_RETRY_SECONDS)
+                continue
+            except RuntimeError as exc:
+                attempts += 1
+                print(f"[{target.key}] generation failed: {exc}", file=sys.stderr)
+                continue
+            attempts += 1
+            if not self._accept(question):
+                continue
+            questions.append(question)
+            self.checkpoint.append(
+                {
+                    "role": target.role,
+                    "company": target.company,
+                    "round": target.round_type,
+                    "difficulty": target.difficulty,
+                    "tags": [target.company] if target.company else [],
+                    "question": question,
+                }
+            )
+        return len(questions)
+
+    def run(self, targets: list[Target]) -> Path:
+        import llm_utils  # noqa: F401  Load the SDK before timing the run.
+        from question_bank import build_index
+
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="pregenerate") as pool:
+            futures = {pool.submit(self._run_target, target): target for target in targets}
+            for done, future in enumerate(as_completed(futures), start=1):
+                target = futures[future]
+                print(
+                    f"[{done}/{len(targets)}] {target.key}: {future.result()}/{target.count}",
+                    file=sys.stderr,
+                )
+        self.checkpoint.close()
+        self._write_bank()
+        generated = len(self.checkpoint.records)  # Includes questions from a resumed checkpoint.
+        elapsed = time.monotonic() - started
+        print(f"{generated} questions in {elapsed:.1f}s ({generated / max(elapsed, 1e-9):.2f}/s)", file=sys.stderr)
+        return build_index(self.output)
+
+    def _write_bank(self) -> None:
+        """Merge the checkpoint into the output bank atomically, then drop the checkpoint."""
+
+        tmp_path = self.output.with_suffix(self.output.suffix + ".tmp")
+        written = set()
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            # A run interrupted between replace and unlink leaves records in both places.
+            for record in self.existing + self.checkpoint.records:
+                if record["question"] not in written:
+                    written.add(record["question"])
+                    handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+        os.replace(tmp_path, self.output)
+        self.checkpoint.path.unlink()
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Pre-generate an indexed interview question bank.")
+    parser.add_argument("targets", type=Path, help="CSV or JSONL with role, company, round, difficulty[, count]")
+    parser.add_argument("output", type=Path, help="bank JSONL to write (an .idx index is written next to it)")
+    parser.add_argument("--count", type=int, default=DEFAULT_COUNT, help="questions per target without a count")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--rpm", type=float, default=DEFAULT_RPM, help="request limit per minute (0 = unlimited)")
+    parser.add_argument("--offline", action="store_true", help="use the offline stand-in provider")
+    parser.add_argument("--quiet", action="store_true", help="only log warnings and errors")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.DEBUG if args.verbose else logging.WARNING if args.quiet else logging.INFO,
+        format="%(levelname)s %(name)s: %(message)s",
+    )
+    if args.offline:
+        os.environ["LLM_PROVIDER"] = "offline"
+    try:
+        from dotenv import load_dotenv
+
+        load_dotenv()
+    except ImportError:
+        pass
+
+    targets = load_targets(args.targets, args.count)
+    args.output.parent.mkdir(parents=True, exist_ok=True)
+    generator = BankGenerator(args.output, args.workers, args.rpm, os.getenv("GOOGLE_API_KEY"))
+    index_path = generator.run(targets)
+    print(f"Wrote {args.output} and {index_path}", file=sys.stderr)
+    for key in generator.exhausted:
+        print(f"Could not find enough distinct questions for {key}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
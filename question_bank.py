@@ -0,0 +1,327 @@
+"""Indexed offline question bank.
+
+A bank is a JSONL file (``banks/<name>.jsonl``), one record per line with
+``role``, ``round``, ``difficulty``, ``tags`` and ``question`` (Coding
+questions may also carry a ``tests`` suite for the code runner), plus a prebuilt
+binary index next to it (``<name>.idx``). The index is a JSON header holding
+the role, round, difficulty and tag vocabularies followed by one fixed-width
+row per question (byte offset and length in the JSONL file, role, round and
+difficulty ids, and a tag bitmask). Both files are memory-mapped, so opening
+a bank costs almost nothing and a lookup is a vectorized mask over the rows
+followed by reading a single line.
+
+Roles are matched fuzzily: an exact normalized match first, then the role's
+canonical profile (so "Full Stack Developer" finds "Software Engineer"
+questions), then bank roles sharing most of its words, then generic questions.
+
+The bank serves offline sessions, the circuit-breaker fallback and any
+tooling that pre-generates questions. Rebuild an index with
+``python question_bank.py build banks/``; stale or missing indexes are also
+rebuilt on open.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import random
+import struct
+import sys
+import tempfile
+import threading
+import zlib
+from pathlib import Path
+from typing import Iterable, Optional
+
+import numpy as np
+
+from role_profiles import ROLE_PROFILES, match_role_profile, normalize_text
+
+BANK_DIR = Path(os.getenv("QUESTION_BANK_DIR", Path(__file__).resolve().parent / "banks"))
+INDEX_MAGIC = b"QBIDX1\0\0"
+MAX_TAGS = 64
+ROLE_OVERLAP_THRESHOLD = 0.5
+
+INDEX_DTYPE = np.dtype(
+    [
+        ("offset", "<u8"),
+        ("length", "<u4"),
+        ("role", "<u2"),
+        ("round", "u1"),
+        ("difficulty", "u1"),
+        ("tags", "<u8"),
+    ]
+)
+
+
+def normalize_record(record: dict) -> dict:
+    """Return the record with role, round, difficulty and tags in their indexed form."""
+
+    return {
+        "role": normalize_text(record.get("role", "")),
+        "round": normalize_text(record["round"]),
+        "difficulty": normalize_text(record["difficulty"]),
+        "tags": sorted({normalize_text(tag) for tag in record.get("tags", []) if tag}),
+        "question": record["question"].strip(),
+    }
+
+
+def index_path_for(bank_path: Path) -> Path:
+    return bank_path.with_suffix(".idx")
+
+
+def _file_crc32(path: Path) -> int:
+    crc = 0
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(1 << 20), b""):
+            crc = zlib.crc32(chunk, crc)
+    return crc
+
+
+def build_index(bank_path: Path, index_path: Optional[Path] = None) -> Path:
+    """Scan a JSONL bank and write its binary index; returns the index path."""
+
+    bank_path = Path(bank_path)
+    vocab: dict[str, dict[str, int]] = {"roles": {"": 0}, "rounds": {}, "difficulties": {}, "tags": {}}
+    rows = []
+    offset = 0
+    with open(bank_path, "rb") as handle:
+        for line in handle:
+            length = len(line)
+            if line.strip():
+                record = normalize_record(json.loads(line))
+                tag_bits = 0
+                for tag in record["tags"]:
+                    tag_id = vocab["tags"].setdefault(tag, len(vocab["tags"]))
+                    if tag_id < MAX_TAGS:
+                        tag_bits |= 1 << tag_id
+                rows.append(
+                    (
+                        offset,
+                        length,
+                        vocab["roles"].setdefault(record["role"], len(vocab["roles"])),
+                        vocab["rounds"].setdefault(record["round"], len(vocab["rounds"])),
+                        vocab["difficulties"].setdefault(record["difficulty"], len(vocab["difficulties"])),
+                        tag_bits,
+                    )
+                )
+            offset += length
+    stat = bank_path.stat()
+    header = {
+        "bank_size": stat.st_size,
+        "bank_mtime_ns": stat.st_mtime_ns,
+        "bank_crc32": _file_crc32(bank_path),
+        "count": len(rows),
+        **{name: list(ids) for name, ids in vocab.items()},
+    }
+    header_bytes = json.dumps(header).encode("utf-8")
+    # Pad the header so the row table starts 8-byte aligned.
+    header_bytes += b" " * (-(len(INDEX_MAGIC) + 4 + len(header_bytes)) % 8)
+    index_path = Path(index_path or index_path_for(bank_path))
+    tmp_path = index_path.with_suffix(".idx.tmp")
+    with open(tmp_path, "wb") as handle:
+        handle.write(INDEX_MAGIC)
+        handle.write(struct.pack("<I", len(header_bytes)))
+        handle.write(header_bytes)
+        handle.write(np.array(rows, dtype=INDEX_DTYPE).tobytes())
+    os.replace(tmp_path, index_path)
+    return index_path
+
+
+class _Shard:
+    """One memory-mapped bank file and its index."""
+
+    def __init__(self, bank_path: Path) -> None:
+        index_path = index_path_for(bank_path)
+        if not self._index_is_current(bank_path, index_path):
+            try:
+                build_index(bank_path, index_path)
+            except OSError:
+                # Read-only install: keep the rebuilt index in the temp directory instead.
+                index_path = Path(tempfile.gettempdir()) / f"{bank_path.stem}-{_file_crc32(bank_path):08x}.idx"
+                if not self._index_is_current(bank_path, index_path):
+                    build_index(bank_path, index_path)
+        with open(index_path, "rb") as handle:
+            self._index_map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        header_length = struct.unpack_from("<I", self._index_map, len(INDEX_MAGIC))[0]
+        start = len(INDEX_MAGIC) + 4
+        header = json.loads(bytes(self._index_map[start : start + header_length]))
+        self.rows = np.frombuffer(
+            self._index_map, dtype=INDEX_DTYPE, count=header["count"], offset=start + header_length
+        )
+        self.roles = {name: i for i, name in enumerate(header["roles"])}
+        self.rounds = {name: i for i, name in enumerate(header["rounds"])}
+        self.difficulties = {name: i for i, name in enumerate(header["difficulties"])}
+        self.tags = {name: i for i, name in enumerate(header["tags"])}
+        with open(bank_path, "rb") as handle:
+            self._bank_map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ) if header["count"] else b""
+
+    @staticmethod
+    def _index_is_current(bank_path: Path, index_path: Path) -> bool:
+        try:
+            with open(index_path, "rb") as handle:
+                if handle.read(len(INDEX_MAGIC)) != INDEX_MAGIC:
+                    return False
+                header_length = struct.unpack("<I", handle.read(4))[0]
+                header = json.loads(handle.read(header_length))
+        except (OSError, ValueError, struct.error):
+            return False
+        stat = bank_path.stat()
+        if header["bank_size"] != stat.st_size:
+            return False
+        # A fresh checkout changes mtimes without changing content, so fall back to the checksum.
+        return header["bank_mtime_ns"] == stat.st_mtime_ns or header.get("bank_crc32") == _file_crc32(bank_path)
+
+    def record(self, row: int) -> dict:
+        entry = self.rows[row]
+        start = int(entry["offset"])
+        return json.loads(self._bank_map[start : start + int(entry["length"])])
+
+    def question(self, row: int) -> str:
+        return self.record(row)["question"].strip()
+
+    def candidates(
+        self, role_names: list[str], round_key: str, difficulty_key: str, tag_names: list[str]
+    ) -> list[list[int]]:
+        """Return matching row numbers for each entry of ``role_names``."""
+
+        round_id = self.rounds.get(round_key)
+        difficulty_id = self.difficulties.get(difficulty_key)
+        if round_id is None or difficulty_id is None:
+            return [[] for _ in role_names]
+        mask = (self.rows["round"] == round_id) & (self.rows["difficulty"] == difficulty_id)
+        if tag_names:
+            bits = 0
+            for tag in tag_names:
+                tag_id = self.tags.get(tag)
+                if tag_id is None or tag_id >= MAX_TAGS:
+                    return [[] for _ in role_names]
+                bits |= 1 << tag_id
+            mask &= (self.rows["tags"] & np.uint64(bits)) == np.uint64(bits)
+        role_column = self.rows["role"]
+        ordered = []
+        for name in role_names:
+            role_id = self.roles.get(name)
+            ordered.append([] if role_id is None else np.flatnonzero(mask & (role_column == role_id)).tolist())
+        return ordered
+
+
+class QuestionBank:
+    def __init__(self, paths: Iterable[Path]) -> None:
+        self._shards = [_Shard(Path(path)) for path in paths]
+        self.size = sum(len(shard.rows) for shard in self._shards)
+
+    def resolve_roles(self, role: str) -> list[str]:
+        """Return bank role keys for a free-text role, best match first, ending with generic."""
+
+        wanted = normalize_text(role)
+        known = {name for shard in self._shards for name in shard.roles if name}
+        resolved = []
+        if wanted in known:
+            resolved.append(wanted)
+        profile = match_role_profile(role)
+        if profile and profile not in resolved:
+            resolved.append(profile)
+        wanted_words = set(wanted.split())
+        profile_words = set(" ".join(ROLE_PROFILES[profile]["match"]).split()) if profile else set()
+        scored = []
+        for name in known - set(resolved):
+            words = set(name.split())
+            overlap = len(words & (wanted_words | profile_words)) / len(words)
+            if overlap >= ROLE_OVERLAP_THRESHOLD:
+                scored.append((-overlap, name))
+        resolved.extend(name for _, name in sorted(scored))
+        resolved.append("")
+        return resolved
+
+    def sample(
+        self,
+        role: str,
+        round_type: str,
+        difficulty: str,
+        count: int,
+        exclude: Iterable[str] = (),
+        tags: Iterable[str] = (),
+        rng: Optional[random.Random] = None,
+    ) -> list[str]:
+        """Return up to ``count`` distinct questions, preferring the closest role match.
+
+        Falls back to the other difficulty levels of the round when the
+        requested one runs out.
+        """
+
+        rng = rng or random
+        asked = set(exclude)
+        role_names = self.resolve_roles(role)
+        round_key = normalize_text(round_type)
+        difficulty_key = normalize_text(difficulty)
+        tag_names = [normalize_text(tag) for tag in tags]
+        levels = [difficulty_key] + sorted(
+            {name for shard in self._shards for name in shard.difficulties} - {difficulty_key}
+        )
+        picked: list[str] = []
+        for level in levels:
+            # Rank by role preference across shards, shuffling within each preference tier.
+            tiers: list[list[tuple[_Shard, int]]] = [[] for _ in role_names]
+            for shard in self._shards:
+                for rank, rows in enumerate(shard.candidates(role_names, round_key, level, tag_names)):
+                    tiers[rank].extend((shard, row) for row in rows)
+            for tier in tiers:
+                rng.shuffle(tier)
+                for shard, row in tier:
+                    question = shard.question(row)
+                    if question not in asked:
+                        asked.add(question)
+                        picked.append(question)
+                        if len(picked) >= count:
+                            return picked
+        return picked
+
+    def lookup(
+        self,
+        role: str,
+        round_type: str,
+        difficulty: str,
+        exclude: Iterable[str] = (),
+        tags: Iterable[str] = (),
+    ) -> Optional[str]:
+        """Return one question for the role, round and difficulty that is not in ``exclude``."""
+
+        found = self.sample(role, round_type, difficulty, 1, exclude=exclude, tags=tags)
+        return found[0] if found else None
+
+    def record_for(self, question: str, round_type: str) -> Optional[dict]:
+        """Return the full bank record for ``question`` (with extras such as ``tests``), if it is in the bank."""
+
+        wanted = question.strip()
+        round_key = normalize_text(round_type)
+        for shard in self._shards:
+            round_id = shard.rounds.get(round_key)
+            if round_id is None:
+                continue
+            for row in np.flatnonzero(shard.rows["round"] == round_id).tolist():
+                if shard.question(row) == wanted:
+                    return shard.record(row)
+        return None
+
+
+_bank: Optional[QuestionBank] = None
+_bank_lock = threading.Lock()
+
+
+def get_question_bank() -> QuestionBank:
+    global _bank
+    if _bank is None:
+        with _bank_lock:
+            if _bank is None:
+                _bank = QuestionBank(sorted(BANK_DIR.glob("*.jsonl")))
+    return _bank
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 3 or sys.argv[1] != "build":
+        sys.exit("usage: python question_bank.py build <bank.jsonl | directory> ...")
+    for target in map(Path, sys.argv[2:]):
+        for path in sorted(target.glob("*.jsonl")) if target.is_dir() else [target]:
+            print(f"{build_index(path)}: {len(_Shard(path).rows)} questions")
@@ -0,0 +1,144 @@
+"""Local near-duplicate detection for generated questions.
+
+Questions are reduced to MinHash signatures over word shingles and kept in a
+single NumPy matrix, so comparing a candidate against every question already
+asked (in the session and in stored history) is one vectorized comparison.
+This lets the generation prompt carry only a short "avoid" hint while
+duplicates are still filtered out after generation.
+"""
+
+from __future__ import annotations
+
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Iterable, Optional
+
+import numpy as np
+
+from history_store import get_history_store, normalize_role
+
+NUM_PERMUTATIONS = 64
+DUPLICATE_THRESHOLD = 0.4
+HISTORY_QUESTIONS_PER_KEY = 2000
+MAX_CACHED_HISTORY_INDEXES = 32
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64((1 << 32) - 1)
+_rng = np.random.default_rng(20240611)
+# a < 2**29 and x < 2**32 keep a*x + b below 2**64, so the arithmetic never wraps.
+_PERM_A = _rng.integers(1, 1 << 29, size=NUM_PERMUTATIONS, dtype=np.uint64)
+_PERM_B = _rng.integers(0, int(_MERSENNE_PRIME), size=NUM_PERMUTATIONS, dtype=np.uint64)
+
+_STOPWORDS = frozenset(
+    "a an the and or of to in on for with your you what how would do does is are was were "
+    "can could describe explain tell me about when why which that this it be as at by from".split()
+)
+
+# Running totals so the duplicate rate can be observed.
+dedup_stats = {"checked": 0, "rejected": 0}
+
+
+def _stem(token: str) -> str:
+    for suffix in ("ing", "es", "ed", "s"):
+        if token.endswith(suffix) and len(token) - len(suffix) >= 3:
+            return token[: -len(suffix)]
+    return token
+
+
+def _shingles(text: str) -> list[str]:
+    tokens = [
+        _stem(token) for token in re.findall(r"[a-z0-9+#]+", (text or "").lower()) if token not in _STOPWORDS
+    ]
+    if len(tokens) < 2:
+        return tokens or [""]
+    return [f"{tokens[i]} {tokens[i + 1]}" for i in range(len(tokens) - 1)] + tokens
+
+
+def minhash_signature(text: str) -> np.ndarray:
+    hashes = np.fromiter(
+        (zlib.crc32(shingle.encode("utf-8")) for shingle in _shingles(text)), dtype=np.uint64
+    )
+    # Universal hashing (a*x + b) mod p applied to every shingle for every permutation at once.
+    permuted = (_PERM_A[:, None] * hashes[None, :] + _PERM_B[:, None]) % _MERSENNE_PRIME
+    return (permuted & _MAX_HASH).min(axis=1).astype(np.uint32)
+
+
+class QuestionIndex:
+    def __init__(self, texts: Iterable[str] = ()) -> None:
+        self._signatures = np.empty((0, NUM_PERMUTATIONS), dtype=np.uint32)
+        self._lock = threading.Lock()
+        self.add_many(texts)
+
+    def __len__(self) -> int:
+        return len(self._signatures)
+
+    def add_many(self, texts: Iterable[str]) -> None:
+        signatures = [minhash_signature(text) for text in texts if text]
+        if signatures:
+            with self._lock:
+                self._signatures = np.vstack([self._signatures, *signatures])
+
+    def add(self, text: str) -> None:
+        self.add_many([text])
+
+    def max_similarity(self, text: str, signature: Optional[np.ndarray] = None) -> float:
+        """Return the highest estimated Jaccard similarity between ``text`` and any indexed question."""
+
+        signatures = self._signatures
+        if not len(signatures):
+            return 0.0
+        if signature is None:
+            signature = minhash_signature(text)
+        return float((signatures == signature).mean(axis=1).max())
+
+    def is_duplicate(self, text: str, threshold: float = DUPLICATE_THRESHOLD) -> bool:
+        return self.max_similarity(text) >= threshold
+
+
+def is_near_duplicate(text: str, *indexes: Optional[QuestionIndex]) -> bool:
+    signature = minhash_signature(text)
+    dedup_stats["checked"] += 1
+    for index in indexes:
+        if index is not None and index.max_similarity(text, signature) >= DUPLICATE_THRESHOLD:
+            dedup_stats["rejected"] += 1
+            return True
+    return False
+
+
+_history_indexes: "OrderedDict[tuple[str, str], tuple[int, QuestionIndex]]" = OrderedDict()
+_history_lock = threading.Lock()
+
+
+def cached_history_index_count() -> int:
+    with _history_lock:
+        return len(_history_indexes)
+
+
+def get_history_index(role: str, round_type: str) -> Optional[QuestionIndex]:
+    """Return an index of questions from stored interviews for this role and round.
+
+    Indexes are cached per (role, round) and rebuilt only when new interviews
+    have been stored since they were built.
+    """
+
+    try:
+        store = get_history_store()
+        latest = store.latest_interview_id()
+    except Exception:
+        return None
+    key = (normalize_role(role), round_type)
+    with _history_lock:
+        cached = _history_indexes.get(key)
+        if cached is not None and cached[0] == latest:
+            _history_indexes.move_to_end(key)
+            return cached[1]
+    index = QuestionIndex(
+        store.recent_questions(role=role, round_type=round_type, limit=HISTORY_QUESTIONS_PER_KEY)
+    )
+    with _history_lock:
+        _history_indexes[key] = (latest, index)
+        while len(_history_indexes) > MAX_CACHED_HISTORY_INDEXES:
+            _history_indexes.popitem(last=False)
+    return index
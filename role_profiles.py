@@ -0,0 +1,163 @@
+"""Static role and round knowledge shared by the setup page and feedback engine.
+
+This module stays dependency free so the setup page can import it without
+pulling in NumPy or the Gemini SDK.
+"""
+
+import re
+
+CODING_KEYWORDS = ["developer", "engineer", "coder", "coding", "programmer", "software"]
+
+# Canonical role profiles: which words in a free-text role select the profile,
+# the concepts a strong answer tends to cover, and the coaching tips shown at
+# the end of an interview.
+ROLE_PROFILES: dict[str, dict[str, list]] = {
+    "software engineer": {
+        # Only qualified engineering titles: a bare "engineer" would pull in
+        # chemical, civil or mechanical engineers.
+        "match": [
+            "software",
+            "developer",
+            "programmer",
+            "coder",
+            "full stack",
+            "backend",
+            "frontend",
+            "web engineer",
+            "mobile engineer",
+            "platform engineer",
+            "devops engineer",
+            "site reliability engineer",
+            "sre",
+            "swe",
+            "sde",
+        ],
+        "concepts": [
+            ["complexity", "big o", "o(n)", "o(log n)", "o(1)", "runtime"],
+            ["edge case", "edge cases", "corner case", "null", "empty input"],
+            ["test", "tests", "unit test", "testing"],
+            ["trade-off", "tradeoff", "trade off"],
+            ["scalable", "scalability", "scale", "performance"],
+            ["api", "database", "cache", "queue"],
+            ["refactor", "maintainable", "readable", "clean code"],
+        ],
+        "tips": [
+            "💻 Great job on the technical questions!",
+            "💡 Consider discussing your problem-solving process in more detail.",
+            "📚 Keep practicing coding challenges to improve your speed and accuracy.",
+        ],
+    },
+    "data scientist": {
+        "match": ["data scientist", "data science", "machine learning", "ml", "analyst", "statistician"],
+        "concepts": [
+            ["feature", "features", "feature engineering"],
+            ["cleaning", "missing values", "outlier", "outliers", "imputation"],
+            ["model", "regression", "classification", "clustering"],
+            ["validation", "cross validation", "overfitting", "test set"],
+            ["metric", "accuracy", "precision", "recall", "auc", "rmse"],
+            ["hypothesis", "significance", "p-value", "a/b test", "experiment"],
+        ],
+        "tips": [
+            "📊 Good work on the data analysis questions!",
+            "🧠 Consider discussing more about your approach to data cleaning and feature engineering.",
+            "📈 Practice explaining complex statistical concepts in simple terms.",
+        ],
+    },
+    "product manager": {
+        "match": ["product manager", "product owner", "product", "pm"],
+        "concepts": [
+            ["user", "users", "customer", "customers", "persona"],
+            ["metric", "metrics", "kpi", "okr", "north star"],
+            ["stakeholder", "stakeholders", "alignment"],
+            ["prioritize", "prioritization", "roadmap", "trade-off", "tradeoff"],
+            ["requirement", "requirements", "spec", "user story"],
+            ["experiment", "mvp", "launch", "iterate"],
+        ],
+        "tips": [
+            "🎯 Good job on the product thinking questions!",
+            "🤝 Consider discussing more about stakeholder management.",
+            "📝 Practice creating clear and concise product requirements.",
+        ],
+    },
+}
+
+DEFAULT_ROLE_TIPS = [
+    "😎 You're doing great!",
+    "📚 Keep practicing to improve your interview skills.",
+]
+
+ROUND_CONCEPTS: dict[str, list[list[str]]] = {
+    "warm up": [
+        ["experience", "background", "worked", "years"],
+        ["passion", "motivated", "excited", "interested"],
+        ["goal", "goals", "growth", "learn"],
+    ],
+    "coding": [
+        ["approach", "algorithm", "solution", "brute force"],
+        ["complexity", "big o", "o(n)", "o(log n)", "o(1)"],
+        ["edge case", "edge cases", "corner case"],
+        ["test", "tests", "example", "dry run"],
+    ],
+    "role related": [
+        ["example", "for example", "for instance", "project"],
+        ["trade-off", "tradeoff", "pros", "cons"],
+        ["impact", "result", "outcome", "improved"],
+    ],
+    "behavioral": [
+        ["team", "colleague", "manager", "stakeholder"],
+        ["learned", "lesson", "reflect", "next time"],
+        ["impact", "improved", "reduced", "increased"],
+    ],
+}
+
+# STAR markers for Behavioral answers: Situation, Task, Action, Result.
+STAR_MARKERS: list[list[str]] = [
+    ["situation", "when i was", "at my previous", "context", "background", "once"],
+    ["task", "goal", "responsible", "needed to", "had to", "challenge"],
+    ["action", "i decided", "i implemented", "i organized", "i led", "i worked", "so i"],
+    ["result", "as a result", "outcome", "in the end", "which led", "ultimately", "%"],
+]
+STAR_LABELS = ["Situation", "Task", "Action", "Result"]
+
+# Structure markers for every other round: sequencing, reasoning and examples.
+STRUCTURE_MARKERS: list[list[str]] = [
+    ["first", "firstly", "to start", "step one"],
+    ["then", "next", "after that", "second"],
+    ["because", "since", "therefore", "so that"],
+    ["for example", "for instance", "such as", "e.g"],
+    ["finally", "in summary", "to summarize", "overall"],
+]
+
+# (minimum useful, target) answer length in characters per round and difficulty.
+LENGTH_TARGETS: dict[tuple[str, str], tuple[int, int]] = {
+    ("warm up", "beginner"): (80, 300),
+    ("warm up", "professional"): (120, 450),
+    ("coding", "beginner"): (150, 600),
+    ("coding", "professional"): (250, 900),
+    ("role related", "beginner"): (120, 450),
+    ("role related", "professional"): (200, 750),
+    ("behavioral", "beginner"): (150, 550),
+    ("behavioral", "professional"): (250, 850),
+}
+DEFAULT_LENGTH_TARGET = (100, 400)
+
+
+def normalize_text(text: str) -> str:
+    return " ".join(re.findall(r"[a-z0-9+#]+", (text or "").lower()))
+
+
+def is_coding_role(role: str) -> bool:
+    role_text = (role or "").lower()
+    return any(keyword in role_text for keyword in CODING_KEYWORDS)
+
+
+def match_role_profile(role: str) -> str | None:
+    """Return the canonical profile name for a free-text role, preferring the longest match."""
+
+    role_text = f" {normalize_text(role)} "
+    best_name, best_length = None, 0
+    for name, profile in ROLE_PROFILES.items():
+        for phrase in profile["match"]:
+            if f" {phrase} " in role_text and len(phrase) > best_length:
+                best_name, best_length = name, len(phrase)
+    return best_name
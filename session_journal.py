@@ -0,0 +1,280 @@
+"""Append-only write-ahead log for practice sessions.
+
+Every state change of an ``InterviewSession`` (questions generated or
+replaced, answer edits, timer starts, locks, navigation, finish/reset) is
+appended as one JSON line to ``<token>.jsonl``. Timing telemetry recorded
+since the previous line rides along on the next one under ``ev``, so it never
+costs a write of its own. Writes go straight to the OS page cache and are
+fsynced in batches, so an edit costs one small ``write`` call. Once a log
+grows past ``compact_every`` events it is rewritten as a single snapshot line,
+which keeps resuming a session down to reading one short file.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import IO, Any, Optional
+
+from answer_telemetry import AnswerEventLog
+from interview_session import InterviewSession
+
+DEFAULT_FSYNC_INTERVAL_SECONDS = 1.0
+DEFAULT_FSYNC_EVERY = 32
+DEFAULT_COMPACT_EVERY = 200
+MAX_OPEN_JOURNALS = 256
+
+_TOKEN_PATTERN = re.compile(r"^[0-9a-f]{32}$")
+
+
+def is_valid_session_token(token: Optional[str]) -> bool:
+    return bool(token) and bool(_TOKEN_PATTERN.match(token))
+
+
+def replay_events(lines: list[str]) -> Optional[InterviewSession]:
+    """Rebuild a session from journal lines, ignoring a torn trailing write."""
+
+    session: Optional[InterviewSession] = None
+    for line in lines:
+        try:
+            event = json.loads(line)
+        except ValueError:
+            continue
+        kind = event.get("t")
+        if kind == "snapshot":
+            session = InterviewSession.from_dict(event["session"])
+            continue
+        if kind == "questions":
+            session = InterviewSession(
+                role=event.get("role", ""),
+                company=event.get("company", ""),
+                round_type=event.get("round_type", ""),
+                difficulty=event.get("difficulty", ""),
+            )
+            session.load_questions(event.get("questions", []))
+            if event.get("start"):
+                # Keep the event log's original anchor so replayed offsets stay consistent.
+                session.events = AnswerEventLog(float(event["start"]))
+        if session is None:
+            continue
+        if "ev" in event:
+            session.events.extend(event["ev"])
+        index = event.get("i", 0)
+        try:
+            if kind == "answer":
+                session.set_answer(index, event.get("v", ""), float(event.get("at", 0.0)))
+            elif kind == "timer":
+                session.timer_starts[index] = float(event.get("at", 0.0))
+            elif kind == "lock":
+                session.lock(index)
+            elif kind == "append":
+                if event.get("i", session.total) == session.total:
+                    session.append_question(event.get("q", ""))
+            elif kind == "replace":
+                session.replace_question(index, event.get("q", ""))
+            elif kind == "nav":
+                session.go_to(index)
+            elif kind == "finish":
+                session.finish()
+            elif kind == "reset":
+                session.reset()
+        except IndexError:
+            continue
+    return session
+
+
+class SessionJournal:
+    def __init__(
+        self,
+        path: str | os.PathLike,
+        *,
+        fsync_interval: float = DEFAULT_FSYNC_INTERVAL_SECONDS,
+        fsync_every: int = DEFAULT_FSYNC_EVERY,
+        compact_every: int = DEFAULT_COMPACT_EVERY,
+    ) -> None:
+        self.path = Path(path)
+        self.fsync_interval = fsync_interval
+        self.fsync_every = fsync_every
+        self.compact_every = compact_every
+        self._handle: Optional[IO[str]] = None
+        self._events_since_compaction = 0
+        self._unsynced = 0
+        self._last_fsync = time.monotonic()
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------ recording
+    def record_questions(self, session: InterviewSession) -> None:
+        self._append(
+            {
+                "t": "questions",
+                "role": session.role,
+                "company": session.company,
+                "round_type": session.round_type,
+                "difficulty": session.difficulty,
+                "questions": session.questions,
+                "start": session.events.started_at,
+            },
+            session,
+        )
+
+    def record_answer(self, session: InterviewSession, index: int) -> None:
+        self._append(
+            {"t": "answer", "i": index, "v": session.answer(index), "at": session.answered_at[index]},
+            session,
+        )
+
+    def record_timer(self, session: InterviewSession, index: int) -> None:
+        self._append({"t": "timer", "i": index, "at": session.timer_starts[index]}, session)
+
+    def record_append(self, session: InterviewSession) -> None:
+        # The slot index lets replay drop a second writer's append for the same slot.
+        self._append({"t": "append", "i": session.total - 1, "q": session.questions[-1]}, session)
+
+    def record_replace(self, session: InterviewSession, index: int) -> None:
+        self._append({"t": "replace", "i": index, "q": session.questions[index]}, session)
+
+    def record_lock(self, session: InterviewSession, index: int) -> None:
+        self._append({"t": "lock", "i": index}, session)
+
+    def record_navigation(self, session: InterviewSession) -> None:
+        self._append({"t": "nav", "i": session.current_index}, session)
+
+    def record_finish(self, session: InterviewSession) -> None:
+        self._append({"t": "finish"}, session)
+        self.sync()
+
+    def record_reset(self, session: InterviewSession) -> None:
+        self.compact(session)
+
+    # ------------------------------------------------------------------ reading
+    def load(self) -> Optional[InterviewSession]:
+        """Return the session recorded in the log, or ``None`` if there is none."""
+
+        with self._lock:
+            if self._handle is not None:
+                self._handle.flush()
+            try:
+                with open(self.path, encoding="utf-8") as log_file:
+                    lines = log_file.read().splitlines()
+            except OSError:
+                return None
+        session = replay_events(lines)
+        self._events_since_compaction = len(lines)
+        return session
+
+    # ------------------------------------------------------------------ maintenance
+    def compact(self, session: InterviewSession) -> None:
+        """Replace the log with a single snapshot of ``session``."""
+
+        with self._lock:
+            self._close_handle()
+            self.path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(".tmp")
+            session.events.mark_flushed()
+            with open(tmp_path, "w", encoding="utf-8") as tmp_file:
+                tmp_file.write(self._encode({"t": "snapshot", "session": session.to_dict()}))
+                tmp_file.flush()
+                os.fsync(tmp_file.fileno())
+            os.replace(tmp_path, self.path)
+            self._events_since_compaction = 1
+            self._unsynced = 0
+            self._last_fsync = time.monotonic()
+
+    def sync(self) -> None:
+        with self._lock:
+            self._sync_locked()
+
+    def close(self) -> None:
+        with self._lock:
+            self._close_handle()
+
+    def discard(self) -> None:
+        with self._lock:
+            self._drop_handle()
+            self.path.unlink(missing_ok=True)
+
+    # ------------------------------------------------------------------ internals
+    @staticmethod
+    def _encode(event: dict[str, Any]) -> str:
+        return json.dumps(event, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+    def _append(self, event: dict[str, Any], session: InterviewSession) -> None:
+        if self._events_since_compaction >= self.compact_every:
+            self.compact(session)
+            return
+        pending = session.events.take_pending()
+        if pending is not None:
+            event["ev"] = pending
+        line = self._encode(event)
+        with self._lock:
+            if self._handle is not None and self._replaced():
+                # Another process compacted the log; keep appending to the new file.
+                self._drop_handle()
+            if self._handle is None:
+                self.path.parent.mkdir(mode=0o700, parents=True, exist_ok=True)
+                self._handle = open(self.path, "a", encoding="utf-8")
+            self._handle.write(line)
+            self._handle.flush()
+            self._events_since_compaction += 1
+            self._unsynced += 1
+            if (
+                self._unsynced >= self.fsync_every
+                or time.monotonic() - self._last_fsync >= self.fsync_interval
+            ):
+                self._sync_locked()
+
+    def _replaced(self) -> bool:
+        try:
+            return os.stat(self.path).st_ino != os.fstat(self._handle.fileno()).st_ino
+        except OSError:
+            return True
+
+    def _sync_locked(self) -> None:
+        if self._handle is not None and self._unsynced:
+            self._handle.flush()
+            os.fsync(self._handle.fileno())
+        self._unsynced = 0
+        self._last_fsync = time.monotonic()
+
+    def _close_handle(self) -> None:
+        if self._handle is not None:
+            self._sync_locked()
+            self._handle.close()
+            self._handle = None
+
+    def _drop_handle(self) -> None:
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+        self._unsynced = 0
+
+
+_journals: "OrderedDict[str, SessionJournal]" = OrderedDict()
+_journals_lock = threading.Lock()
+
+
+def journal_dir() -> Path:
+    # Journals hold full answers: keep them in the app's private data directory.
+    return Path(os.getenv("SESSION_LOG_DIR") or Path(__file__).resolve().parent / "data" / "journal")
+
+
+def get_session_journal(token: str) -> SessionJournal:
+    """Return the journal for ``token``, keeping a bounded number of files open."""
+
+    if not is_valid_session_token(token):
+        raise ValueError("Invalid session token")
+    with _journals_lock:
+        journal = _journals.get(token)
+        if journal is None:
+            journal = SessionJournal(journal_dir() / f"{token}.jsonl")
+            _journals[token] = journal
+        _journals.move_to_end(token)
+        while len(_journals) > MAX_OPEN_JOURNALS:
+            _, stale = _journals.popitem(last=False)
+            stale.close()
+        return journal
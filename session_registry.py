@@ -0,0 +1,246 @@
+"""Process-wide registry of practice sessions with idle eviction.
+
+Streamlit keeps a browser session's state alive until the process restarts,
+so abandoned interviews pile up. The registry owns every ``InterviewSession``
+(``st.session_state`` only keeps a token), records last activity and size,
+and spills sessions to disk once they are idle past a TTL or the registry is
+over its memory budget. Sessions used within the last ``spill_grace`` seconds
+are never spilled, since a running rerun may still be changing them. A
+spilled session is restored on its next access.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional
+
+from interview_session import InterviewSession
+
+DEFAULT_IDLE_TTL_SECONDS = 30 * 60
+DEFAULT_MEMORY_BUDGET_BYTES = 256 * 1024 * 1024
+DEFAULT_SPILL_RETENTION_SECONDS = 7 * 24 * 60 * 60
+DEFAULT_SWEEP_INTERVAL_SECONDS = 30.0
+DEFAULT_SPILL_GRACE_SECONDS = 120.0
+DEFAULT_SPILL_DIR = Path(__file__).resolve().parent / "data" / "sessions"
+
+
+@dataclass(slots=True)
+class _Entry:
+    session: InterviewSession
+    last_seen: float
+    size: int
+
+
+class SessionRegistry:
+    def __init__(
+        self,
+        spill_dir: str | os.PathLike,
+        *,
+        idle_ttl: float = DEFAULT_IDLE_TTL_SECONDS,
+        memory_budget: int = DEFAULT_MEMORY_BUDGET_BYTES,
+        spill_retention: float = DEFAULT_SPILL_RETENTION_SECONDS,
+        sweep_interval: float = DEFAULT_SWEEP_INTERVAL_SECONDS,
+        spill_grace: float = DEFAULT_SPILL_GRACE_SECONDS,
+    ) -> None:
+        self.spill_dir = Path(spill_dir)
+        self.idle_ttl = idle_ttl
+        self.memory_budget = memory_budget
+        self.spill_retention = spill_retention
+        self.sweep_interval = sweep_interval
+        self.spill_grace = spill_grace
+        # Ordered by last access so the front is always the least recently used.
+        self._entries: OrderedDict[str, _Entry] = OrderedDict()
+        self._total_bytes = 0
+        self._last_sweep = 0.0
+        self._lock = threading.RLock()
+        self.evictions = 0
+        self.restores = 0
+
+    # ------------------------------------------------------------------ access
+    def get(self, token: str) -> Optional[InterviewSession]:
+        """Return the session for ``token``, restoring it from disk if it was spilled."""
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(token)
+            if entry is None:
+                session = self._restore(token)
+                if session is None:
+                    self._maybe_sweep(now)
+                    return None
+                entry = self._insert(token, session, now)
+                self.restores += 1
+            else:
+                entry.last_seen = now
+                self._entries.move_to_end(token)
+                self._resize(entry)
+            self._maybe_sweep(now)
+            return entry.session
+
+    def put(self, token: str, session: InterviewSession) -> None:
+        now = time.monotonic()
+        with self._lock:
+            existing = self._entries.pop(token, None)
+            if existing is not None:
+                self._total_bytes -= existing.size
+            self._insert(token, session, now)
+            self._maybe_sweep(now)
+
+    def discard(self, token: str) -> None:
+        if not token:
+            return
+        with self._lock:
+            entry = self._entries.pop(token, None)
+            if entry is not None:
+                self._total_bytes -= entry.size
+            self._spill_path(token).unlink(missing_ok=True)
+
+    # ------------------------------------------------------------------ eviction
+    def sweep(self, now: float | None = None) -> int:
+        """Spill idle sessions and trim to the memory budget; return how many were evicted."""
+
+        now = time.monotonic() if now is None else now
+        evicted = 0
+        with self._lock:
+            self._last_sweep = now
+            for entry in self._entries.values():
+                self._resize(entry)
+            for token, entry in list(self._entries.items()):
+                if now - entry.last_seen < self.idle_ttl:
+                    # Entries are in LRU order, everything after this one is newer.
+                    break
+                self._evict(token)
+                evicted += 1
+            while self._total_bytes > self.memory_budget and len(self._entries) > 1:
+                token, entry = next(iter(self._entries.items()))
+                if now - entry.last_seen < self.spill_grace:
+                    # Still held by a rerun; spilling it would lose its later edits.
+                    break
+                self._evict(token)
+                evicted += 1
+        self._prune_spill_dir()
+        return evicted
+
+    def _maybe_sweep(self, now: float) -> None:
+        if now - self._last_sweep >= self.sweep_interval:
+            self.sweep(now)
+
+    def _evict(self, token: str) -> None:
+        entry = self._entries.pop(token)
+        self._total_bytes -= entry.size
+        self._spill(token, entry.session)
+        self.evictions += 1
+
+    # ------------------------------------------------------------------ gauges
+    def gauges(self) -> dict[str, object]:
+        """Return per-session and total memory gauges."""
+
+        with self._lock:
+            per_session = {token: entry.size for token, entry in self._entries.items()}
+            return {
+                "sessions_in_memory": len(per_session),
+                "sessions_spilled": self._count_spilled(),
+                "total_bytes": self._total_bytes,
+                "memory_budget_bytes": self.memory_budget,
+                "evictions_total": self.evictions,
+                "restores_total": self.restores,
+                "session_bytes": per_session,
+            }
+
+    def format_gauges(self) -> str:
+        """Render the aggregate gauges in the Prometheus text exposition format.
+
+        Per-session sizes stay out: one series per token would be unbounded
+        and would expose token prefixes on the unauthenticated endpoint.
+        """
+
+        gauges = self.gauges()
+        lines = [
+            f"interview_sessions_in_memory {gauges['sessions_in_memory']}",
+            f"interview_sessions_spilled {gauges['sessions_spilled']}",
+            f"interview_sessions_bytes_total {gauges['total_bytes']}",
+            f"interview_sessions_memory_budget_bytes {gauges['memory_budget_bytes']}",
+            f"interview_sessions_evictions_total {gauges['evictions_total']}",
+            f"interview_sessions_restores_total {gauges['restores_total']}",
+        ]
+        return "\n".join(lines) + "\n"
+
+    # ------------------------------------------------------------------ internals
+    def _insert(self, token: str, session: InterviewSession, now: float) -> _Entry:
+        entry = _Entry(session=session, last_seen=now, size=session.approx_size())
+        self._entries[token] = entry
+        self._total_bytes += entry.size
+        return entry
+
+    def _resize(self, entry: _Entry) -> None:
+        size = entry.session.approx_size()
+        self._total_bytes += size - entry.size
+        entry.size = size
+
+    def _spill_path(self, token: str) -> Path:
+        # Tokens are generated hex strings; keep only safe characters regardless.
+        safe_token = "".join(ch for ch in token if ch.isalnum())
+        return self.spill_dir / f"{safe_token}.json"
+
+    def _spill(self, token: str, session: InterviewSession) -> None:
+        self.spill_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+        path = self._spill_path(token)
+        tmp_path = path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as spill_file:
+            json.dump(session.to_dict(), spill_file, separators=(",", ":"))
+        os.replace(tmp_path, path)
+
+    def _restore(self, token: str) -> Optional[InterviewSession]:
+        path = self._spill_path(token)
+        try:
+            with open(path, encoding="utf-8") as spill_file:
+                data = json.load(spill_file)
+        except (OSError, ValueError):
+            return None
+        path.unlink(missing_ok=True)
+        return InterviewSession.from_dict(data)
+
+    def _count_spilled(self) -> int:
+        try:
+            return sum(1 for _ in self.spill_dir.glob("*.json"))
+        except OSError:
+            return 0
+
+    def _prune_spill_dir(self) -> None:
+        cutoff = time.time() - self.spill_retention
+        try:
+            for path in self.spill_dir.glob("*.json"):
+                if path.stat().st_mtime < cutoff:
+                    path.unlink(missing_ok=True)
+        except OSError:
+            pass
+
+
+_registry: Optional[SessionRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_session_registry() -> SessionRegistry:
+    """Return the process-wide registry configured from the environment."""
+
+    global _registry
+    if _registry is None:
+        with _registry_lock:
+            if _registry is None:
+                spill_dir = os.getenv("SESSION_SPILL_DIR") or DEFAULT_SPILL_DIR
+                _registry = SessionRegistry(
+                    spill_dir,
+                    idle_ttl=float(os.getenv("SESSION_IDLE_TTL_SECONDS", DEFAULT_IDLE_TTL_SECONDS)),
+                    memory_budget=int(
+                        float(os.getenv("SESSION_MEMORY_BUDGET_MB", DEFAULT_MEMORY_BUDGET_BYTES / (1024 * 1024)))
+                        * 1024
+                        * 1024
+                    ),
+                )
+    return _registry
@@ -0,0 +1,120 @@
+"""Background pool of spare questions used by the "New Question" button.
+
+Each practice session keeps one or two extra questions generated on a worker
+thread alongside the main set, so swapping a question is instant instead of
+waiting on a Gemini round trip. Taking a spare triggers an asynchronous refill;
+after a failed refill the pool waits ``REFILL_COOLDOWN_SECONDS`` before trying
+again, since every Streamlit rerun asks it to refill.
+
+Marathon sessions use a second pool per session as their look-ahead window:
+it holds the next few questions so moving on never waits for generation.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Optional
+
+from circuit_breaker import background_calls
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SPARE_TARGET = 2
+DEFAULT_WINDOW_SIZE = 3
+_WINDOW_SUFFIX = ":window"
+MAX_TRACKED_POOLS = 1024
+REFILL_COOLDOWN_SECONDS = 30.0
+
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="spare-questions")
+
+
+class SpareQuestionPool:
+    def __init__(self, target: int = DEFAULT_SPARE_TARGET) -> None:
+        self.target = target
+        self._ready: deque[str] = deque()
+        self._pending: Optional[Future] = None
+        self._lock = threading.Lock()
+        self.last_error: Optional[str] = None
+        self._failed_at: Optional[float] = None
+
+    def take(self) -> Optional[str]:
+        with self._lock:
+            return self._ready.popleft() if self._ready else None
+
+    def ready(self) -> list[str]:
+        with self._lock:
+            return list(self._ready)
+
+    def ready_count(self) -> int:
+        with self._lock:
+            return len(self._ready)
+
+    def refill(self, generate: Callable[[list[str]], str], asked: list[str]) -> None:
+        """Top the pool up to ``target`` in the background.
+
+        A no-op if the pool is full, already filling, or a refill failed less
+        than ``REFILL_COOLDOWN_SECONDS`` ago.
+        """
+
+        with self._lock:
+            if len(self._ready) >= self.target or (self._pending and not self._pending.done()):
+                return
+            if self._failed_at is not None and time.monotonic() - self._failed_at < REFILL_COOLDOWN_SECONDS:
+                return
+            self._pending = _executor.submit(self._fill, generate, list(asked))
+
+    def _fill(self, generate: Callable[[list[str]], str], asked: list[str]) -> None:
+        # Bounded so a generator that keeps returning duplicates cannot spin forever.
+        for _ in range(self.target * 3):
+            with self._lock:
+                if len(self._ready) >= self.target:
+                    return
+                avoid = asked + list(self._ready)
+            try:
+                # Prefetching stays outside the provider bulkhead reserved for live requests.
+                with background_calls():
+                    question = generate(avoid)
+            except Exception as exc:
+                # A failing refill just leaves the pool short; the button falls
+                # back to generating synchronously.
+                self.last_error = str(exc)
+                with self._lock:
+                    self._failed_at = time.monotonic()
+                logger.warning("Spare question generation failed: %s", exc)
+                return
+            with self._lock:
+                self._failed_at = None
+                if question not in self._ready and question not in asked:
+                    self._ready.append(question)
+
+
+_pools: "OrderedDict[str, SpareQuestionPool]" = OrderedDict()
+_pools_lock = threading.Lock()
+
+
+def get_spare_pool(token: str, target: int = DEFAULT_SPARE_TARGET) -> SpareQuestionPool:
+    with _pools_lock:
+        pool = _pools.get(token)
+        if pool is None:
+            pool = SpareQuestionPool(target)
+            _pools[token] = pool
+        _pools.move_to_end(token)
+        while len(_pools) > MAX_TRACKED_POOLS:
+            _pools.popitem(last=False)
+        return pool
+
+
+def get_window_pool(token: str, size: int = DEFAULT_WINDOW_SIZE) -> SpareQuestionPool:
+    """Return the look-ahead pool that keeps upcoming marathon questions ready."""
+
+    return get_spare_pool(token + _WINDOW_SUFFIX, size)
+
+
+def discard_spare_pool(token: str) -> None:
+    with _pools_lock:
+        _pools.pop(token, None)
+        _pools.pop(token + _WINDOW_SUFFIX, None)
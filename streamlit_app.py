@@ -4,10 +4,14 @@ from pathlib import Path
 import streamlit as st
 from dotenv import load_dotenv
 
-from interview_flow import handle_practice_navigation
+from interview_flow import MARATHON_MAX_QUESTIONS, MARATHON_MIN_QUESTIONS, handle_practice_navigation
+from role_profiles import is_coding_role
+from usage_ledger import get_usage_ledger
 from llm_utils import (
-    generate_question,
+    token_usage_report,
     validate_google_api_key,
+    warm_up,
+    warmup_status,
     DEFAULT_GENERATION_CONFIG,
     DEFAULT_SAFETY_SETTINGS,
     HarmCategory,
@@ -60,6 +64,9 @@ def apply_app_styles() -> None:
 
 def main():
     set_page_config()
+    # The Gemini SDK is only needed once a key is validated or practice starts;
+    # import it and open the connection while the setup form renders instead of before it.
+    warm_up()
     
     # Initialize session state for role and company if not exists
     if 'role' not in st.session_state:
@@ -68,6 +75,17 @@ def main():
         st.session_state.company = ""
     if 'user_api_key' not in st.session_state:
         st.session_state.user_api_key = ""
+
+    if st.query_params.get("page") == "history":
+        from history_page import render_history_page
+
+        render_history_page()
+        return
+    if st.query_params.get("page") == "analytics":
+        from analytics_page import render_analytics_page
+
+        render_analytics_page()
+        return
         
     practice_mode_active = handle_practice_navigation()
 
@@ -91,7 +109,32 @@ def main():
         )
         if user_api_key:
             st.session_state.user_api_key = user_api_key
+            warm_up(user_api_key.strip())
         
+        history_col, analytics_col = st.columns(2)
+        with history_col:
+            if st.button("📚 Interview History", use_container_width=True):
+                st.session_state.history_pages = []
+                st.query_params["page"] = "history"
+                st.rerun()
+        with analytics_col:
+            if st.button("📊 Analytics", use_container_width=True):
+                st.query_params["page"] = "analytics"
+                st.rerun()
+
+        with st.expander("🔗 Join an interview set"):
+            join_code = st.text_input(
+                "Set code",
+                placeholder="e.g. K7M2QX9P",
+                key="set_code_input",
+                help="Practise a question set someone shared with you. Role, round and difficulty come from the set.",
+            )
+            if st.session_state.get("set_code_error"):
+                st.warning(st.session_state.pop("set_code_error"))
+            if st.button("Join set", disabled=not join_code.strip()):
+                st.query_params["set"] = join_code.strip()
+                st.rerun()
+
         st.markdown("---")
         
         # Header with job title and company
@@ -120,9 +163,7 @@ def main():
         
         # Select Round
         st.markdown('<div class="section-title">Select Round</div>', unsafe_allow_html=True)
-        role_text = st.session_state.role.lower()
-        coding_keywords = ["developer", "engineer", "coder", "coding", "programmer", "software"]
-        coding_round_enabled = any(keyword in role_text for keyword in coding_keywords)
+        coding_round_enabled = is_coding_role(st.session_state.role)
 
         if coding_round_enabled:
             rounds = ["Warm Up", "Coding", "Role Related", "Behavioral"]
@@ -173,13 +214,32 @@ def main():
                 current_audio_pref = st.session_state.get("audio_checkbox", True)
                 audio_pref = st.checkbox("Audio", value=current_audio_pref, key="audio_checkbox")
                 st.session_state.audio_mode_enabled = audio_pref
+            st.checkbox(
+                "Adaptive follow-ups",
+                key="adaptive_checkbox",
+                help="Each next question builds on your previous answer, like a real interviewer.",
+            )
+            st.checkbox(
+                "Offline question bank",
+                key="bank_checkbox",
+                help="Start instantly with curated questions from the local bank; Gemini only fills gaps.",
+            )
+            if st.checkbox(
+                "Marathon mode",
+                key="marathon_checkbox",
+                help="A long session. Questions are generated a few at a time while you answer.",
+            ):
+                st.slider(
+                    "Questions",
+                    min_value=MARATHON_MIN_QUESTIONS,
+                    max_value=MARATHON_MAX_QUESTIONS,
+                    value=MARATHON_MIN_QUESTIONS,
+                    step=5,
+                    key="marathon_length",
+                )
 
         if "generation_config" not in st.session_state:
             st.session_state.generation_config = DEFAULT_GENERATION_CONFIG.copy()
-        else:
-            # Update max_output_tokens if it's too low (from old default)
-            if st.session_state.generation_config.get("max_output_tokens", 0) < 1024:
-                st.session_state.generation_config["max_output_tokens"] = DEFAULT_GENERATION_CONFIG["max_output_tokens"]
         generation_config = st.session_state.generation_config
 
         with st.expander("LLM Generation Settings", expanded=False):
@@ -218,9 +278,31 @@ def main():
                     min_value=512,
                     max_value=8192,  # Increased from 4096 to 8192
                     step=128,
-                    value=int(generation_config.get("max_output_tokens", 3000)),  # Updated default
-                    help="1024-3000 recommended for interview questions. Higher values allow longer responses.",
+                    value=int(generation_config.get("max_output_tokens", 3000)),
+                    help=(
+                        "Upper limit per request. Each question starts from a budget learned for its round "
+                        "and is only retried with more tokens, up to this limit, if it gets cut off."
+                    ),
+                )
+            usage_report = token_usage_report(int(generation_config["max_output_tokens"]))
+            if usage_report:
+                st.caption("Tokens spent per generated question")
+                st.dataframe(usage_report, hide_index=True, use_container_width=True)
+            ledger = get_usage_ledger()
+            spend_key = get_google_api_key()
+            spend = ledger.budget_status(spend_key)
+            if spend["calls"]:
+                limits = []
+                if spend["token_budget"]:
+                    limits.append(f"{spend['token_budget']:,} tokens")
+                if spend["cost_budget_usd"]:
+                    limits.append(f"${spend['cost_budget_usd']:.2f}")
+                st.caption(
+                    f"Gemini spend today for this key: {spend['prompt_tokens'] + spend['output_tokens']:,} tokens, "
+                    f"${spend['cost_usd']:.4f} over {spend['calls']} calls"
+                    + (f" (daily budget {' / '.join(limits)})" if limits else "")
                 )
+                st.dataframe(ledger.report(api_key=spend_key), hide_index=True, use_container_width=True)
         
         # Safety Settings
         st.markdown("### Content Safety Settings")
@@ -272,6 +354,9 @@ def main():
                     st.session_state.validated_api_key = api_key
                 st.success("API key loaded from environment (.env file or shell). You're ready to call external services.")
                 st.session_state.google_api_key = api_key
+                warmup = warmup_status(api_key)
+                if warmup.get("state") == "warm":
+                    st.caption(f"Gemini connection warmed up in {warmup['seconds']:.2f}s.")
             except Exception as exc: 
                 api_key_validation_error = str(exc)
                 api_key = None
@@ -0,0 +1,57 @@
+"""Offline runs of the bank pre-generator: resuming and de-duplication."""
+
+from __future__ import annotations
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+import pregenerate_bank  # noqa: E402
+
+TARGETS = "role,company,round,difficulty,count\nBackend Engineer,,Behavioral,Easy,3\nBackend Engineer,,Behavioral,Medium,2\n"
+
+
+@pytest.fixture(autouse=True)
+def offline(monkeypatch, tmp_path):
+    monkeypatch.setenv("LLM_PROVIDER", "offline")
+    monkeypatch.setenv("INTERVIEW_HISTORY_DB", str(tmp_path / "usage.sqlite3"))
+
+
+def _bank(path: Path) -> list[dict]:
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines() if line.strip()]
+
+
+def test_offline_run_resumes_from_checkpoint_without_duplicates(tmp_path):
+    targets = tmp_path / "targets.csv"
+    targets.write_text(TARGETS, encoding="utf-8")
+    output = tmp_path / "bank.jsonl"
+    # An interrupted earlier run left one accepted question behind.
+    resumed = {
+        "role": "Backend Engineer",
+        "company": "",
+        "round": "Behavioral",
+        "difficulty": "Easy",
+        "tags": [],
+        "question": "Tell me about a time you disagreed with a design decision. What did you do?",
+    }
+    checkpoint = output.with_suffix(".jsonl.checkpoint")
+    checkpoint.write_text(json.dumps(resumed) + "\n", encoding="utf-8")
+
+    assert pregenerate_bank.main([str(targets), str(output), "--offline", "--rpm", "0", "--quiet"]) == 0
+
+    records = _bank(output)
+    questions = [record["question"] for record in records]
+    assert resumed["question"] in questions
+    assert len(questions) == len(set(questions))
+    # The checkpointed question counts towards its target instead of being generated again.
+    assert len(questions) == 5
+    assert not checkpoint.exists()
+    assert output.with_suffix(".idx").exists()
+
+    # A second run finds every target satisfied and adds nothing.
+    assert pregenerate_bank.main([str(targets), str(output), "--offline", "--rpm", "0", "--quiet"]) == 0
+    assert [record["question"] for record in _bank(output)] == questions
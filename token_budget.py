@@ -0,0 +1,169 @@
+"""Adaptive output-token budgets for question generation.
+
+A question is one or two sentences, but Gemini 2.5 models also spend output
+tokens on thinking, so a fixed budget is either wasteful or too tight. The
+budgeter learns per round type from the ``usage_metadata`` of recent calls:
+the next request reserves the 95th percentile of observed output tokens plus
+headroom, never more than the user's "Max Tokens" ceiling. A response that
+stops on MAX_TOKENS is retried with a doubled budget, and that escalation
+feeds back into the learned budget.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Optional
+
+import numpy as np
+
+# Starting budgets before anything has been observed for a round.
+INITIAL_BUDGETS = {
+    "warm up": 1024,
+    "coding": 2048,
+    "role related": 1536,
+    "behavioral": 1024,
+}
+DEFAULT_INITIAL_BUDGET = 1536
+MIN_BUDGET = 256
+BUDGET_HEADROOM = 1.5
+BUDGET_STEP = 128
+OBSERVATION_WINDOW = 100
+MIN_OBSERVATIONS = 5
+MAX_ESCALATIONS = 2
+
+# Cut the response off if the model starts a second question or answers its own.
+QUESTION_STOP_SEQUENCES = ["\n\n\n", "\nQuestion 2", "\nAnswer:"]
+
+MAX_TOKENS_FINISH_REASON = 2
+
+
+@dataclass(frozen=True)
+class TokenUsage:
+    prompt_tokens: int
+    output_tokens: int  # Candidate plus thinking tokens, i.e. what counts against the budget.
+    cached_tokens: int
+
+
+def usage_from_response(response: Any) -> Optional[TokenUsage]:
+    usage = getattr(response, "usage_metadata", None)
+    if usage is None:
+        return None
+    prompt = int(getattr(usage, "prompt_token_count", 0) or 0)
+    total = int(getattr(usage, "total_token_count", 0) or 0)
+    candidates = int(getattr(usage, "candidates_token_count", 0) or 0)
+    return TokenUsage(
+        prompt_tokens=prompt,
+        output_tokens=max(total - prompt, candidates),
+        cached_tokens=int(getattr(usage, "cached_content_token_count", 0) or 0),
+    )
+
+
+def hit_max_tokens(response: Any) -> bool:
+    for candidate in getattr(response, "candidates", None) or []:
+        reason = getattr(candidate, "finish_reason", None)
+        if reason == MAX_TOKENS_FINISH_REASON or "MAX_TOKENS" in str(reason).upper():
+            return True
+    return False
+
+
+def _round_up(value: float) -> int:
+    return int(-(-value // BUDGET_STEP) * BUDGET_STEP)
+
+
+class _RoundStats:
+    def __init__(self) -> None:
+        self.outputs: deque[int] = deque(maxlen=OBSERVATION_WINDOW)
+        self.questions = 0
+        self.prompt_tokens = 0
+        self.output_tokens = 0
+        self.cached_tokens = 0
+        self.escalations = 0
+
+
+class TokenBudgeter:
+    def __init__(self) -> None:
+        self._rounds: dict[str, _RoundStats] = {}
+        self._lock = threading.Lock()
+
+    def budget(self, round_type: str, ceiling: int) -> int:
+        """Return the output-token budget for the next request of this round."""
+
+        key = (round_type or "").lower()
+        with self._lock:
+            stats = self._rounds.get(key)
+            outputs = list(stats.outputs) if stats else []
+        if len(outputs) < MIN_OBSERVATIONS:
+            learned = INITIAL_BUDGETS.get(key, DEFAULT_INITIAL_BUDGET)
+        else:
+            learned = _round_up(float(np.percentile(outputs, 95)) * BUDGET_HEADROOM)
+        return int(max(MIN_BUDGET, min(learned, ceiling)))
+
+    @staticmethod
+    def escalate(budget: int, ceiling: int) -> Optional[int]:
+        """Return the next budget after a MAX_TOKENS finish, or None at the ceiling."""
+
+        if budget >= ceiling:
+            return None
+        return min(ceiling, budget * 2)
+
+    def record(self, round_type: str, usage: Optional[TokenUsage], escalations: int = 0) -> None:
+        """Record the final usage of one generated question."""
+
+        key = (round_type or "").lower()
+        with self._lock:
+            stats = self._rounds.setdefault(key, _RoundStats())
+            stats.questions += 1
+            stats.escalations += escalations
+            if usage is not None:
+                stats.outputs.append(usage.output_tokens)
+                stats.prompt_tokens += usage.prompt_tokens
+                stats.output_tokens += usage.output_tokens
+                stats.cached_tokens += usage.cached_tokens
+
+    def record_attempt(self, round_type: str, usage: Optional[TokenUsage]) -> None:
+        """Count tokens spent on an attempt that did not produce the final question."""
+
+        if usage is None:
+            return
+        key = (round_type or "").lower()
+        with self._lock:
+            stats = self._rounds.setdefault(key, _RoundStats())
+            stats.prompt_tokens += usage.prompt_tokens
+            stats.output_tokens += usage.output_tokens
+            stats.cached_tokens += usage.cached_tokens
+
+    def report(self, ceiling: int = 8192) -> list[dict[str, float]]:
+        """Return tokens spent per question for each round, including retries and escalations."""
+
+        with self._lock:
+            rounds = [
+                (key, stats.questions, stats.prompt_tokens, stats.output_tokens, stats.cached_tokens, stats.escalations)
+                for key, stats in self._rounds.items()
+            ]
+        return [
+            {
+                "round": key,
+                "questions": questions,
+                "prompt_tokens_per_question": prompt_tokens / max(questions, 1),
+                "output_tokens_per_question": output_tokens / max(questions, 1),
+                "cached_tokens_per_question": cached_tokens / max(questions, 1),
+                "escalations": escalations,
+                "current_budget": self.budget(key, ceiling),
+            }
+            for key, questions, prompt_tokens, output_tokens, cached_tokens, escalations in rounds
+        ]
+
+
+_budgeter: Optional[TokenBudgeter] = None
+_budgeter_lock = threading.Lock()
+
+
+def get_token_budgeter() -> TokenBudgeter:
+    global _budgeter
+    if _budgeter is None:
+        with _budgeter_lock:
+            if _budgeter is None:
+                _budgeter = TokenBudgeter()
+    return _budgeter
@@ -1,5 +1,9 @@
+from typing import Optional
+
 import streamlit as st
 
+from interview_export import EXPORT_FORMATS, export_bytes, export_chunks, interview_entry
+
 def get_response_aria_label(question_index: int) -> str:
     """Return a stable aria-label for a question's response box."""
 
@@ -142,24 +146,83 @@ def display_navigation_buttons(current_index: int, total_questions: int) -> tupl
     
     return prev_clicked, next_clicked, new_question_clicked, finish_clicked
 
-def display_interview_summary(questions: list, answers: dict) -> None:
+def display_code_results(result, suite) -> None:
+    """Show a code runner result as a pass/fail line plus one row per test case."""
+
+    origin = "question bank" if suite.source == "bank" else "generated by Gemini"
+    if result.status in ("passed", "failed"):
+        message = f"{result.passed}/{len(result.cases)} tests passed ({origin})"
+        (st.success if result.status == "passed" else st.warning)(message)
+        st.dataframe(
+            [
+                {
+                    "Call": f"{suite.function}({', '.join(repr(arg) for arg in case.args)})"[:120],
+                    "Expected": repr(case.expected)[:80],
+                    "Got": (outcome.actual or outcome.error)[:80],
+                    "Result": "✅" if outcome.passed else "❌",
+                }
+                for case, outcome in zip(suite.cases, result.cases)
+            ],
+            hide_index=True,
+            use_container_width=True,
+        )
+    else:
+        labels = {"timeout": "⏱️ Time limit exceeded", "memory": "💾 Memory limit exceeded"}
+        st.error(labels.get(result.status, "💥 Your code raised an error"))
+        if result.error:
+            st.code(result.error, language=None)
+    if result.stdout:
+        st.caption("Printed output")
+        st.code(result.stdout, language=None)
+
+
+SUMMARY_PAGE_SIZE = 10
+
+
+def display_interview_summary(questions: list, answers: dict, grades: Optional[list] = None) -> None:
    
     st.success("🎉 Great job on completing the interview!")
     st.write("### Interview Summary")
+
+    if grades:
+        scored = [grade.score for grade in grades if grade.score]
+        if scored:
+            st.metric("Average Score", f"{sum(scored) / len(scored):.1f} / 10")
     
-    # Show all questions and answers
-    for i, question in enumerate(questions):
+    # Long interviews are paged so only one page of expanders renders per run.
+    pages = max(1, -(-len(questions) // SUMMARY_PAGE_SIZE))
+    page = 1
+    if pages > 1:
+        page = int(
+            st.number_input("Summary page", min_value=1, max_value=pages, value=1, step=1, key="summary_page")
+        )
+        first = (page - 1) * SUMMARY_PAGE_SIZE
+        st.caption(
+            f"Questions {first + 1}–{min(first + SUMMARY_PAGE_SIZE, len(questions))} of {len(questions)}"
+        )
+    start = (page - 1) * SUMMARY_PAGE_SIZE
+    for i in range(start, min(start + SUMMARY_PAGE_SIZE, len(questions))):
+        question = questions[i]
         answer = answers.get(i, "")
-        with st.expander(f"Question {i + 1}: {question}"):
+        grade = grades[i] if grades and i < len(grades) else None
+        label = f"Question {i + 1}: {question}"
+        if grade and grade.score:
+            label = f"[{grade.score}/10] {label}"
+        with st.expander(label):
             st.write(f"**Your Answer:**\n{answer}" if answer else "**No response provided**")
+            if grade and grade.score:
+                st.write(f"**Score:** {grade.score}/10 — {grade.feedback}")
     
-    # Add download button for the interview
+    # Add download button for the interview; the file is produced on click, off the script thread
+    fmt = st.selectbox(
+        "Download format",
+        list(EXPORT_FORMATS),
+        format_func=lambda ext: EXPORT_FORMATS[ext][0],
+        key="summary_export_format",
+    )
     st.download_button(
         label="📥 Download Interview",
-        data="\n\n".join(
-            f"Question {i+1}: {q}\nAnswer: {answers.get(i, 'No response')}"
-            for i, q in enumerate(questions)
-        ),
-        file_name="interview_responses.txt",
-        mime="text/plain"
+        data=lambda: export_bytes(export_chunks([interview_entry(questions, answers, grades)], fmt)),
+        file_name=f"interview_responses.{fmt}",
+        mime=EXPORT_FORMATS[fmt][1],
     )
@@ -0,0 +1,356 @@
+"""Token and cost accounting for Gemini calls.
+
+Every call made through llm_utils reports its ``usage_metadata`` here. Usage
+is attributed to the day, the API key (stored only as a short hash), the
+interview session, the route (task, round and difficulty) and the model that
+answered. Counters are kept in memory and written to SQLite in batches, so
+recording a call is a dictionary update and the database sees one upsert per
+counter every few seconds.
+
+Daily budgets per key, and an optional budget per session, are checked before
+each call. Key totals are re-read from the database after every flush and at
+least every ``FLUSH_INTERVAL_SECONDS``, so processes sharing the database see
+each other's spend within one flush interval. An exhausted budget raises ``BudgetExceededError``, which the
+practice flow treats like any other provider failure: it serves questions
+from the local bank instead.
+"""
+
+from __future__ import annotations
+
+import atexit
+import datetime
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Optional
+
+from history_store import DEFAULT_HISTORY_DB
+from token_budget import TokenUsage
+
+logger = logging.getLogger(__name__)
+
+# USD per million (input, output) tokens. Output includes thinking tokens.
+# Override with LLM_MODEL_PRICES='{"model-name": [input, output]}'.
+DEFAULT_MODEL_PRICES: dict[str, tuple[float, float]] = {
+    "gemini-2.5-pro": (1.25, 10.0),
+    "gemini-2.5-flash": (0.30, 2.50),
+    "gemini-2.5-flash-lite": (0.10, 0.40),
+    "offline": (0.0, 0.0),
+}
+# Cached prompt tokens are billed at a quarter of the input price.
+CACHED_PRICE_FACTOR = 0.25
+
+DAILY_TOKEN_BUDGET = int(os.getenv("LLM_DAILY_TOKEN_BUDGET", "0"))  # Per key; 0 disables.
+DAILY_COST_BUDGET_USD = float(os.getenv("LLM_DAILY_COST_BUDGET_USD", "0"))  # Per key; 0 disables.
+SESSION_TOKEN_BUDGET = int(os.getenv("LLM_SESSION_TOKEN_BUDGET", "0"))  # Per interview; 0 disables.
+
+FLUSH_INTERVAL_SECONDS = 10.0
+MAX_PENDING_COUNTERS = 200
+MAX_TRACKED_SESSIONS = 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_usage (
+    day TEXT NOT NULL,
+    key_hash TEXT NOT NULL,
+    session TEXT NOT NULL,
+    task TEXT NOT NULL,
+    model TEXT NOT NULL,
+    calls INTEGER NOT NULL,
+    prompt_tokens INTEGER NOT NULL,
+    output_tokens INTEGER NOT NULL,
+    cached_tokens INTEGER NOT NULL,
+    cost_usd REAL NOT NULL,
+    PRIMARY KEY (day, key_hash, session, task, model)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_llm_usage_key ON llm_usage (key_hash, day);
+"""
+
+_UPSERT = """
+INSERT INTO llm_usage VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (day, key_hash, session, task, model) DO UPDATE SET
+    calls = calls + excluded.calls,
+    prompt_tokens = prompt_tokens + excluded.prompt_tokens,
+    output_tokens = output_tokens + excluded.output_tokens,
+    cached_tokens = cached_tokens + excluded.cached_tokens,
+    cost_usd = cost_usd + excluded.cost_usd
+"""
+
+
+class BudgetExceededError(RuntimeError):
+    """Raised instead of calling Gemini once a key or session has spent its budget."""
+
+
+def _load_prices() -> dict[str, tuple[float, float]]:
+    prices = dict(DEFAULT_MODEL_PRICES)
+    raw = os.getenv("LLM_MODEL_PRICES")
+    if raw:
+        try:
+            for model, (input_price, output_price) in json.loads(raw).items():
+                prices[model] = (float(input_price), float(output_price))
+        except (ValueError, TypeError) as exc:
+            logger.warning("Ignoring invalid LLM_MODEL_PRICES: %s", exc)
+    return prices
+
+
+MODEL_PRICES = _load_prices()
+
+
+def key_hash(api_key: Optional[str]) -> str:
+    if not api_key:
+        return "none"
+    return hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:16]
+
+
+def call_cost(model: str, usage: TokenUsage) -> float:
+    input_price, output_price = MODEL_PRICES.get(model, (0.0, 0.0))
+    uncached = max(usage.prompt_tokens - usage.cached_tokens, 0)
+    return (
+        uncached * input_price
+        + usage.cached_tokens * input_price * CACHED_PRICE_FACTOR
+        + usage.output_tokens * output_price
+    ) / 1_000_000
+
+
+def _today() -> str:
+    return datetime.datetime.now(datetime.timezone.utc).date().isoformat()
+
+
+@dataclass
+class UsageTotals:
+    calls: int = 0
+    prompt_tokens: int = 0
+    output_tokens: int = 0
+    cached_tokens: int = 0
+    cost_usd: float = 0.0
+
+    @property
+    def tokens(self) -> int:
+        return self.prompt_tokens + self.output_tokens
+
+    def add(self, usage: Optional[TokenUsage], cost: float) -> None:
+        self.calls += 1
+        if usage is not None:
+            self.prompt_tokens += usage.prompt_tokens
+            self.output_tokens += usage.output_tokens
+            self.cached_tokens += usage.cached_tokens
+        self.cost_usd += cost
+
+    def as_dict(self) -> dict[str, Any]:
+        return {
+            "calls": self.calls,
+            "prompt_tokens": self.prompt_tokens,
+            "output_tokens": self.output_tokens,
+            "cached_tokens": self.cached_tokens,
+            "cost_usd": round(self.cost_usd, 6),
+        }
+
+
+class UsageLedger:
+    def __init__(self, path: str | os.PathLike) -> None:
+        self.path = str(path)
+        if self.path != ":memory:":
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._local = threading.local()
+        # (day, key_hash, session, task, model) -> totals not yet written.
+        self._pending: dict[tuple[str, str, str, str, str], UsageTotals] = {}
+        # Counters taken by a flush that is still writing them.
+        self._flushing: dict[tuple[str, str, str, str, str], UsageTotals] = {}
+        # (day, key_hash) -> totals for the budget check, seeded from the database.
+        self._key_totals: dict[tuple[str, str], UsageTotals] = {}
+        self._key_totals_loaded = time.monotonic()
+        self._session_totals: "OrderedDict[str, UsageTotals]" = OrderedDict()
+        self._last_flush = time.monotonic()
+        with self._connection() as conn:
+            conn.executescript(_SCHEMA)
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _key_total(self, day: str, hashed_key: str) -> UsageTotals:
+        # Caller holds self._lock.
+        if time.monotonic() - self._key_totals_loaded >= FLUSH_INTERVAL_SECONDS:
+            # Pick up what other processes have written since.
+            self._key_totals = {}
+            self._key_totals_loaded = time.monotonic()
+        totals = self._key_totals.get((day, hashed_key))
+        if totals is None:
+            row = self._connection().execute(
+                "SELECT COALESCE(SUM(calls), 0), COALESCE(SUM(prompt_tokens), 0), COALESCE(SUM(output_tokens), 0),"
+                " COALESCE(SUM(cached_tokens), 0), COALESCE(SUM(cost_usd), 0) FROM llm_usage WHERE key_hash = ? AND day = ?",
+                (hashed_key, day),
+            ).fetchone()
+            totals = UsageTotals(*row)
+            for (pending_day, pending_key, *_), pending in (*self._pending.items(), *self._flushing.items()):
+                if pending_day == day and pending_key == hashed_key:
+                    totals.calls += pending.calls
+                    totals.prompt_tokens += pending.prompt_tokens
+                    totals.output_tokens += pending.output_tokens
+                    totals.cached_tokens += pending.cached_tokens
+                    totals.cost_usd += pending.cost_usd
+            self._key_totals = {k: v for k, v in self._key_totals.items() if k[0] == day}
+            self._key_totals[(day, hashed_key)] = totals
+        return totals
+
+    def check(self, api_key: Optional[str], session: Optional[str] = None) -> None:
+        """Raise ``BudgetExceededError`` if the key or session has used up its budget."""
+
+        if not (DAILY_TOKEN_BUDGET or DAILY_COST_BUDGET_USD or SESSION_TOKEN_BUDGET):
+            return
+        with self._lock:
+            totals = self._key_total(_today(), key_hash(api_key))
+            session_totals = self._session_totals.get(session) if session else None
+        if DAILY_TOKEN_BUDGET and totals.tokens >= DAILY_TOKEN_BUDGET:
+            raise BudgetExceededError(f"Daily token budget of {DAILY_TOKEN_BUDGET} reached for this API key.")
+        if DAILY_COST_BUDGET_USD and totals.cost_usd >= DAILY_COST_BUDGET_USD:
+            raise BudgetExceededError(f"Daily budget of ${DAILY_COST_BUDGET_USD:.2f} reached for this API key.")
+        if SESSION_TOKEN_BUDGET and session_totals is not None and session_totals.tokens >= SESSION_TOKEN_BUDGET:
+            raise BudgetExceededError(f"Token budget of {SESSION_TOKEN_BUDGET} reached for this interview.")
+
+    def record(
+        self,
+        api_key: Optional[str],
+        session: Optional[str],
+        task: str,
+        model: str,
+        usage: Optional[TokenUsage],
+    ) -> float:
+        """Count one call and return its cost in USD."""
+
+        cost = call_cost(model, usage) if usage is not None else 0.0
+        day = _today()
+        hashed_key = key_hash(api_key)
+        with self._lock:
+            self._key_total(day, hashed_key).add(usage, cost)
+            self._pending.setdefault((day, hashed_key, session or "", task, model), UsageTotals()).add(usage, cost)
+            if session:
+                totals = self._session_totals.get(session)
+                if totals is None:
+                    totals = self._session_totals[session] = UsageTotals()
+                self._session_totals.move_to_end(session)
+                while len(self._session_totals) > MAX_TRACKED_SESSIONS:
+                    self._session_totals.popitem(last=False)
+                totals.add(usage, cost)
+            due = (
+                len(self._pending) >= MAX_PENDING_COUNTERS
+                or time.monotonic() - self._last_flush >= FLUSH_INTERVAL_SECONDS
+            )
+        if due:
+            self.flush()
+        return cost
+
+    def flush(self) -> None:
+        """Write pending counters in one transaction."""
+
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                self._flushing = pending
+                self._last_flush = time.monotonic()
+            if not pending:
+                return
+            rows = [
+                (*counter, totals.calls, totals.prompt_tokens, totals.output_tokens, totals.cached_tokens, totals.cost_usd)
+                for counter, totals in pending.items()
+            ]
+            try:
+                with self._connection() as conn:
+                    conn.executemany(_UPSERT, rows)
+            except sqlite3.Error as exc:
+                logger.warning("Could not persist LLM usage counters: %s", exc)
+                with self._lock:
+                    self._flushing = {}
+                    for counter, totals in pending.items():
+                        merged = self._pending.setdefault(counter, UsageTotals())
+                        merged.calls += totals.calls
+                        merged.prompt_tokens += totals.prompt_tokens
+                        merged.output_tokens += totals.output_tokens
+                        merged.cached_tokens += totals.cached_tokens
+                        merged.cost_usd += totals.cost_usd
+            else:
+                with self._lock:
+                    # The database now has this process's spend and everyone else's.
+                    self._flushing = {}
+                    self._key_totals = {}
+                    self._key_totals_loaded = time.monotonic()
+
+    def session_totals(self, session: str) -> UsageTotals:
+        with self._lock:
+            totals = self._session_totals.get(session)
+            return UsageTotals(**totals.as_dict()) if totals is not None else UsageTotals()
+
+    def report(self, day: Optional[str] = None, api_key: Optional[str] = None) -> list[dict[str, Any]]:
+        """Spend per route and model for one day, most expensive first."""
+
+        self.flush()
+        query = (
+            "SELECT task, model, SUM(calls), SUM(prompt_tokens), SUM(output_tokens), SUM(cached_tokens), SUM(cost_usd)"
+            " FROM llm_usage WHERE day = ?"
+        )
+        params: list[Any] = [day or _today()]
+        if api_key is not None:
+            query += " AND key_hash = ?"
+            params.append(key_hash(api_key))
+        query += " GROUP BY task, model ORDER BY SUM(cost_usd) DESC, SUM(output_tokens) DESC"
+        return [
+            {
+                "route": task,
+                "model": model,
+                "calls": calls,
+                "prompt_tokens": prompt_tokens,
+                "output_tokens": output_tokens,
+                "cached_tokens": cached_tokens,
+                "cost_usd": round(cost, 6),
+            }
+            for task, model, calls, prompt_tokens, output_tokens, cached_tokens, cost in self._connection().execute(
+                query, params
+            )
+        ]
+
+    def budget_status(self, api_key: Optional[str]) -> dict[str, Any]:
+        with self._lock:
+            totals = self._key_total(_today(), key_hash(api_key))
+            status = totals.as_dict()
+        status["token_budget"] = DAILY_TOKEN_BUDGET or None
+        status["cost_budget_usd"] = DAILY_COST_BUDGET_USD or None
+        return status
+
+    def format_metrics(self) -> str:
+        """Render today's spend per route and model in the Prometheus text exposition format."""
+
+        lines = []
+        for row in self.report():
+            labels = f'route="{row["route"]}",model="{row["model"]}"'
+            for key in ("calls", "prompt_tokens", "output_tokens", "cached_tokens", "cost_usd"):
+                lines.append(f"llm_usage_{key}{{{labels}}} {row[key]}")
+        return "\n".join(lines) + "\n" if lines else ""
+
+
+_ledger: Optional[UsageLedger] = None
+_ledger_lock = threading.Lock()
+
+
+def get_usage_ledger() -> UsageLedger:
+    """Return the process-wide ledger, kept in the history database."""
+
+    global _ledger
+    if _ledger is None:
+        with _ledger_lock:
+            if _ledger is None:
+                _ledger = UsageLedger(os.getenv("INTERVIEW_HISTORY_DB") or DEFAULT_HISTORY_DB)
+                atexit.register(_ledger.flush)
+    return _ledger